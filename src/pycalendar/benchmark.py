@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+"""
+Simple timing benchmarks for the parser and generator hot paths. Run as:
+
+    python -m pycalendar.benchmark <name> [<count>]
+
+where <name> is one of the keys of L{BENCHMARKS}, or "all".
+"""
+
+from io import StringIO
+from pycalendar.datetime import DateTime
+from pycalendar.icalendar import definitions
+from pycalendar.icalendar.calendar import Calendar
+from pycalendar.icalendar.property import Property
+from pycalendar.icalendar.recurrence import Recurrence
+from pycalendar.icalendar.recurrencecache import RecurrenceCache
+from pycalendar.icalendar.recurrenceset import RecurrenceSet
+from pycalendar.period import Period
+from pycalendar.timezone import Timezone
+from pycalendar.utils import readFoldedLine, unfoldLines
+from typing import Any, Callable, Dict, List, Optional
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+
+def makeCalendarData(count: int) -> str:
+    """
+    Generate an iCalendar document with C{count} VEVENTs, each of which has a long, folded
+    DESCRIPTION and a handful of ATTENDEEs.
+    """
+
+    os = StringIO()
+    os.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//calendarserver.org//Benchmark//EN\r\n")
+    for ctr in range(count):
+        os.write("BEGIN:VEVENT\r\n")
+        os.write("UID:benchmark-{}@example.com\r\n".format(ctr))
+        os.write("DTSTART:2020{:02d}{:02d}T100000Z\r\n".format(ctr % 12 + 1, ctr % 28 + 1))
+        os.write("DURATION:PT1H\r\n")
+        os.write("DTSTAMP:20200101T000000Z\r\n")
+        os.write("SUMMARY:Event {}\r\n".format(ctr))
+        description = "DESCRIPTION:" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4
+        os.write("\r\n ".join([description[i:i + 74] for i in range(0, len(description), 74)]))
+        os.write("\r\n")
+        for attendee in range(4):
+            os.write("ATTENDEE;CN=\"User {0}\";CUTYPE=INDIVIDUAL;PARTSTAT=NEEDS-ACTION;ROLE=REQ-PARTICIPANT;\r\n RSVP=TRUE:mailto:user{0}@example.com\r\n".format(attendee))
+        os.write("END:VEVENT\r\n")
+    os.write("END:VCALENDAR\r\n")
+    return os.getvalue()
+
+
+def timeit(label: str, func: Callable[[], Any], repeat: int = 3) -> float:
+    """
+    Run C{func} C{repeat} times and print and return the best time.
+    """
+
+    best: Optional[float] = None
+    for _ignore in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    print("{:<40} {:10.4f}s".format(label, best))
+    return best
+
+
+def benchUnfold(count: int) -> None:
+    """
+    Compare L{readFoldedLine} with the block based L{unfoldLines}.
+    """
+
+    data = makeCalendarData(count)
+    print("Unfolding {} VEVENTs ({} characters)".format(count, len(data)))
+
+    def _readFoldedLine() -> List[str]:
+        ins = StringIO(data)
+        lines: List[Optional[str]] = [None, None]
+        results = []
+        while readFoldedLine(ins, lines):
+            results.append(lines[0])
+        return results
+
+    def _unfoldLines() -> List[str]:
+        return list(unfoldLines(StringIO(data)))
+
+    if _readFoldedLine() != _unfoldLines():
+        raise AssertionError("unfoldLines does not match readFoldedLine")
+    old = timeit("readFoldedLine", _readFoldedLine)
+    new = timeit("unfoldLines", _unfoldLines)
+    print("Speed-up: {:.2f}x".format(old / new))
+
+
+def benchNames(count: int) -> None:
+    """
+    Measure the time taken and memory retained when parsing all the properties of the
+    VEVENTs.
+    """
+
+    lines = [line for line in unfoldLines(makeCalendarData(count)) if not line.startswith(("BEGIN:", "END:"))]
+    print("Parsing {} properties".format(len(lines)))
+
+    def _parse() -> List[Property]:
+        return [Property.parseText(line) for line in lines]
+
+    timeit("Property.parseText", _parse)
+
+    tracemalloc.start()
+    props = _parse()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<40} {:10.1f}MB".format("Retained", current / (1024.0 * 1024.0)))
+    print("{:<40} {:10.1f}MB".format("Peak", peak / (1024.0 * 1024.0)))
+    del props
+
+
+def benchExpandMemory(count: int) -> None:
+    """
+    Measure the memory retained by the instances produced by expanding a daily recurrence
+    with L{RecurrenceSet.expand}.
+    """
+
+    start = DateTime(2000, 1, 1, 12, 0, 0, tzid=Timezone(utc=True))
+    end = start.duplicate()
+    end.offsetDay(count)
+    rule = Recurrence()
+    rule.setFreq(definitions.eRecurrence_DAILY)
+    rset = RecurrenceSet()
+    rset.addRule(rule)
+
+    tracemalloc.start()
+    items: List[DateTime] = []
+    rset.expand(start, Period(start, end), items)
+    current, _ignore_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("Expanded {} instances".format(len(items)))
+    print("{:<40} {:10.1f}MB".format("Retained", current / (1024.0 * 1024.0)))
+    print("{:<40} {:10.1f}".format("Bytes per instance", float(current) / len(items)))
+
+
+def benchExpandWindow(count: int) -> None:
+    """
+    Measure the time taken to expand a weekly recurrence over C{count} consecutive
+    month-long windows (as when paging through a calendar view) with
+    L{RecurrenceSet.expand}, first with an empty L{RecurrenceCache} and then again with
+    the windows already cached.
+    """
+
+    start = DateTime(2000, 1, 3, 12, 0, 0, tzid=Timezone(utc=True))
+    rule = Recurrence()
+    rule.setFreq(definitions.eRecurrence_WEEKLY)
+    rule.setByDay([(0, definitions.eRecurrence_WEEKDAY_MO), (0, definitions.eRecurrence_WEEKDAY_TH)])
+    rset = RecurrenceSet()
+    rset.addRule(rule)
+
+    def _expandWindows() -> None:
+        window_start = start.duplicate()
+        for _ignore in range(count):
+            window_end = window_start.duplicate()
+            window_end.offsetMonth(1)
+            rset.expand(start, Period(window_start, window_end), [])
+            window_start = window_end
+
+    cache = RecurrenceCache.getCache()
+    cache.clear()
+    cache.resetStatistics()
+    timeit("Empty cache", _expandWindows, repeat=1)
+    timeit("Cached", _expandWindows)
+    print(cache.getStatistics())
+
+
+def benchGenerate(count: int) -> None:
+    """
+    Measure the time taken to sort and generate a calendar with C{count} VEVENTs, e.g.
+    "python -m pycalendar.benchmark generate 50000".
+    """
+
+    cal = Calendar.parseText(makeCalendarData(count))
+    print("Generating {} VEVENTs".format(count))
+
+    timeit("sortedComponents", cal.sortedComponents)
+    timeit("sortedPropertyKeys", lambda: [component.sortedPropertyKeys() for component in cal.getComponents()])
+    timeit("getText", lambda: cal.getText(includeTimezones=Calendar.NO_TIMEZONES))
+
+
+def benchJSON(count: int) -> None:
+    """
+    Compare the time taken to parse the jCal test data C{count} times with
+    L{Calendar.parseJSONData} and L{Calendar.parseJSONDataFast}, e.g.
+    "python -m pycalendar.benchmark json 1000".
+    """
+
+    from pycalendar.icalendar.tests.test_json import TestJSON
+    jcaldata = [jcal for _ignore_ical, jcal in TestJSON.data]
+    print("Parsing {} jCal objects {} times".format(len(jcaldata), count))
+
+    timeit("parseJSONData", lambda: [Calendar.parseJSONData(jcal) for _ignore in range(count) for jcal in jcaldata])
+    timeit("parseJSONDataFast", lambda: [Calendar.parseJSONDataFast(jcal) for _ignore in range(count) for jcal in jcaldata])
+
+
+def benchJSONMemory(count: int) -> None:
+    """
+    Compare the peak memory used to write a calendar with C{count} VEVENTs as jCal to a
+    file, by building the nested lists with L{Calendar.writeJSON} and by streaming with
+    L{Calendar.generateJSON}.
+    """
+
+    cal = Calendar.parseText(makeCalendarData(count))
+    print("Writing {} VEVENTs as jCal".format(count))
+
+    def _nested(sink: Any) -> None:
+        jobject: List[Any] = []
+        cal.writeJSON(jobject, Calendar.NO_TIMEZONES)
+        json.dump(jobject[0], sink, indent=2, separators=(',', ':'))
+
+    def _streamed(sink: Any) -> None:
+        cal.generateJSON(sink, includeTimezones=Calendar.NO_TIMEZONES)
+
+    for label, func in (("writeJSON", _nested), ("generateJSON", _streamed),):
+        with open(os.devnull, "w") as f:
+            tracemalloc.start()
+            func(f)
+            _ignore_current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print("{:<40} {:10.1f}MB".format(label + " peak", peak / (1024.0 * 1024.0)))
+
+
+BENCHMARKS: Dict[str, Callable[[int], None]] = {
+    "expand-memory": benchExpandMemory,
+    "expand-window": benchExpandWindow,
+    "generate": benchGenerate,
+    "json": benchJSON,
+    "json-memory": benchJSONMemory,
+    "names": benchNames,
+    "unfold": benchUnfold,
+}
+
+
+if __name__ == '__main__':
+
+    name = sys.argv[1] if len(sys.argv) > 1 else "all"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    if name == "all":
+        for bench in BENCHMARKS.values():
+            bench(count)
+    elif name in BENCHMARKS:
+        BENCHMARKS[name](count)
+    else:
+        print("Unknown benchmark: {}. Choose from: all, {}".format(name, ", ".join(sorted(BENCHMARKS.keys()))))
+        sys.exit(1)
@@ -0,0 +1,199 @@
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+"""
+Parse large numbers of iCalendar and vCard files in parallel using a pool of worker
+processes.
+
+Functions passed in to run in the workers (the C{summarize} argument of L{parseFiles} and the
+C{func} argument of L{processFiles}) must be picklable, i.e. defined at module level, and must
+only return picklable data.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pycalendar.exceptions import ErrorBase, InvalidData
+from pycalendar.icalendar import definitions
+from pycalendar.icalendar.calendar import Calendar
+from pycalendar.vcard.card import Card
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import os
+import time
+
+
+class BulkResult(object):
+    """
+    The outcome of processing a single file in a worker process.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.error: Optional[str] = None
+        self.summary: Any = None
+        self.timezones: Dict[str, str] = {}
+        self.elapsed: float = 0.0
+
+    def __repr__(self) -> str:
+        return "BulkResult: {} ({})".format(self.path, self.error if self.error else "ok")
+
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def findFiles(root: str, extensions: Tuple[str, ...] = (".ics",)) -> List[str]:
+    """
+    Return the sorted paths of all the files below C{root} with one of the specified
+    extensions.
+
+    @param root: the directory to scan
+    @type root: C{str}
+    @param extensions: the file extensions to match
+    @type extensions: C{tuple} of C{str}
+    """
+
+    paths: List[str] = []
+    for dirpath, _ignore_dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(extensions):
+                paths.append(os.path.join(dirpath, filename))
+    paths.sort()
+    return paths
+
+
+def parseFile(path: str, summarize: Optional[Callable[[Any], Any]] = None) -> BulkResult:
+    """
+    Parse a single file. Files with a ".vcf" extension are parsed as vCard data, all others as
+    iCalendar data. Any VTIMEZONEs in iCalendar data are returned as text so that they can be
+    merged into the L{TimezoneDatabase} of the parent process.
+
+    @param path: the file to parse
+    @type path: C{str}
+    @param summarize: called with the parsed L{Calendar} or C{list} of L{Card}s, and the
+        result stored in L{BulkResult.summary} - if it raises an exception that is stored
+        in L{BulkResult.error} instead
+    @type summarize: C{callable}
+    """
+
+    result = BulkResult(path)
+    try:
+        if path.lower().endswith(".vcf"):
+            parsed = Card.parseMultipleFile(path)
+        else:
+            parsed = Calendar.parseFile(path)
+            if parsed is None:
+                raise InvalidData("No iCalendar data")
+            for tz in parsed.getComponents(definitions.cICalComponent_VTIMEZONE):
+                tzcal = Calendar()
+                tzcal.addComponent(tz.duplicate(tzcal))
+                result.timezones[tz.getID()] = tzcal.getText()
+    except (ErrorBase, IOError, UnicodeDecodeError) as e:
+        result.error = str(e)
+    else:
+        if summarize is not None:
+            # A failure summarizing one file must not abort the rest of the batch
+            try:
+                result.summary = summarize(parsed)
+            except Exception as e:
+                result.error = "{}: {}".format(e.__class__.__name__, e)
+    return result
+
+
+def _timed(func: Callable[[str], BulkResult], path: str) -> BulkResult:
+    start = time.perf_counter()
+    result = func(path)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def processFiles(
+    paths: Iterable[str],
+    func: Callable[[str], BulkResult],
+    callback: Optional[Callable[[BulkResult], None]] = None,
+    maxWorkers: Optional[int] = None,
+    chunksize: int = 8,
+) -> List[BulkResult]:
+    """
+    Run C{func} on each of the files in a pool of worker processes and return the results in
+    the same order as C{paths}.
+
+    @param paths: the files to process
+    @type paths: iterable of C{str}
+    @param func: called in a worker process with the path of a file, and returns a
+        L{BulkResult}
+    @type func: C{callable}
+    @param callback: called in this process with each result as it becomes available
+    @type callback: C{callable}
+    @param maxWorkers: the number of worker processes, defaults to the number of CPUs
+    @type maxWorkers: C{int}
+    @param chunksize: the number of files sent to a worker at a time
+    @type chunksize: C{int}
+    """
+
+    results: List[BulkResult] = []
+    with ProcessPoolExecutor(max_workers=maxWorkers) as pool:
+        for result in pool.map(partial(_timed, func), paths, chunksize=chunksize):
+            if callback is not None:
+                callback(result)
+            results.append(result)
+    return results
+
+
+def parseFiles(
+    paths: Iterable[str],
+    summarize: Optional[Callable[[Any], Any]] = None,
+    callback: Optional[Callable[[BulkResult], None]] = None,
+    maxWorkers: Optional[int] = None,
+    chunksize: int = 8,
+) -> List[BulkResult]:
+    """
+    Parse each of the files in a pool of worker processes (see L{parseFile}) and merge all the
+    VTIMEZONEs found into the L{TimezoneDatabase} of this process.
+    """
+
+    results = processFiles(paths, partial(parseFile, summarize=summarize), callback, maxWorkers, chunksize)
+    mergeTimezones(results)
+    return results
+
+
+def parseTree(
+    root: str,
+    extensions: Tuple[str, ...] = (".ics",),
+    summarize: Optional[Callable[[Any], Any]] = None,
+    callback: Optional[Callable[[BulkResult], None]] = None,
+    maxWorkers: Optional[int] = None,
+    chunksize: int = 8,
+) -> List[BulkResult]:
+    """
+    Parse all the files below C{root} with one of the specified extensions (see
+    L{parseFiles}).
+    """
+
+    return parseFiles(findFiles(root, extensions), summarize, callback, maxWorkers, chunksize)
+
+
+def mergeTimezones(results: Iterable[BulkResult]) -> None:
+    """
+    Merge the VTIMEZONEs returned by the workers into the L{TimezoneDatabase}. Each TZID is
+    only merged once.
+    """
+
+    seen = set()
+    for result in results:
+        for tzid, tzdata in result.timezones.items():
+            if tzid not in seen:
+                seen.add(tzid)
+                # Parsing the calendar merges its VTIMEZONEs into the TimezoneDatabase
+                Calendar.parseText(tzdata)
@@ -5,9 +5,11 @@ from pycalendar.periodvalue import PeriodValue
 from pycalendar.value import Value
 import xml.etree.cElementTree as XML
 from pycalendar.exceptions import InvalidComponent, ErrorBase
+from pycalendar.utils import FoldingWriter
 from typing import (
     Self, Optional, Any, Callable, Dict, List, Tuple, Union
 )
+import weakref
 
 class ComponentBase(object):
     propertyCardinality_1: Tuple[str, ...] = ()
@@ -19,12 +21,25 @@ class ComponentBase(object):
 
     sortSubComponents: bool = True
 
+    # Set to C{True} to cache the generated text of each component. The cache (and the
+    # structural hash, see L{structuralHash}) is cleared by L{changed}, which is called when
+    # properties or sub-components are added or removed. Code that changes property values
+    # in place must call L{changed} itself for the text cache to be cleared.
+    sCacheText: bool = False
+
     sComponentType: Any = None
     sPropertyType: Any = None
 
     mParentComponent: Optional["ComponentBase"]
     mComponents: List["ComponentBase"]
+    mComponentsByType: Dict[str, List["ComponentBase"]]
+    mComponentsByKey: Optional[Dict[Any, "ComponentBase"]]
     mProperties: Dict[str, List[Any]]
+    mCachedText: Optional[str]
+    mCachedBytes: Optional[bytes]
+    mStructuralHash: Optional[int]
+    mHashTrusted: bool
+    mShared: Optional["weakref.WeakValueDictionary[int, ComponentBase]"]
     cardinalityChecks: Tuple[
         Callable[[List[str], List[str], bool], None],
         Callable[[List[str], List[str], bool], None],
@@ -35,7 +50,14 @@ class ComponentBase(object):
     def __init__(self, parent: Optional["ComponentBase"] = None) -> None:
         self.mParentComponent: Optional["ComponentBase"] = parent
         self.mComponents: List["ComponentBase"] = []
+        self.mComponentsByType: Dict[str, List["ComponentBase"]] = {}
+        self.mComponentsByKey: Optional[Dict[Any, "ComponentBase"]] = None
         self.mProperties: Dict[str, List[Any]] = {}
+        self.mCachedText: Optional[str] = None
+        self.mCachedBytes: Optional[bytes] = None
+        self.mStructuralHash: Optional[int] = None
+        self.mHashTrusted: bool = True
+        self.mShared: Optional["weakref.WeakValueDictionary[int, ComponentBase]"] = None
 
         self.cardinalityChecks = (
             self.check_cardinality_1,
@@ -45,14 +67,67 @@ class ComponentBase(object):
         )
 
     def duplicate(self, **args) -> Self:
+        """
+        Return a copy of this component. The copy is made lazily: the properties and
+        sub-components are shared by the two components, along with a (weak) map of the
+        components sharing them, until one of the components changes them or hands them out
+        (see L{_unshare}). Output, comparison and hashing never copy.
+        """
         other = self.__class__(**args)
-        for component in self.mComponents:
-            other.addComponent(component.duplicate(parent=other))
-        other.mProperties = {}
-        for propname, props in self.mProperties.items():
-            other.mProperties[propname] = [i.duplicate() for i in props]
+        if self.mShared is None:
+            self.mShared = weakref.WeakValueDictionary()
+            self.mShared[id(self)] = self
+        self.mShared[id(other)] = other
+        other.mShared = self.mShared
+        other.mProperties = self.mProperties
+        other.mComponents = self.mComponents
+        other.mComponentsByType = self.mComponentsByType
+        other.mCachedText = self.mCachedText
+        other.mCachedBytes = self.mCachedBytes
+        other.mStructuralHash = self.mStructuralHash
+        other.mHashTrusted = self.mHashTrusted
         return other
 
+    def unshare(self) -> None:
+        """
+        Make sure the properties and sub-components of this component are not shared with a
+        duplicate, so that they can be changed in place.
+        """
+        if self.mShared is not None:
+            self._unshare()
+
+    def _unshare(self) -> None:
+        """
+        Stop sharing properties and sub-components with duplicates, copying them if any
+        duplicate still uses them. Sub-components are copied with L{duplicate}, so are
+        themselves only copied when needed.
+        """
+        shared = self.mShared
+        self.mShared = None
+        del shared[id(self)]
+        properties = self.mProperties
+        components = self.mComponents
+        self.mComponents = []
+        self.mComponentsByType = {}
+        self.mComponentsByKey = None
+        others = list(shared.values())
+        if others:
+            self.mProperties = dict([(propname, [prop.duplicate() for prop in props]) for propname, props in properties.items()])
+            for component in components:
+                self.addComponent(component.duplicate(parent=self))
+
+            # The originals stay with the others, so must not refer back to this component
+            for component in components:
+                if component.getParentComponent() is self:
+                    component.setParentComponent(others[0])
+            if len(others) == 1:
+                others[0].mShared = None
+        else:
+            # The last one left owns the originals
+            for component in components:
+                component.setParentComponent(self)
+                self.addComponent(component)
+
     def __str__(self) -> str:
         return self.getText()
 
@@ -62,6 +137,9 @@ class ComponentBase(object):
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, ComponentBase):
             return False
+        # Cached hashes can only rule out a match if no values could have changed in place
+        if self.mHashTrusted and other.mHashTrusted and self.structuralHash() != other.structuralHash():
+            return False
         return (
             self.getType() == other.getType()
             and self.compareProperties(other)
@@ -86,58 +164,146 @@ class ComponentBase(object):
     def setParentComponent(self, parent: Optional["ComponentBase"]) -> None:
         self.mParentComponent = parent
 
+    def structuralHash(self) -> int:
+        """
+        Return a hash of the type, properties and sub-components of this component that does
+        not depend on the order of the properties or sub-components, so components that
+        compare equal have the same hash. The hash is cached until L{changed} is called, or
+        not at all once this component or one of its sub-components has handed out its
+        properties (see L{distrustHash}), as their values may then be changed in place.
+        """
+        if self.mStructuralHash is None or not self.mHashTrusted:
+            self.mStructuralHash = hash((
+                self.getType(),
+                tuple(sorted(set([hash(prop) for props in self.mProperties.values() for prop in props]))),
+                tuple(sorted([component.structuralHash() for component in self.mComponents])),
+            ))
+        return self.mStructuralHash
+
+    def distrustHash(self) -> None:
+        """
+        Stop trusting the cached structural hash of this component and the components that
+        contain it, because properties have been handed out that could be changed in place
+        without a call to L{changed}.
+        """
+        component = self
+        while component is not None:
+            component.mHashTrusted = False
+            component = component.mParentComponent
+
     def compareComponents(self, other: "ComponentBase") -> bool:
-        mine = set(self.mComponents)
-        theirs = set(other.mComponents)
-        for item in mine:
-            for another in theirs:
-                if item == another:
-                    theirs.remove(another)
+        if len(self.mComponents) != len(other.mComponents):
+            return False
+
+        # Only compare components with the same structural hash
+        theirs: Dict[int, List["ComponentBase"]] = {}
+        for component in other.mComponents:
+            theirs.setdefault(component.structuralHash(), []).append(component)
+        for component in self.mComponents:
+            candidates = theirs.get(component.structuralHash(), [])
+            for index, another in enumerate(candidates):
+                if component == another:
+                    del candidates[index]
                     break
             else:
                 return False
-        return len(theirs) == 0
+        return True
 
     def getComponents(self, compname: Optional[str] = None) -> List["ComponentBase"]:
-        compname = compname.upper() if compname else None
-        return [
-            component
-            for component in self.mComponents
-            if compname is None or component.getType().upper() == compname
-        ]
+        if self.mShared is not None:
+            self._unshare()
+        if compname:
+            return list(self.mComponentsByType.get(compname.upper(), ()))
+        else:
+            return self.mComponents[:]
 
     def getComponentByKey(self, key: Any) -> Optional["ComponentBase"]:
+        if self.mShared is not None:
+            self._unshare()
+        # The key index is only built when first needed, as getMapKey() can create a new
+        # key. Map keys can also change after a component is added (e.g. setUID()), so a
+        # hit is checked and a miss falls back to a scan.
+        if self.mComponentsByKey is None:
+            self.mComponentsByKey = {}
+            for component in self.mComponents:
+                self.mComponentsByKey.setdefault(component.getMapKey(), component)
+        component = self.mComponentsByKey.get(key)
+        if component is not None and component.getMapKey() == key:
+            return component
         for component in self.mComponents:
             if component.getMapKey() == key:
+                self.mComponentsByKey[key] = component
                 return component
         return None
 
     def removeComponentByKey(self, key: Any) -> None:
-        for component in self.mComponents:
-            if component.getMapKey() == key:
-                self.removeComponent(component)
-                return
+        component = self.getComponentByKey(key)
+        if component is not None:
+            self.removeComponent(component)
 
     def addComponent(self, component: "ComponentBase") -> None:
+        if self.mShared is not None:
+            self._unshare()
         self.mComponents.append(component)
+        self.mComponentsByType.setdefault(component.getType().upper(), []).append(component)
+        if not component.mHashTrusted:
+            self.distrustHash()
+        if self.mComponentsByKey is not None:
+            self.mComponentsByKey.setdefault(component.getMapKey(), component)
+        self.changed()
 
     def hasComponent(self, compname: str) -> bool:
-        return self.countComponents(compname) != 0
+        return compname.upper() in self.mComponentsByType
 
     def countComponents(self, compname: str) -> int:
-        return len(self.getComponents(compname))
+        return len(self.mComponentsByType.get(compname.upper(), ()))
 
     def removeComponent(self, component: "ComponentBase") -> None:
-        self.mComponents.remove(component)
+        if self.mShared is not None:
+            self._unshare()
+        # Look for the component itself first to avoid calling __eq__ on all the others
+        for index, item in enumerate(self.mComponents):
+            if item is component:
+                break
+        else:
+            index = self.mComponents.index(component)
+        component = self.mComponents.pop(index)
+
+        ctype = component.getType().upper()
+        bucket = self.mComponentsByType[ctype]
+        for index, item in enumerate(bucket):
+            if item is component:
+                del bucket[index]
+                break
+        if not bucket:
+            del self.mComponentsByType[ctype]
+        if self.mComponentsByKey is not None:
+            key = component.getMapKey()
+            if self.mComponentsByKey.get(key) is component:
+                del self.mComponentsByKey[key]
+        self.changed()
 
     def removeAllComponent(self, compname: Optional[str] = None) -> None:
+        if self.mShared is not None:
+            self._unshare()
         if compname:
-            compname = compname.upper()
-            for component in tuple(self.mComponents):
-                if component.getType().upper() == compname:
-                    self.removeComponent(component)
+            for component in self.getComponents(compname):
+                self.removeComponent(component)
         else:
             self.mComponents = []
+            self.mComponentsByType = {}
+            self.mComponentsByKey = None
+            self.changed()
+
+    def sortComponents(self, key: Callable[[Any], Any]) -> None:
+        """
+        Sort the sub-components in place, keeping the per-type lookup order the same.
+        """
+        if self.mShared is not None:
+            self._unshare()
+        self.mComponents.sort(key=key)
+        for bucket in self.mComponentsByType.values():
+            bucket.sort(key=key)
 
     def sortedComponentNames(self) -> Tuple[str, ...]:
         return ()
@@ -152,13 +318,23 @@ class ComponentBase(object):
         return mine == theirs
 
     def getProperties(self, propname: Optional[str] = None) -> Union[Dict[str, List[Any]], List[Any]]:
+        if self.mShared is not None:
+            self._unshare()
+        if self.mHashTrusted:
+            self.distrustHash()
         return self.mProperties.get(propname.upper(), []) if propname else self.mProperties
 
     def setProperties(self, props: Dict[str, List[Any]]) -> None:
+        if self.mShared is not None:
+            self._unshare()
         self.mProperties = props
+        self.changed()
 
     def addProperty(self, prop: Any) -> None:
+        if self.mShared is not None:
+            self._unshare()
         self.mProperties.setdefault(prop.getName().upper(), []).append(prop)
+        self.changed()
 
     def hasProperty(self, propname: str) -> bool:
         return propname.upper() in self.mProperties
@@ -167,18 +343,42 @@ class ComponentBase(object):
         return len(self.mProperties.get(propname.upper(), []))
 
     def findFirstProperty(self, propname: str) -> Optional[Any]:
+        if self.mShared is not None:
+            self._unshare()
+        if self.mHashTrusted:
+            self.distrustHash()
         return self.mProperties.get(propname.upper(), [None])[0]
 
     def removeProperty(self, prop: Any) -> None:
+        if self.mShared is not None:
+            self._unshare()
         key = prop.getName().upper()
         if key in self.mProperties:
             self.mProperties[key].remove(prop)
             if len(self.mProperties[key]) == 0:
                 del self.mProperties[key]
+            self.changed()
 
     def removeProperties(self, propname: str) -> None:
+        if self.mShared is not None:
+            self._unshare()
         if propname.upper() in self.mProperties:
             del self.mProperties[propname.upper()]
+            self.changed()
+
+    def changed(self) -> None:
+        """
+        Clear the cached text and structural hash of this component and of the components
+        that contain it.
+        """
+        # A parent is only ever cached together with its sub-components, so there is
+        # nothing to clear further up if this component is not cached
+        if self.mCachedText is not None or self.mCachedBytes is not None or self.mStructuralHash is not None:
+            self.mCachedText = None
+            self.mCachedBytes = None
+            self.mStructuralHash = None
+            if self.mParentComponent is not None:
+                self.mParentComponent.changed()
 
     def getPropertyInteger(self, prop: str, type: Optional[Any] = None) -> Optional[int]:
         return self.loadValueInteger(prop, type)
@@ -193,6 +393,8 @@ class ComponentBase(object):
         raise NotImplemented
 
     def validate(self, doFix: bool = False) -> Tuple[List[str], List[str]]:
+        if doFix and self.mShared is not None:
+            self._unshare()
         fixed: List[str] = []
         unfixed: List[str] = []
         for check in self.cardinalityChecks:
@@ -248,6 +450,24 @@ class ComponentBase(object):
         return s.getvalue()
 
     def generate(self, os: Any) -> None:
+        if not self.sCacheText:
+            self.generateUncached(os)
+        elif isinstance(os, FoldingWriter):
+            # Folding is done on octets for a FoldingWriter, so cache its output separately
+            if self.mCachedBytes is None:
+                writer = FoldingWriter()
+                self.generateUncached(writer)
+                writer.flush()
+                self.mCachedBytes = b"".join(writer.takeChunks())
+            os.writeBytes(self.mCachedBytes)
+        else:
+            if self.mCachedText is None:
+                sout = StringIO()
+                self.generateUncached(sout)
+                self.mCachedText = sout.getvalue()
+            os.write(self.mCachedText)
+
+    def generateUncached(self, os: Any) -> None:
         os.write(self.getBeginDelimiter())
         os.write("\r\n")
         self.writeProperties(os)
@@ -302,23 +522,27 @@ class ComponentBase(object):
         jobject.append(comp)
 
     def sortedComponents(self) -> List["ComponentBase"]:
-        components = self.mComponents[:]
-        sortedcomponents: List["ComponentBase"] = []
+        # This is used for output, so does not stop sharing sub-components with duplicates (see
+        # L{duplicate}) - the components returned must not be changed
+        # Bucket the components by type in a single pass, then emit the buckets in the
+        # sortedComponentNames() order followed by everything else
         orderedNames = self.sortedComponentNames()
-        for name in orderedNames:
-            namedcomponents = []
-            for component in tuple(components):
-                if component.getType().upper() == name:
-                    namedcomponents.append(component)
-                    components.remove(component)
-            for component in sorted(namedcomponents, key=lambda x: x.getSortKey()):
-                sortedcomponents.append(component)
+        buckets: Dict[str, List["ComponentBase"]] = dict([(name, []) for name in orderedNames])
+        remainder: List["ComponentBase"] = []
+        for component in self.mComponents:
+            bucket = buckets.get(component.getType().upper())
+            if bucket is not None:
+                bucket.append(component)
+            else:
+                remainder.append(component)
+        sortedcomponents: List["ComponentBase"] = []
+        for bucket in buckets.values():
+            if len(bucket) > 1:
+                bucket.sort(key=lambda x: x.getSortKey())
+            sortedcomponents.extend(bucket)
         if self.sortSubComponents:
-            remainder = sorted(components, key=lambda x: (x.getType().upper(), x.getSortKey(),))
-        else:
-            remainder = components
-        for component in remainder:
-            sortedcomponents.append(component)
+            remainder.sort(key=lambda x: (x.getType().upper(), x.getSortKey(),))
+        sortedcomponents.extend(remainder)
         return sortedcomponents
 
     def writeComponents(self, os: Any) -> None:
@@ -375,11 +599,11 @@ class ComponentBase(object):
         if type:
             if self.hasProperty(value_name):
                 if type == Value.VALUETYPE_INTEGER:
-                    ivalue = self.findFirstProperty(value_name).getIntegerValue()
+                    ivalue = self.mProperties[value_name.upper()][0].getIntegerValue()
                     if ivalue is not None:
                         return ivalue.getValue()
                 elif type == Value.VALUETYPE_UTC_OFFSET:
-                    uvalue = self.findFirstProperty(value_name).getUTCOffsetValue()
+                    uvalue = self.mProperties[value_name.upper()][0].getUTCOffsetValue()
                     if uvalue is not None:
                         return uvalue.getValue()
             return None
@@ -388,35 +612,42 @@ class ComponentBase(object):
 
     def loadValueString(self, value_name: str) -> Optional[str]:
         if self.hasProperty(value_name):
-            tvalue = self.findFirstProperty(value_name).getTextValue()
+            tvalue = self.mProperties[value_name.upper()][0].getTextValue()
             if tvalue is not None:
                 return tvalue.getValue()
         return None
 
     def loadValueDateTime(self, value_name: str) -> Optional[Any]:
         if self.hasProperty(value_name):
-            dtvalue = self.findFirstProperty(value_name).getDateTimeValue()
+            if self.mShared is not None:
+                self._unshare()
+            dtvalue = self.mProperties[value_name.upper()][0].getDateTimeValue()
             if dtvalue is not None:
                 return dtvalue.getValue()
         return None
 
     def loadValueDuration(self, value_name: str) -> Optional[Any]:
         if self.hasProperty(value_name):
-            dvalue = self.findFirstProperty(value_name).getDurationValue()
+            if self.mShared is not None:
+                self._unshare()
+            dvalue = self.mProperties[value_name.upper()][0].getDurationValue()
             if dvalue is not None:
                 return dvalue.getValue()
         return None
 
     def loadValuePeriod(self, value_name: str) -> Optional[Any]:
         if self.hasProperty(value_name):
-            pvalue = self.findFirstProperty(value_name).getPeriodValue()
+            if self.mShared is not None:
+                self._unshare()
+            pvalue = self.mProperties[value_name.upper()][0].getPeriodValue()
             if pvalue is not None:
                 return pvalue.getValue()
         return None
 
     def loadValueRRULE(self, value_name: str, value: Any, add: bool) -> bool:
+        # The rules are not copied here, see L{ComponentRecur.getRecurrenceSet}
         if self.hasProperty(value_name):
-            items = self.getProperties()[value_name]
+            items = self.mProperties[value_name.upper()]
             for iter in items:
                 rvalue = iter.getRecurrenceValue()
                 if rvalue is not None:
@@ -430,7 +661,7 @@ class ComponentBase(object):
 
     def loadValueRDATE(self, value_name: str, value: Any, add: bool) -> bool:
         if self.hasProperty(value_name):
-            for iter in self.getProperties(value_name):
+            for iter in self.mProperties[value_name.upper()]:
                 mvalue = iter.getMultiValue()
                 if mvalue is not None:
                     for obj in mvalue.getValues():
@@ -449,14 +680,9 @@ class ComponentBase(object):
             return False
 
     def sortedPropertyKeys(self) -> List[str]:
-        keys = list(self.mProperties.keys())
-        keys.sort()
-        results: List[str] = []
-        for skey in self.sortedPropertyKeyOrder():
-            if skey in keys:
-                results.append(skey)
-                keys.remove(skey)
-        results.extend(keys)
+        ordered = dict.fromkeys(self.sortedPropertyKeyOrder())
+        results: List[str] = [key for key in ordered if key in self.mProperties]
+        results.extend(sorted([key for key in self.mProperties if key not in ordered]))
         return results
 
     def sortedPropertyKeyOrder(self) -> Tuple[str, ...]:
@@ -473,11 +699,11 @@ class ComponentBase(object):
         keys = self.sortedPropertyKeys()
         if filter.isAllProperties():
             for key in keys:
-                for prop in self.getProperties(key):
+                for prop in self.mProperties[key]:
                     prop.generate(os)
         elif filter.hasPropertyFilters():
             for key in keys:
-                for prop in self.getProperties(key):
+                for prop in self.mProperties[key]:
                     prop.generateFiltered(os, filter)
 
     def writePropertiesXML(self, node: Any, namespace: Any) -> None:
@@ -493,11 +719,11 @@ class ComponentBase(object):
         keys = self.sortedPropertyKeys()
         if filter.isAllProperties():
             for key in keys:
-                for prop in self.getProperties(key):
+                for prop in self.mProperties[key]:
                     prop.writeXML(props, namespace)
         elif filter.hasPropertyFilters():
             for key in keys:
-                for prop in self.getProperties(key):
+                for prop in self.mProperties[key]:
                     prop.writeXMLFiltered(props, namespace, filter)
 
     def writePropertiesJSON(self, jobject: list) -> None:
@@ -511,11 +737,11 @@ class ComponentBase(object):
         keys = self.sortedPropertyKeys()
         if filter.isAllProperties():
             for key in keys:
-                for prop in self.getProperties(key):
+                for prop in self.mProperties[key]:
                     prop.writeJSON(jobject)
         elif filter.hasPropertyFilters():
             for key in keys:
-                for prop in self.getProperties(key):
+                for prop in self.mProperties[key]:
                     prop.writeJSONFiltered(jobject, filter)
 
     def loadPrivateValue(self, value_name: str) -> Optional[str]:
@@ -17,10 +17,14 @@
 from io import StringIO
 from pycalendar.componentbase import ComponentBase
 from pycalendar.exceptions import InvalidData, ValidationError
+from pycalendar.jsonparser import JSONParser
+from pycalendar.jsonwriter import JSONWriter
 from pycalendar.parser import ParserContext
-from pycalendar.utils import readFoldedLine
+from pycalendar.utils import FoldingWriter, readMappedFile, unfoldLines, WRITE_CHUNK_SIZE
+from pycalendar.xmlparser import XMLParser
+from pycalendar.xmlwriter import XMLWriter
 import json
-from typing import Any, Optional, List, Tuple
+from typing import Any, IO, Iterator, Optional, List, Tuple
 
 class ContainerBase(ComponentBase):
     """
@@ -38,6 +42,13 @@ class ContainerBase(ComponentBase):
     sFormatText: Optional[str] = None
     sFormatJSON: Optional[str] = None
 
+    # The namespace and root element of the XML representation
+    sXMLNamespace: Optional[str] = None
+    sXMLRoot: Optional[str] = None
+
+    # The top-level properties are always regenerated, only the components are cached
+    sCacheText: bool = False
+
     @classmethod
     def setPRODID(cls, prodid: str) -> None:
         cls.sProdID = prodid
@@ -107,6 +118,20 @@ class ContainerBase(ComponentBase):
         else:
             return None
 
+    @classmethod
+    def parseFile(cls, path: str, encoding: str = "utf-8") -> Optional["ContainerBase"]:
+        """
+        Parse text data from a file. The file is memory mapped and decoded in blocks that
+        are fed straight to the parser, so the file contents are never copied into a single
+        C{str}.
+
+        @param path: the file to parse
+        @type path: C{str}
+        @param encoding: the character encoding of the file
+        @type encoding: C{str}
+        """
+        return cls.parseTextData(readMappedFile(path, encoding=encoding))
+
     def parse(self, ins: Any) -> bool:
 
         result: bool = False
@@ -119,14 +144,11 @@ class ContainerBase(ComponentBase):
         state = LOOK_FOR_CONTAINER
 
         # Get lines looking for start of calendar
-        lines: List[Optional[str]] = [None, None]
         comp: "ContainerBase" = self
         compend: Optional[str] = None
         componentstack: List[Tuple["ComponentBase", Optional[str]]] = []
 
-        while readFoldedLine(ins, lines):
-
-            line = lines[0]
+        for line in unfoldLines(ins):
 
             if state == LOOK_FOR_CONTAINER:
 
@@ -220,6 +242,29 @@ class ContainerBase(ComponentBase):
             raise InvalidData("JSON parse: {}".format(e), data)
         return cls.parseJSON(jobject, None, cls(add_defaults=False))
 
+    @classmethod
+    def parseJSONDataFast(cls, data: Any) -> Optional["ContainerBase"]:
+        """
+        Parse JSON data with a L{JSONParser}, which is faster than L{parseJSONData} but
+        does not skip over individual components or properties that are invalid - any
+        error in the data raises L{InvalidData}.
+
+        @param data: the data to parse
+        @type data: C{str} or C{File-like}
+        """
+        return JSONParser.forContainer(cls).parse(data)
+
+    @classmethod
+    def parseXMLData(cls, data: Any) -> Optional["ContainerBase"]:
+        """
+        Parse xCal or xCard data with an L{XMLParser}, which reads the data incrementally
+        and so can handle very large documents in bounded memory.
+
+        @param data: the data to parse, or the path of a file to parse
+        @type data: C{str} or C{File-like}
+        """
+        return XMLParser.forContainer(cls).parse(data)
+
     def getText(self, format: Optional[str] = None) -> Optional[str]:
 
         if format is None or format == self.sFormatText:
@@ -231,10 +276,75 @@ class ContainerBase(ComponentBase):
         else:
             return None
 
-    def getTextJSON(self) -> str:
-        jobject: list = []
-        self.writeJSON(jobject)
-        return json.dumps(jobject[0], indent=2, separators=(',', ':'))
+    def generateBytes(self, chunkSize: int = WRITE_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Generate the UTF-8 encoded text of this object as a series of chunks of roughly
+        C{chunkSize} bytes. Chunks are produced as each top-level component is written, so
+        the whole text never exists in memory at once.
+
+        @param chunkSize: the size of the chunks to generate
+        @type chunkSize: C{int}
+        """
+        writer = FoldingWriter(chunkSize=chunkSize)
+        writer.write(self.getBeginDelimiter())
+        writer.write("\r\n")
+        self.writeProperties(writer)
+        for component in self.sortedComponents():
+            component.generate(writer)
+            for chunk in writer.takeChunks():
+                yield chunk
+        writer.write(self.getEndDelimiter())
+        writer.write("\r\n")
+        writer.flush()
+        for chunk in writer.takeChunks():
+            yield chunk
+
+    def writeBytes(self, sink: IO[bytes], chunkSize: int = WRITE_CHUNK_SIZE) -> None:
+        """
+        Write the UTF-8 encoded text of this object to a binary stream in chunks of roughly
+        C{chunkSize} bytes (see L{generateBytes}).
+
+        @param sink: the stream to write to
+        @type sink: C{File-like}
+        @param chunkSize: the size of the chunks to write
+        @type chunkSize: C{int}
+        """
+        for chunk in self.generateBytes(chunkSize):
+            sink.write(chunk)
+
+    def getTextJSON(self, compact: bool = False) -> str:
+        s = StringIO()
+        self.generateJSON(s, compact=compact)
+        return s.getvalue()
+
+    def generateJSON(self, os: IO[str], compact: bool = False, sort_keys: bool = False) -> None:
+        """
+        Write the JSON representation of this object to a text stream with a L{JSONWriter},
+        one component at a time, rather than building it all with L{writeJSON} first.
+
+        @param os: the stream to write to
+        @type os: C{File-like}
+        @param compact: if C{True} do not indent the output
+        @type compact: C{bool}
+        @param sort_keys: if C{True} sort the parameters of each property by name
+        @type sort_keys: C{bool}
+        """
+        JSONWriter(os, compact=compact, sort_keys=sort_keys).writeComponent(self)
+
+    def getTextXML(self) -> str:
+        s = StringIO()
+        self.generateXML(s)
+        return s.getvalue()
+
+    def generateXML(self, os: IO[str]) -> None:
+        """
+        Write the XML representation of this object to a text stream with an L{XMLWriter},
+        one component at a time, rather than building the whole tree with C{writeXML}.
+
+        @param os: the stream to write to
+        @type os: C{File-like}
+        """
+        XMLWriter(os, self.sXMLNamespace).writeDocument(self.sXMLRoot, (self,))
 
     def addDefaultProperties(self) -> None:
         raise NotImplementedError
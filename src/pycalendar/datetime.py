@@ -14,9 +14,14 @@
 #    limitations under the License.
 ##
 
+from pycalendar import utils, xmldefinitions, xmlutils
+from pycalendar.duration import Duration
+from pycalendar.icalendar import definitions
 from pycalendar.timezone import Timezone
 from pycalendar.valueutils import ValueMixin
-from typing import Optional, Any
+from io import StringIO
+from typing import IO, Optional, Any, Union
+import xml.etree.ElementTree as XML
 
 
 class DateTime(ValueMixin):
@@ -35,6 +40,21 @@ class DateTime(ValueMixin):
     ABBREVDATENOYEAR = 4
     NUMERICDATENOYEAR = 5
 
+    __slots__ = (
+        "mYear",
+        "mMonth",
+        "mDay",
+        "mHours",
+        "mMinutes",
+        "mSeconds",
+        "mDateOnly",
+        "mTZUTC",
+        "mTZID",
+        "mTZOffset",
+        "mPosixTimeCached",
+        "mPosixTime",
+    )
+
     mYear: int
     mMonth: int
     mDay: int
@@ -122,6 +142,220 @@ class DateTime(ValueMixin):
     def __hash__(self) -> int:
         return hash(self.getPosixTime())
 
+    def __eq__(self, comp: object) -> bool:
+        return isinstance(comp, DateTime) and self.compareDateTime(comp) == 0
+
+    def __ne__(self, comp: object) -> bool:
+        return not self.__eq__(comp)
+
+    def __ge__(self, comp: "DateTime") -> bool:
+        return self.compareDateTime(comp) >= 0
+
+    def __le__(self, comp: "DateTime") -> bool:
+        return self.compareDateTime(comp) <= 0
+
+    def __gt__(self, comp: "DateTime") -> bool:
+        return self.compareDateTime(comp) > 0
+
+    def __lt__(self, comp: "DateTime") -> bool:
+        return self.compareDateTime(comp) < 0
+
+    def __add__(self, duration: Duration) -> "DateTime":
+        result = self.duplicate()
+        result.mSeconds += duration.getTotalSeconds()
+        result.normalise()
+        return result
+
+    def __sub__(self, dateorduration: Union["DateTime", Duration]) -> Any:
+        if isinstance(dateorduration, DateTime):
+            # A floating value is taken to be in the timezone of the other one
+            copy1 = self.duplicate()
+            copy2 = dateorduration.duplicate()
+            if copy1.floating() and not copy2.floating():
+                copy1.setTimezone(copy2.getTimezone())
+            elif copy2.floating() and not copy1.floating():
+                copy2.setTimezone(copy1.getTimezone())
+            return Duration(duration=copy1.getPosixTime() - copy2.getPosixTime())
+        else:
+            result = self.duplicate()
+            result.mSeconds -= dateorduration.getTotalSeconds()
+            result.normalise()
+            return result
+
+    def compareDateTime(self, comp: Optional["DateTime"]) -> int:
+        if comp is None:
+            return 1
+
+        # If either are date only, then just do date compare
+        if self.mDateOnly or comp.mDateOnly:
+            mine: Any = (self.mYear, self.mMonth, self.mDay,)
+            theirs: Any = (comp.mYear, comp.mMonth, comp.mDay,)
+
+        # If they have the same timezone do simple compare - no posix calc needed
+        elif Timezone.same(self.mTZUTC, self.mTZID, comp.mTZUTC, comp.mTZID):
+            mine = (self.mYear, self.mMonth, self.mDay, self.mHours, self.mMinutes, self.mSeconds,)
+            theirs = (comp.mYear, comp.mMonth, comp.mDay, comp.mHours, comp.mMinutes, comp.mSeconds,)
+
+        else:
+            mine = self.getPosixTime()
+            theirs = comp.getPosixTime()
+
+        return (mine > theirs) - (mine < theirs)
+
+    def getPosixTime(self) -> int:
+        # Look for cached value (or floating time which has to be calculated each time)
+        if not self.mPosixTimeCached or self.floating():
+            result = self.daysSince1970() * 24 * 60 * 60
+            result += (self.mHours * 60 + self.mMinutes) * 60 + self.mSeconds
+
+            # Adjust for timezone offset
+            result -= self.timeZoneSecondsOffset()
+
+            self.mPosixTimeCached = True
+            self.mPosixTime = result
+
+        return self.mPosixTime
+
+    def daysSince1970(self) -> int:
+        # Days in the years since 1970, including the (Gregorian) leap days up to the
+        # start of this year
+        last = self.mYear - 1
+        result = (self.mYear - 1970) * 365 + (last // 4 - last // 100 + last // 400) - 477
+
+        # Add days in the current year up to the current day (includes leap day for
+        # the current year as needed)
+        result += utils.daysUptoMonth(self.mMonth, self.mYear) + self.mDay - 1
+        return result
+
+    def isDateOnly(self) -> bool:
+        return self.mDateOnly
+
+    def getYear(self) -> int:
+        return self.mYear
+
+    def getMonth(self) -> int:
+        return self.mMonth
+
+    def getDay(self) -> int:
+        return self.mDay
+
+    def getHours(self) -> int:
+        return self.mHours
+
+    def getMinutes(self) -> int:
+        return self.mMinutes
+
+    def getSeconds(self) -> int:
+        return self.mSeconds
+
+    def getDayOfWeek(self) -> int:
+        # Count days since 01-Jan-1970 which was a Thursday
+        return (DateTime.THURSDAY + self.daysSince1970()) % 7
+
+    def setYYMMDD(self, year: int, month: int, day: int) -> None:
+        if (self.mYear != year) or (self.mMonth != month) or (self.mDay != day):
+            self.mYear = year
+            self.mMonth = month
+            self.mDay = day
+            self.changed()
+
+    def setHHMMSS(self, hours: int, minutes: int, seconds: int) -> None:
+        if (self.mHours != hours) or (self.mMinutes != minutes) or (self.mSeconds != seconds):
+            self.mHours = hours
+            self.mMinutes = minutes
+            self.mSeconds = seconds
+            self.changed()
+
+    def offsetYear(self, diff_year: int) -> None:
+        self.mYear += diff_year
+        self.normalise()
+
+    def offsetMonth(self, diff_month: int) -> None:
+        self.mMonth += diff_month
+        self.normalise()
+
+    def offsetDay(self, diff_day: int) -> None:
+        self.mDay += diff_day
+        self.normalise()
+
+    def offsetSeconds(self, diff_seconds: int) -> None:
+        self.mSeconds += diff_seconds
+        self.normalise()
+
+    def recur(self, freq: int, interval: int, allow_invalid: bool = False) -> None:
+        """
+        Move on by C{interval} recurrence periods of C{freq}. MONTHLY and YEARLY periods
+        keep the day of the month, so periods without that day (e.g. February after
+        January 31st) are skipped, unless C{allow_invalid} is C{True} in which case the
+        result may be L{invalid}.
+        """
+        if freq == definitions.eRecurrence_MONTHLY or freq == definitions.eRecurrence_YEARLY:
+            months = interval if freq == definitions.eRecurrence_MONTHLY else 12 * interval
+            while True:
+                years, month = divmod(self.mMonth - 1 + months, 12)
+                self.mYear += years
+                self.mMonth = month + 1
+                if allow_invalid or not self.invalid():
+                    break
+            self.changed()
+        elif freq == definitions.eRecurrence_WEEKLY:
+            self.offsetDay(7 * interval)
+        elif freq == definitions.eRecurrence_DAILY:
+            self.offsetDay(interval)
+        elif freq == definitions.eRecurrence_HOURLY:
+            self.offsetSeconds(60 * 60 * interval)
+        elif freq == definitions.eRecurrence_MINUTELY:
+            self.offsetSeconds(60 * interval)
+        else:
+            self.offsetSeconds(interval)
+
+    def invalid(self) -> bool:
+        """
+        Whether the day is past the end of the month, as left by L{recur} with
+        C{allow_invalid}.
+        """
+        return self.mDay > utils.daysInMonth(self.mMonth, self.mYear)
+
+    def normalise(self) -> None:
+        # Normalise the time, carrying into the day
+        adjustment_mins, self.mSeconds = divmod(self.mSeconds, 60)
+        adjustment_hours, self.mMinutes = divmod(self.mMinutes + adjustment_mins, 60)
+        adjustment_days, self.mHours = divmod(self.mHours + adjustment_hours, 24)
+        self.mDay += adjustment_days
+
+        # Wipe the time if date only
+        if self.mDateOnly:
+            self.mSeconds = 0
+            self.mMinutes = 0
+            self.mHours = 0
+
+        # Adjust the month first, since the day adjustment is month dependent
+        adjustment_year, normalised_month = divmod(self.mMonth - 1, 12)
+        self.mMonth = normalised_month + 1
+        self.mYear += adjustment_year
+
+        # Now do days
+        if self.mDay > 0:
+            while self.mDay > utils.daysInMonth(self.mMonth, self.mYear):
+                self.mDay -= utils.daysInMonth(self.mMonth, self.mYear)
+                self.mMonth += 1
+                if self.mMonth > 12:
+                    self.mMonth = 1
+                    self.mYear += 1
+        else:
+            while self.mDay <= 0:
+                self.mMonth -= 1
+                if self.mMonth < 1:
+                    self.mMonth = 12
+                    self.mYear -= 1
+                self.mDay += utils.daysInMonth(self.mMonth, self.mYear)
+
+        self.changed()
+
+    def changed(self) -> None:
+        self.mPosixTimeCached = False
+        self.mTZOffset = None
+
     # ... (restliche Methoden wie gehabt, ggf. mit passenden Typannotationen)
 
     def getTimezoneID(self) -> Optional[str]:
@@ -148,4 +382,83 @@ class DateTime(ValueMixin):
             self.mTZOffset = tz.timeZoneSecondsOffset(self, relative_to_utc)
         return self.mTZOffset
 
+    def floating(self) -> bool:
+        return not self.mTZUTC and not self.mTZID
+
+    def adjustTimezone(self, tzid: "Timezone") -> "DateTime":
+        # Only if different
+        if not tzid.equals(self.getTimezone()):
+            offset_from = self.timeZoneSecondsOffset()
+            self.setTimezone(tzid)
+            offset_to = self.timeZoneSecondsOffset()
+            self.offsetSeconds(offset_to - offset_from)
+        return self
+
+    def adjustToUTC(self) -> "DateTime":
+        if not self.mTZUTC and not self.mDateOnly:
+            offset = self.timeZoneSecondsOffset()
+            self.mTZUTC = True
+            self.mTZID = None
+            self.offsetSeconds(-offset)
+        return self
+
+    def parse(self, data: str, fullISO: bool = False) -> None:
+        # Parse format YYYYMMDD[THHMMSS[Z]], or YYYY-MM-DD[THH:MM:SS[Z]] for full ISO
+        if fullISO:
+            if (
+                len(data) not in (10, 19, 20,) or data[4] != "-" or data[7] != "-" or
+                len(data) > 10 and (data[13] != ":" or data[16] != ":")
+            ):
+                raise ValueError("DateTime: invalid value '%s'" % (data,))
+            data = data[0:4] + data[5:7] + data[8:10] + data[10:13] + data[14:16] + data[17:]
+        if (
+            len(data) not in (8, 15, 16,) or not data[0:8].isdigit() or
+            len(data) > 8 and (data[8] != "T" or not data[9:15].isdigit()) or
+            len(data) == 16 and data[15] != "Z"
+        ):
+            raise ValueError("DateTime: invalid value '%s'" % (data,))
+
+        self.mYear = int(data[0:4])
+        self.mMonth = int(data[4:6])
+        self.mDay = int(data[6:8])
+        if len(data) == 8:
+            self.mDateOnly = True
+            self.mHours = 0
+            self.mMinutes = 0
+            self.mSeconds = 0
+        else:
+            self.mDateOnly = False
+            self.mHours = int(data[9:11])
+            self.mMinutes = int(data[11:13])
+            self.mSeconds = int(data[13:15])
+            self.mTZUTC = len(data) == 16
+            if self.mTZUTC:
+                self.mTZID = None
+        self.changed()
+
+    def generate(self, os: IO[str], fullISO: bool = False) -> None:
+        os.write(("%04d-%02d-%02d" if fullISO else "%04d%02d%02d") % (self.mYear, self.mMonth, self.mDay,))
+        if not self.mDateOnly:
+            os.write(("T%02d:%02d:%02d" if fullISO else "T%02d%02d%02d") % (self.mHours, self.mMinutes, self.mSeconds,))
+            if self.mTZUTC:
+                os.write("Z")
+
+    def getXMLText(self) -> str:
+        os = StringIO()
+        self.generate(os, fullISO=True)
+        return os.getvalue()
+
+    def writeXML(self, node: Any, namespace: Any) -> None:
+        value = XML.SubElement(
+            node,
+            xmlutils.makeTag(namespace, xmldefinitions.value_date if self.isDateOnly() else xmldefinitions.value_date_time)
+        )
+        value.text = self.getXMLText()
+
+    def parseJSON(self, jobject: Any) -> None:
+        self.parse(str(jobject), fullISO=True)
+
+    def writeJSON(self, jobject: Any) -> None:
+        jobject.append(self.getXMLText())
+
     # ... (weitere Methoden wie gehabt)
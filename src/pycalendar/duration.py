@@ -20,6 +20,16 @@ from pycalendar.stringutils import strtoul
 from pycalendar.valueutils import ValueMixin
 
 class Duration(ValueMixin):
+
+    __slots__ = (
+        "mForward",
+        "mWeeks",
+        "mDays",
+        "mHours",
+        "mMinutes",
+        "mSeconds",
+    )
+
     mForward: bool
     mWeeks: int
     mDays: int
@@ -13,7 +13,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##
-from typing import Any, Dict, List, Optional, Set, Tuple, Union, IO
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union, IO
 from io import StringIO
 from pycalendar import xmlutils
 from pycalendar.containerbase import ContainerBase
@@ -28,9 +28,10 @@ from pycalendar.icalendar.property import Property
 from pycalendar.icalendar.validation import ICALENDAR_VALUE_CHECKS
 from pycalendar.parser import ParserContext
 from pycalendar.period import Period
-from pycalendar.utils import readFoldedLine
+from pycalendar.utils import unfoldLines, WRITE_CHUNK_SIZE
+from pycalendar.xmlparser import XMLParser
 import collections
-import json
+import hashlib
 import xml.etree.cElementTree as XML
 
 class Calendar(ContainerBase):
@@ -52,6 +53,9 @@ class Calendar(ContainerBase):
     sFormatText: str = "text/calendar"
     sFormatJSON: str = "application/calendar+json"
 
+    sXMLNamespace: str = xmldefinitions.iCalendar20_namespace
+    sXMLRoot: str = xmldefinitions.icalendar
+
     propertyCardinality_1: Tuple[str, ...] = (
         definitions.cICalProperty_PRODID,
         definitions.cICalProperty_VERSION,
@@ -68,6 +72,7 @@ class Calendar(ContainerBase):
     mDescription: str
     mMasterComponentsByTypeAndUID: Dict[Any, Dict[Any, Any]]
     mOverriddenComponentsByUID: Dict[Any, List[Any]]
+    mSourceDigests: Dict[bytes, List[Any]]
 
     def __init__(self, parent: Optional[Any] = None, add_defaults: bool = True) -> None:
         super(Calendar, self).__init__(add_defaults=add_defaults)
@@ -75,6 +80,7 @@ class Calendar(ContainerBase):
         self.mDescription: str = ""
         self.mMasterComponentsByTypeAndUID: Dict[Any, Dict[Any, Any]] = collections.defaultdict(lambda: collections.defaultdict(list))
         self.mOverriddenComponentsByUID: Dict[Any, List[Any]] = collections.defaultdict(list)
+        self.mSourceDigests: Dict[bytes, List[Any]] = {}
 
     def __str__(self) -> str:
         return self.getText(includeTimezones=Calendar.NO_TIMEZONES)
@@ -83,8 +89,16 @@ class Calendar(ContainerBase):
         other = super(Calendar, self).duplicate()
         other.mName = self.mName
         other.mDescription = self.mDescription
+        # The UID indexes must refer to the copy's own components, but those are themselves
+        # only copied when needed
+        other._unshare()
         return other
 
+    def _unshare(self) -> None:
+        self.mMasterComponentsByTypeAndUID.clear()
+        self.mOverriddenComponentsByUID.clear()
+        super(Calendar, self)._unshare()
+
     def getType(self) -> str:
         return definitions.cICalComponent_VCALENDAR
 
@@ -170,13 +184,11 @@ class Calendar(ContainerBase):
         GET_PROPERTY_OR_COMPONENT = 1
         GOT_VCALENDAR = 4
         state = LOOK_FOR_VCALENDAR
-        lines: List[Optional[str]] = [None, None]
         comp: Any = self
         compend: Optional[str] = None
         componentstack: List[Any] = []
         got_timezone: bool = False
-        while readFoldedLine(ins, lines):
-            line = lines[0]
+        for line in unfoldLines(ins):
             if state == LOOK_FOR_VCALENDAR:
                 if line == self.getBeginDelimiter():
                     state = GET_PROPERTY_OR_COMPONENT
@@ -216,6 +228,218 @@ class Calendar(ContainerBase):
             TimezoneDatabase.mergeTimezones(self, self.getComponents(definitions.cICalComponent_VTIMEZONE))
         return result
 
+    def iterComponents(self, ins: Any) -> Iterator[Tuple[Any, List[Any]]]:
+        """
+        Parse iCalendar data, yielding each top-level component as soon as its END line
+        has been read instead of adding it to this calendar. Each item is a tuple of the
+        finalised component and the list of VTIMEZONE components it references. Top-level
+        properties and VTIMEZONEs are kept in this calendar, so peak memory is bounded by
+        the largest single component rather than by the whole stream. A component that
+        references a VTIMEZONE not read yet is held back (along with those after it, to
+        keep their order) until the VTIMEZONE is read or the calendar ends, so data with
+        its VTIMEZONEs last, or with TZIDs that have no VTIMEZONE, is all held in memory.
+
+        @param ins: the data to parse
+        @type ins: C{str} or C{File-like}
+        """
+        from pycalendar.timezonedb import TimezoneDatabase
+
+        if isinstance(ins, str):
+            ins = StringIO(ins)
+
+        self.setProperties({})
+
+        LOOK_FOR_VCALENDAR = 0
+        GET_PROPERTY_OR_COMPONENT = 1
+        state = LOOK_FOR_VCALENDAR
+        comp: Any = self
+        compend: Optional[str] = None
+        componentstack: List[Any] = []
+        got_calendar: bool = False
+        pending: Deque[Tuple[Any, Set[str]]] = collections.deque()
+
+        def _release(final: bool) -> Iterator[Tuple[Any, List[Any]]]:
+            # Yield the held back components whose VTIMEZONEs have all been read, or all
+            # of them at the end of the calendar
+            while pending:
+                done, tzids = pending[0]
+                tzs = [self.getTimezone(tzid) for tzid in sorted(tzids)]
+                if not final and any([tz is None for tz in tzs]):
+                    break
+                pending.popleft()
+                yield done, [tz for tz in tzs if tz is not None]
+
+        for line in unfoldLines(ins):
+            if state == LOOK_FOR_VCALENDAR:
+                if line == self.getBeginDelimiter():
+                    state = GET_PROPERTY_OR_COMPONENT
+                    got_calendar = True
+                elif len(line) == 0:
+                    if ParserContext.BLANK_LINES_IN_DATA == ParserContext.PARSER_RAISE:
+                        raise InvalidData("iCalendar data has blank lines")
+                else:
+                    raise InvalidData("iCalendar data not recognized", line)
+            elif state == GET_PROPERTY_OR_COMPONENT:
+                if line.startswith("BEGIN:"):
+                    componentstack.append((comp, compend,))
+                    comp = self.sComponentType.makeComponent(line[6:], comp)
+                    compend = comp.getEndDelimiter()
+                elif line == self.getEndDelimiter():
+                    self.finalise()
+                    state = LOOK_FOR_VCALENDAR
+                    for item in _release(True):
+                        yield item
+                elif line == compend:
+                    comp.finalise()
+                    done = comp
+                    parent = componentstack[-1][0]
+                    comp, compend = componentstack.pop()
+                    if parent is not self:
+                        parent.addComponent(done)
+                    elif done.getType() == definitions.cICalComponent_VTIMEZONE:
+                        self.addComponent(done)
+                        TimezoneDatabase.mergeTimezones(self, (done,))
+                        for item in _release(False):
+                            yield item
+                    else:
+                        tzids: Set[str] = set()
+                        done.getTimezones(tzids)
+                        pending.append((done, tzids,))
+                        for item in _release(False):
+                            yield item
+                elif len(line) == 0:
+                    if ParserContext.BLANK_LINES_IN_DATA == ParserContext.PARSER_RAISE:
+                        raise InvalidData("iCalendar data has blank lines")
+                else:
+                    prop = self.sPropertyType.parseText(line)
+                    if comp is self:
+                        if not self.validProperty(prop):
+                            raise InvalidData("Invalid property", str(prop))
+                    comp.addProperty(prop)
+        if state != LOOK_FOR_VCALENDAR:
+            raise InvalidData("iCalendar data not complete")
+        if got_calendar and not self.hasProperty(definitions.cICalProperty_VERSION):
+            raise InvalidData("iCalendar missing VERSION")
+
+    @classmethod
+    def parseTextIncremental(cls, data: Any, previous: Optional["Calendar"] = None) -> Optional["Calendar"]:
+        """
+        Parse iCalendar data re-using the top-level components of a previously parsed version
+        of the same resource. The text of each top-level component is hashed and only the
+        components whose text is not present in C{previous} are parsed - the others are moved
+        over from C{previous}, together with any recurrence expansions they have cached. This
+        makes re-parsing a resource where only one override has changed cheap.
+
+        Only calendars returned by this method record the hashes needed, so the first version
+        of a resource should be parsed with C{previous} set to C{None}. C{previous} must not
+        have been changed since it was parsed, and must not be used after this call.
+
+        @param data: the data to parse
+        @type data: C{str} or C{File-like}
+        @param previous: the calendar parsed from the previous version of the data
+        @type previous: L{Calendar}
+        """
+
+        if isinstance(data, str):
+            data = StringIO(data)
+        reuse: Dict[bytes, List[Any]] = {}
+        if previous is not None:
+            reuse = dict([(digest, components[:]) for digest, components in previous.mSourceDigests.items()])
+        reused: List[Any] = []
+
+        cal = cls(add_defaults=False)
+        LOOK_FOR_VCALENDAR = 0
+        GET_PROPERTY_OR_COMPONENT = 1
+        GET_COMPONENT_LINES = 2
+        state = LOOK_FOR_VCALENDAR
+        result = False
+        lines: List[str] = []
+        compend: Optional[str] = None
+        for line in unfoldLines(data):
+            if state == LOOK_FOR_VCALENDAR:
+                if line == cal.getBeginDelimiter():
+                    state = GET_PROPERTY_OR_COMPONENT
+                    result = True
+                elif len(line) == 0:
+                    if ParserContext.BLANK_LINES_IN_DATA == ParserContext.PARSER_RAISE:
+                        raise InvalidData("iCalendar data has blank lines")
+                else:
+                    raise InvalidData("iCalendar data not recognized", line)
+            elif state == GET_COMPONENT_LINES:
+                lines.append(line)
+                if line == compend:
+                    # Nested components with the same name are not allowed, so this is the end
+                    # of the top-level component
+                    digest = hashlib.sha1("\r\n".join(lines).encode("utf-8")).digest()
+                    if reuse.get(digest):
+                        comp = reuse[digest].pop()
+                        reused.append(comp)
+                    else:
+                        comp = cal._parseComponentLines(lines)
+                    cal.addComponent(comp)
+                    cal.mSourceDigests.setdefault(digest, []).append(comp)
+                    lines = []
+                    state = GET_PROPERTY_OR_COMPONENT
+            elif state == GET_PROPERTY_OR_COMPONENT:
+                if line.startswith("BEGIN:"):
+                    lines.append(line)
+                    compend = "END:" + line[6:]
+                    state = GET_COMPONENT_LINES
+                elif line == cal.getEndDelimiter():
+                    cal.finalise()
+                    state = LOOK_FOR_VCALENDAR
+                elif len(line) == 0:
+                    if ParserContext.BLANK_LINES_IN_DATA == ParserContext.PARSER_RAISE:
+                        raise InvalidData("iCalendar data has blank lines")
+                else:
+                    prop = cal.sPropertyType.parseText(line)
+                    if not cal.validProperty(prop):
+                        raise InvalidData("Invalid property", str(prop))
+                    cal.addProperty(prop)
+
+        if state != LOOK_FOR_VCALENDAR:
+            raise InvalidData("iCalendar data not complete")
+        if not result:
+            return None
+        if not cal.hasProperty(definitions.cICalProperty_VERSION):
+            raise InvalidData("iCalendar missing VERSION")
+
+        # Only take over the unchanged components once the new data has been parsed successfully
+        for comp in reused:
+            comp.setParentComponent(cal)
+        if previous is not None:
+            previous.mSourceDigests = {}
+        from pycalendar.timezonedb import TimezoneDatabase
+        TimezoneDatabase.mergeTimezones(cal, cal.getComponents(definitions.cICalComponent_VTIMEZONE))
+        return cal
+
+    def _parseComponentLines(self, lines: List[str]) -> Any:
+        """
+        Parse the unfolded lines of a single top-level component, from its BEGIN line to its
+        END line.
+        """
+        comp: Any = self
+        compend: Optional[str] = None
+        componentstack: List[Any] = []
+        for line in lines:
+            if line.startswith("BEGIN:"):
+                componentstack.append((comp, compend,))
+                comp = self.sComponentType.makeComponent(line[6:], comp)
+                compend = comp.getEndDelimiter()
+            elif line == compend:
+                comp.finalise()
+                done = comp
+                comp, compend = componentstack.pop()
+                if comp is self:
+                    return done
+                comp.addComponent(done)
+            elif len(line) == 0:
+                if ParserContext.BLANK_LINES_IN_DATA == ParserContext.PARSER_RAISE:
+                    raise InvalidData("iCalendar data has blank lines")
+            else:
+                comp.addProperty(self.sPropertyType.parseText(line))
+        raise InvalidData("iCalendar data not complete")
+
     def addComponent(self, component: Any) -> None:
         super(Calendar, self).addComponent(component)
         if isinstance(component, ComponentRecur):
@@ -236,6 +460,44 @@ class Calendar(ContainerBase):
             else:
                 del self.mMasterComponentsByTypeAndUID[component.getType()][uid]
 
+    @staticmethod
+    def diffKey(component: Any) -> Tuple[Any, ...]:
+        """
+        The key used by L{diff} for a top-level component: the type, UID and RECURRENCE-ID
+        text for components that can recur, or the type and map key (e.g. the TZID of a
+        VTIMEZONE) for others.
+        """
+        if isinstance(component, ComponentRecur):
+            rid = component.getRecurrenceID().getText() if component.isRecurrenceInstance() else None
+            return (component.getType(), component.getUID(), rid,)
+        else:
+            return (component.getType(), component.getMapKey(), None,)
+
+    def diff(self, other: "Calendar") -> Tuple[Dict[Tuple[Any, ...], Any], Dict[Tuple[Any, ...], Any], Dict[Tuple[Any, ...], Tuple[Any, Any]]]:
+        """
+        Compare the top-level components of this calendar with those of another version of it.
+        Components are matched by L{diffKey} and compared using their structural hashes, so
+        no pairwise comparisons of components are needed.
+
+        Returns a tuple of three C{dict}s, all keyed by L{diffKey}: the components only in
+        C{other}, the components only in this calendar, and a tuple of this calendar's and
+        C{other}'s version of each component that differs.
+
+        @param other: the calendar to compare with
+        @type other: L{Calendar}
+        """
+        mine = dict([(self.diffKey(component), component) for component in self.mComponents])
+        theirs = dict([(self.diffKey(component), component) for component in other.mComponents])
+
+        added = dict([(key, component) for key, component in theirs.items() if key not in mine])
+        removed = dict([(key, component) for key, component in mine.items() if key not in theirs])
+        changed: Dict[Tuple[Any, ...], Tuple[Any, Any]] = {}
+        for key, component in mine.items():
+            another = theirs.get(key)
+            if another is not None and component.structuralHash() != another.structuralHash():
+                changed[key] = (component, another,)
+        return added, removed, changed
+
     def deriveComponent(self, recurrenceID: DateTime) -> Optional[ComponentRecur]:
         master = self.masterComponent()
         if master is None:
@@ -290,9 +552,33 @@ class Calendar(ContainerBase):
         self.includeMissingTimezones(includeTimezones=includeTimezones)
         super(Calendar, self).generate(os)
 
+    def generateBytes(self, chunkSize: int = WRITE_CHUNK_SIZE, includeTimezones: Optional[int] = None) -> Iterator[bytes]:
+        self.includeMissingTimezones(includeTimezones=includeTimezones)
+        return super(Calendar, self).generateBytes(chunkSize)
+
+    def writeBytes(self, sink: IO[bytes], chunkSize: int = WRITE_CHUNK_SIZE, includeTimezones: Optional[int] = None) -> None:
+        for chunk in self.generateBytes(chunkSize, includeTimezones=includeTimezones):
+            sink.write(chunk)
+
+    @classmethod
+    def iterXMLComponents(cls, data: Any) -> Iterator[Component]:
+        """
+        Parse xCal data one component at a time (see L{XMLParser.iterComponents}). The
+        VTIMEZONEs are kept in the calendar that is the parent of each component.
+
+        @param data: the data to parse, or the path of a file to parse
+        @type data: C{str} or C{File-like}
+        """
+        return XMLParser.forContainer(cls).iterComponents(data, keep=(definitions.cICalComponent_VTIMEZONE,))
+
     def getTextXML(self, includeTimezones: Optional[int] = None) -> str:
-        node = self.writeXML(includeTimezones)
-        return xmlutils.toString(node)
+        s = StringIO()
+        self.generateXML(s, includeTimezones=includeTimezones)
+        return s.getvalue()
+
+    def generateXML(self, os: IO[str], includeTimezones: Optional[int] = None) -> None:
+        self.includeMissingTimezones(includeTimezones=includeTimezones)
+        super(Calendar, self).generateXML(os)
 
     def writeXML(self, includeTimezones: Optional[int] = None) -> Any:
         self.includeMissingTimezones(includeTimezones=includeTimezones)
@@ -300,10 +586,14 @@ class Calendar(ContainerBase):
         super(Calendar, self).writeXML(root, xmldefinitions.iCalendar20_namespace)
         return root
 
-    def getTextJSON(self, includeTimezones: Optional[int] = None, sort_keys: bool = False) -> str:
-        jobject: List[Any] = []
-        self.writeJSON(jobject, includeTimezones)
-        return json.dumps(jobject[0], indent=2, separators=(',', ':'), sort_keys=sort_keys)
+    def getTextJSON(self, includeTimezones: Optional[int] = None, sort_keys: bool = False, compact: bool = False) -> str:
+        s = StringIO()
+        self.generateJSON(s, compact=compact, sort_keys=sort_keys, includeTimezones=includeTimezones)
+        return s.getvalue()
+
+    def generateJSON(self, os: IO[str], compact: bool = False, sort_keys: bool = False, includeTimezones: Optional[int] = None) -> None:
+        self.includeMissingTimezones(includeTimezones=includeTimezones)
+        super(Calendar, self).generateJSON(os, compact=compact, sort_keys=sort_keys)
 
     def writeJSON(self, jobject: list, includeTimezones: Optional[int] = None) -> None:
         self.includeMissingTimezones(includeTimezones=includeTimezones)
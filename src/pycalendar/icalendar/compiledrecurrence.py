@@ -0,0 +1,317 @@
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+"""
+Recurrence rules compiled into lookup tables.
+
+Which days of a year match the BYMONTH, BYMONTHDAY, BYYEARDAY and BYDAY parts of a rule
+depends only on the length of the year and the weekday of January 1st, so there are just
+fourteen possible answers. A L{CompiledRecurrence} works each one out the first time it
+is needed and then expands every later period with table lookups, rather than
+re-interpreting the BYxxx lists for every period.
+"""
+
+from pycalendar import utils
+from pycalendar.icalendar import definitions
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+# A date-time as (year, month, day, hours, minutes, seconds)
+DateTimeFields = Tuple[int, int, int, int, int, int]
+
+
+def jan1Weekday(year: int) -> int:
+    """
+    The weekday of January 1st in a year, with Sunday as 0 (as in the
+    C{eRecurrence_WEEKDAY_xx} values).
+    """
+    y = year - 1
+    return (1 + 5 * (y % 4) + 4 * (y % 100) + 6 * (y % 400)) % 7
+
+
+class YearCalendar(object):
+    """
+    The month, day of the month and weekday of each day of a year, for a year of a
+    particular length starting on a particular weekday. Days of the year are numbered from
+    0.
+    """
+
+    sCalendars: Dict[Tuple[bool, int], "YearCalendar"] = {}
+
+    @classmethod
+    def forYear(cls, year: int) -> "YearCalendar":
+        key = (utils.isLeapYear(year), jan1Weekday(year),)
+        calendar = cls.sCalendars.get(key)
+        if calendar is None:
+            calendar = cls.sCalendars[key] = cls(*key)
+        return calendar
+
+    def __init__(self, leap: bool, jan1: int) -> None:
+        self.mKey = (leap, jan1,)
+        self.mMonthLengths = utils.days_in_month_leap if leap else utils.days_in_month
+        self.mMonthStarts = utils.days_upto_month_leap if leap else utils.days_upto_month
+        self.mLength = 366 if leap else 365
+        self.mMonths: List[int] = []
+        self.mDays: List[int] = []
+        for month in range(1, 13):
+            self.mMonths.extend([month] * self.mMonthLengths[month])
+            self.mDays.extend(range(1, self.mMonthLengths[month] + 1))
+        self.mWeekdays = [(jan1 + yday) % 7 for yday in range(self.mLength)]
+
+    def yearDay(self, month: int, day: int) -> int:
+        return self.mMonthStarts[month] + day - 1
+
+
+class CompiledRecurrence(object):
+    """
+    The day-level BYxxx parts of a L{Recurrence} turned into a table for each kind of year,
+    plus the list of times of day from the BYHOUR, BYMINUTE and BYSECOND parts, for a
+    particular start. Use L{Recurrence.compile} to get the (cached) compiled form of a
+    rule.
+
+    DAILY, WEEKLY, MONTHLY and YEARLY rules are compiled, except for rules with BYWEEKNO, and
+    MONTHLY or WEEKLY rules with BYYEARDAY (or WEEKLY rules with BYMONTHDAY), which are
+    expanded the normal way. Sub-daily frequencies are never compiled.
+
+    The tables hold:
+        - YEARLY: the sorted days of the year of each instance.
+        - MONTHLY: the sorted days of the month of each instance, for each month.
+        - WEEKLY and DAILY: a bitmask of the days of the year allowed by the BYxxx limits.
+    """
+
+    @classmethod
+    def canCompile(cls, recur: Any) -> bool:
+        if recur.mByWeekNo:
+            return False
+        if recur.mFreq in (definitions.eRecurrence_YEARLY, definitions.eRecurrence_DAILY,):
+            return True
+        elif recur.mFreq == definitions.eRecurrence_MONTHLY:
+            return not recur.mByYearDay
+        elif recur.mFreq == definitions.eRecurrence_WEEKLY:
+            return not recur.mByYearDay and not recur.mByMonthDay
+        else:
+            return False
+
+    def __init__(self, recur: Any, start: DateTimeFields) -> None:
+        """
+        @param recur: the rule to compile
+        @type recur: L{Recurrence}
+        @param start: the start of the recurrence (DTSTART)
+        @type start: C{tuple} of (year, month, day, hours, minutes, seconds)
+        """
+        self.mStart = start
+        self.mFreq: int = recur.mFreq
+        self.mByMonth: Optional[FrozenSet[int]] = frozenset(recur.mByMonth) if recur.mByMonth else None
+        self.mByMonthDay: Optional[Tuple[int, ...]] = tuple(recur.mByMonthDay) if recur.mByMonthDay else None
+        self.mByYearDay: Optional[Tuple[int, ...]] = tuple(recur.mByYearDay) if recur.mByYearDay else None
+        self.mByDay: Optional[Tuple[Tuple[int, int], ...]] = tuple(recur.mByDay) if recur.mByDay else None
+        self.mBySetPos: Optional[Tuple[int, ...]] = tuple(recur.mBySetPos) if recur.mBySetPos else None
+        self.mWeekstart: int = recur.mWeekstart
+
+        # Times of day in order, defaulting to the time of the start
+        hours = sorted(set(recur.mByHours)) if recur.mByHours else [start[3]]
+        minutes = sorted(set(recur.mByMinutes)) if recur.mByMinutes else [start[4]]
+        seconds = sorted(set(recur.mBySeconds)) if recur.mBySeconds else [start[5]]
+        self.mTimes: List[Tuple[int, int, int]] = [(h, m, s) for h in hours for m in minutes for s in seconds]
+
+        # Days of the week for WEEKLY rules, as offsets from the start of the week
+        if self.mFreq == definitions.eRecurrence_WEEKLY:
+            if self.mByDay:
+                weekdays = set([weekday for _ignore, weekday in self.mByDay])
+            else:
+                calendar = YearCalendar.forYear(start[0])
+                weekdays = set([calendar.mWeekdays[calendar.yearDay(start[1], start[2])]])
+            self.mWeekOffsets: List[int] = sorted([(weekday - self.mWeekstart) % 7 for weekday in weekdays])
+
+        # Keyed by (leap year, weekday of Jan 1st)
+        self.mTables: Dict[Tuple[bool, int], Any] = {}
+
+    def expandPeriod(self, year: int, month: int, day: int) -> List[DateTimeFields]:
+        """
+        Get the instances, in order, for the FREQ period that contains a date.
+
+        @param year: the year of the date
+        @type year: C{int}
+        @param month: the month of the date
+        @type month: C{int}
+        @param day: the day of the month of the date
+        @type day: C{int}
+        """
+        calendar = YearCalendar.forYear(year)
+        table = self.mTables.get(calendar.mKey)
+        if table is None:
+            table = self.mTables[calendar.mKey] = self.buildTable(calendar)
+
+        dates: List[Tuple[int, int, int]]
+        if self.mFreq == definitions.eRecurrence_YEARLY:
+            dates = [(year, calendar.mMonths[yday], calendar.mDays[yday],) for yday in table]
+        elif self.mFreq == definitions.eRecurrence_MONTHLY:
+            dates = [(year, month, mday,) for mday in table[month]]
+        elif self.mFreq == definitions.eRecurrence_WEEKLY:
+            yday = calendar.yearDay(month, day)
+            week_start = yday - (calendar.mWeekdays[yday] - self.mWeekstart) % 7
+            dates = []
+            for offset in self.mWeekOffsets:
+                date = self.dateForYearDay(year, week_start + offset)
+                if date is not None:
+                    dates.append(date)
+        else:
+            dates = [(year, month, day,)] if table >> calendar.yearDay(month, day) & 1 else []
+
+        results = [date + time for date in dates for time in self.mTimes]
+        if self.mBySetPos and results:
+            results = self.bySetPos(results)
+        return results
+
+    def dateForYearDay(self, year: int, yday: int) -> Optional[Tuple[int, int, int]]:
+        """
+        Get the date of a day of the year, which may be before the start or after the end
+        of the year, if it is allowed by the limits in the table for its year.
+        """
+        calendar = YearCalendar.forYear(year)
+        if yday < 0:
+            year -= 1
+            calendar = YearCalendar.forYear(year)
+            yday += calendar.mLength
+        elif yday >= calendar.mLength:
+            yday -= calendar.mLength
+            year += 1
+            calendar = YearCalendar.forYear(year)
+
+        table = self.mTables.get(calendar.mKey)
+        if table is None:
+            table = self.mTables[calendar.mKey] = self.buildTable(calendar)
+        if table >> yday & 1:
+            return (year, calendar.mMonths[yday], calendar.mDays[yday],)
+        else:
+            return None
+
+    def bySetPos(self, items: List[DateTimeFields]) -> List[DateTimeFields]:
+        results = set()
+        for pos in self.mBySetPos:
+            if 0 < pos <= len(items):
+                results.add(items[pos - 1])
+            elif 0 < -pos <= len(items):
+                results.add(items[pos])
+        return sorted(results)
+
+    def buildTable(self, calendar: YearCalendar) -> Any:
+        if self.mFreq == definitions.eRecurrence_YEARLY:
+            return self.buildYearlyTable(calendar)
+        elif self.mFreq == definitions.eRecurrence_MONTHLY:
+            return self.buildMonthlyTable(calendar)
+        else:
+            return self.buildLimitTable(calendar)
+
+    def buildYearlyTable(self, calendar: YearCalendar) -> Tuple[int, ...]:
+        months = sorted(self.mByMonth) if self.mByMonth else None
+        if self.mByYearDay or self.mByMonthDay:
+            ydays = set(range(calendar.mLength))
+            if self.mByYearDay:
+                ydays &= self.matchYearDays(calendar)
+            if self.mByMonthDay:
+                ydays &= self.matchMonthDays(calendar)
+            if self.mByDay:
+                ydays &= self.matchDays(calendar, months)
+        elif self.mByDay:
+            ydays = self.matchDays(calendar, months)
+        else:
+            # The day of the start in the start month, or in each BYMONTH month
+            day = self.mStart[2]
+            ydays = set([
+                calendar.yearDay(month, day) for month in (months or [self.mStart[1]])
+                if day <= calendar.mMonthLengths[month]
+            ])
+
+        if months:
+            ydays = set([yday for yday in ydays if calendar.mMonths[yday] in self.mByMonth])
+        return tuple(sorted(ydays))
+
+    def buildMonthlyTable(self, calendar: YearCalendar) -> Tuple[Tuple[int, ...], ...]:
+        results: List[Tuple[int, ...]] = [()]
+        for month in range(1, 13):
+            if self.mByMonth and month not in self.mByMonth:
+                results.append(())
+                continue
+            start = calendar.mMonthStarts[month]
+            if self.mByMonthDay:
+                ydays = self.matchMonthDays(calendar, (month,))
+                if self.mByDay:
+                    ydays &= self.matchDays(calendar, (month,))
+            elif self.mByDay:
+                ydays = self.matchDays(calendar, (month,))
+            elif self.mStart[2] <= calendar.mMonthLengths[month]:
+                ydays = set([start + self.mStart[2] - 1])
+            else:
+                ydays = set()
+            results.append(tuple(sorted([yday - start + 1 for yday in ydays])))
+        return tuple(results)
+
+    def buildLimitTable(self, calendar: YearCalendar) -> int:
+        ydays = set(range(calendar.mLength))
+        if self.mByMonth:
+            ydays = set([yday for yday in ydays if calendar.mMonths[yday] in self.mByMonth])
+        if self.mFreq == definitions.eRecurrence_DAILY:
+            if self.mByYearDay:
+                ydays &= self.matchYearDays(calendar)
+            if self.mByMonthDay:
+                ydays &= self.matchMonthDays(calendar)
+            if self.mByDay:
+                weekdays = set([weekday for _ignore, weekday in self.mByDay])
+                ydays = set([yday for yday in ydays if calendar.mWeekdays[yday] in weekdays])
+        mask = 0
+        for yday in ydays:
+            mask |= 1 << yday
+        return mask
+
+    def matchYearDays(self, calendar: YearCalendar) -> Set[int]:
+        results: Set[int] = set()
+        for yearday in self.mByYearDay:
+            yday = yearday - 1 if yearday > 0 else calendar.mLength + yearday
+            if 0 <= yday < calendar.mLength:
+                results.add(yday)
+        return results
+
+    def matchMonthDays(self, calendar: YearCalendar, months: Sequence[int] = range(1, 13)) -> Set[int]:
+        results: Set[int] = set()
+        for month in months:
+            length = calendar.mMonthLengths[month]
+            for monthday in self.mByMonthDay:
+                day = monthday if monthday > 0 else length + monthday + 1
+                if 1 <= day <= length:
+                    results.add(calendar.yearDay(month, day))
+        return results
+
+    def matchDays(self, calendar: YearCalendar, months: Optional[Sequence[int]]) -> Set[int]:
+        """
+        Get the days matching BYDAY. An ordinal counts within each month if C{months} is
+        specified, otherwise within the year.
+        """
+        if months:
+            ranges = [(calendar.mMonthStarts[month], calendar.mMonthStarts[month] + calendar.mMonthLengths[month]) for month in months]
+        else:
+            ranges = [(0, calendar.mLength)]
+
+        results: Set[int] = set()
+        for first, last in ranges:
+            for ordinal, weekday in self.mByDay:
+                ydays = [yday for yday in range(first, last) if calendar.mWeekdays[yday] == weekday]
+                if ordinal == 0:
+                    results.update(ydays)
+                elif 0 < ordinal <= len(ydays):
+                    results.add(ydays[ordinal - 1])
+                elif 0 < -ordinal <= len(ydays):
+                    results.add(ydays[ordinal])
+        return results
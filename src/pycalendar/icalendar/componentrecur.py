@@ -126,6 +126,11 @@ class ComponentRecur(Component):
         other._resetRecurrenceSet()
         return other
 
+    def _unshare(self) -> None:
+        super(ComponentRecur, self)._unshare()
+        # The recurrence set refers to the values of the properties that were shared
+        self._resetRecurrenceSet()
+
     def canGenerateInstance(self) -> bool:
         return not self.mHasRecurrenceID
 
@@ -191,6 +196,8 @@ class ComponentRecur(Component):
         return (self.mRecurrences is not None) and self.mRecurrences.hasRecurrence()
 
     def getRecurrenceSet(self) -> Optional[RecurrenceSet]:
+        # The rules are changed in place, so they must be this component's own
+        self.unshare()
         return self.mRecurrences
 
     def setUID(self, uid: str) -> None:
@@ -255,7 +262,7 @@ class ComponentRecur(Component):
             self.mRecurrenceID = self.loadValueDateTime(definitions.cICalProperty_RECURRENCE_ID)
         if self.mHasRecurrenceID:
             self.mMapKey = self.mapKey(self.mUID, self.mRecurrenceID.getText())
-            attrs = self.findFirstProperty(definitions.cICalProperty_RECURRENCE_ID).getParameters()
+            attrs = self.mProperties[definitions.cICalProperty_RECURRENCE_ID][0].getParameters()
             if definitions.cICalParameter_RANGE in attrs:
                 self.mAdjustFuture = (attrs[definitions.cICalParameter_RANGE][0].getFirstValue() == definitions.cICalParameter_RANGE_THISANDFUTURE)
                 self.mAdjustPrior = (attrs[definitions.cICalParameter_RANGE][0].getFirstValue() == definitions.cICalParameter_RANGE_THISANDPRIOR)
@@ -147,6 +147,8 @@ class Property(PropertyBase):
         definitions.cICalProperty_REQUEST_STATUS: Value.VALUETYPE_REQUEST_STATUS,
     }
 
+    sPropertyNames, sParameterNames = PropertyBase.makeNameTables(definitions, "cICalProperty_", "cICalParameter_")
+
     sVariant: str = "ical"
     sValue: str = definitions.cICalParameter_VALUE
     sText: str = definitions.cICalValue_TEXT
@@ -187,24 +189,25 @@ class Property(PropertyBase):
         other = Property(self.mName)
         for attrname, attrs in self.mParameters.items():
             other.mParameters[attrname] = [i.duplicate() for i in attrs]
-        other.mValue = self.mValue.duplicate()
+        self._duplicateValue(other)
         return other
 
     def __hash__(self) -> int:
         return hash((
             self.mName,
             tuple([tuple(self.mParameters[attrname]) for attrname in sorted(self.mParameters.keys())]),
-            self.mValue,
+            self.getValue(),
         ))
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Property):
             return False
-        return self.mName == other.mName and self.mValue == other.mValue and self.mParameters == other.mParameters
+        return self.mName == other.mName and self.getValue() == other.getValue() and self.mParameters == other.mParameters
 
     def getRecurrenceValue(self) -> Optional[RecurrenceValue]:
-        if isinstance(self.mValue, RecurrenceValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, RecurrenceValue):
+            return value
         else:
             return None
 
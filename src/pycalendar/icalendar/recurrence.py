@@ -13,10 +13,12 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##
-from typing import Any, Dict, List, Optional, Tuple, Union, IO
-from pycalendar import xmlutils
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union, IO
+from pycalendar import utils, xmlutils
 from pycalendar.datetime import DateTime
 from pycalendar.icalendar import definitions, xmldefinitions
+from pycalendar.icalendar.compiledrecurrence import CompiledRecurrence
+from pycalendar.icalendar.recurrencecache import RecurrenceCache
 from pycalendar.icalendar.exceptions import TooManyInstancesError
 from pycalendar.period import Period
 from pycalendar.valueutils import ValueMixin
@@ -87,6 +89,7 @@ class Recurrence(ValueMixin):
     }
 
     cWeekdayRecurMap: Dict[int, str] = dict([(v, k) for k, v in cWeekdayMap.items()])
+    cFreqRecurMap: Dict[int, str] = dict([(v, k) for k, v in cFreqMap.items()])
     cUnknownIndex: int = -1
 
     mFreq: int
@@ -110,6 +113,7 @@ class Recurrence(ValueMixin):
     mCacheUpto: Optional[DateTime]
     mFullyCached: bool
     mRecurrences: Optional[List[Any]]
+    mCompiled: Optional[CompiledRecurrence]
 
     def __init__(self) -> None:
         self.init_Recurrence()
@@ -140,6 +144,7 @@ class Recurrence(ValueMixin):
         other.mCacheUpto = self.mCacheUpto.duplicate() if self.mCacheUpto else None
         other.mFullyCached = self.mFullyCached
         other.mRecurrences = self.mRecurrences[:] if self.mRecurrences else None
+        other.mCompiled = self.mCompiled
         return other
 
     def init_Recurrence(self) -> None:
@@ -164,14 +169,21 @@ class Recurrence(ValueMixin):
         self.mCacheUpto = None
         self.mFullyCached = False
         self.mRecurrences = None
+        self.mCompiled = None
 
     def __hash__(self) -> int:
-        return hash((
+        return hash(self.hashKey())
+
+    def hashKey(self) -> Tuple[Any, ...]:
+        """
+        Get a key made from the content of this rule, which is equal for equal rules.
+        """
+        return (
             self.mFreq,
             self.mUseCount,
             self.mCount,
             self.mUseUntil,
-            self.mUntil,
+            self.mUntil.getText() if self.mUseUntil and self.mUntil is not None else None,
             self.mInterval,
             tuple(self.mBySeconds) if self.mBySeconds else None,
             tuple(self.mByMinutes) if self.mByMinutes else None,
@@ -183,7 +195,7 @@ class Recurrence(ValueMixin):
             tuple(self.mByMonth) if self.mByMonth else None,
             tuple(self.mBySetPos) if self.mBySetPos else None,
             self.mWeekstart,
-        ))
+        )
 
     def __ne__(self, other: Any) -> bool:
         return not self.__eq__(other)
@@ -247,6 +259,14 @@ class Recurrence(ValueMixin):
                 return False
         return True
 
+    def clear(self) -> None:
+        self.mCached = False
+        self.mCacheStart = None
+        self.mCacheUpto = None
+        self.mFullyCached = False
+        self.mRecurrences = None
+        self.mCompiled = None
+
     def _setAndclearIfChanged(self, attr: str, value: Any) -> None:
         if getattr(self, attr) != value:
             self.clear()
@@ -318,4 +338,821 @@ class Recurrence(ValueMixin):
     def setBySetPos(self, by: List[int]) -> None:
         self._setAndclearIfChanged("mBySetPos", by[:])
 
+    def hasBy(self) -> bool:
+        return bool(
+            self.mBySeconds or self.mByMinutes or self.mByHours or self.mByDay or
+            self.mByMonthDay or self.mByYearDay or self.mByWeekNo or self.mByMonth or
+            self.mBySetPos
+        )
+
+    def parse(self, data: str) -> None:
+        self.init_Recurrence()
+
+        for token in data.split(";"):
+            try:
+                tname, tvalue = token.split("=")
+            except ValueError:
+                raise ValueError("Recurrence: Invalid token '%s'" % (token,))
+
+            # Determine token type
+            index = Recurrence.cRecurMap.get(tname, Recurrence.cUnknownIndex)
+            if index == Recurrence.cUnknownIndex:
+                raise ValueError("Recurrence: Invalid token '%s'" % (tname,))
+
+            # Parse remainder based on index
+            if index == definitions.eRecurrence_FREQ:
+                self.mFreq = Recurrence.cFreqMap.get(tvalue, Recurrence.cUnknownIndex)
+                if self.mFreq == Recurrence.cUnknownIndex:
+                    raise ValueError("Recurrence: Invalid FREQ value")
+
+            elif index == definitions.eRecurrence_UNTIL:
+                if self.mUseCount:
+                    raise ValueError("Recurrence: Can't have both UNTIL and COUNT")
+                self.mUseUntil = True
+                self.mUntil = DateTime()
+                try:
+                    self.mUntil.parse(tvalue)
+                except ValueError:
+                    raise ValueError("Recurrence: Invalid UNTIL value")
+
+            elif index == definitions.eRecurrence_COUNT:
+                if self.mUseUntil:
+                    raise ValueError("Recurrence: Can't have both UNTIL and COUNT")
+                self.mUseCount = True
+                self.mCount = self.parseNumber(tvalue, 1, None, "Recurrence: Invalid COUNT value")
+
+            elif index == definitions.eRecurrence_INTERVAL:
+                self.mInterval = self.parseNumber(tvalue, 1, None, "Recurrence: Invalid INTERVAL value")
+
+            elif index == definitions.eRecurrence_BYSECOND:
+                self.mBySeconds = self.parseList(tvalue, 0, 60, False, "Recurrence: Invalid BYSECOND value")
+
+            elif index == definitions.eRecurrence_BYMINUTE:
+                self.mByMinutes = self.parseList(tvalue, 0, 59, False, "Recurrence: Invalid BYMINUTE value")
+
+            elif index == definitions.eRecurrence_BYHOUR:
+                self.mByHours = self.parseList(tvalue, 0, 23, False, "Recurrence: Invalid BYHOUR value")
+
+            elif index == definitions.eRecurrence_BYDAY:
+                self.mByDay = self.parseListDW(tvalue, "Recurrence: Invalid BYDAY value")
+
+            elif index == definitions.eRecurrence_BYMONTHDAY:
+                self.mByMonthDay = self.parseList(tvalue, 1, 31, True, "Recurrence: Invalid BYMONTHDAY value")
+
+            elif index == definitions.eRecurrence_BYYEARDAY:
+                self.mByYearDay = self.parseList(tvalue, 1, 366, True, "Recurrence: Invalid BYYEARDAY value")
+
+            elif index == definitions.eRecurrence_BYWEEKNO:
+                self.mByWeekNo = self.parseList(tvalue, 1, 53, True, "Recurrence: Invalid BYWEEKNO value")
+
+            elif index == definitions.eRecurrence_BYMONTH:
+                self.mByMonth = self.parseList(tvalue, 1, 12, False, "Recurrence: Invalid BYMONTH value")
+
+            elif index == definitions.eRecurrence_BYSETPOS:
+                self.mBySetPos = self.parseList(tvalue, 1, 366, True, "Recurrence: Invalid BYSETPOS value")
+
+            elif index == definitions.eRecurrence_WKST:
+                self.mWeekstart = Recurrence.cWeekdayMap.get(tvalue, Recurrence.cUnknownIndex)
+                if self.mWeekstart == Recurrence.cUnknownIndex:
+                    raise ValueError("Recurrence: Invalid WKST value")
+
+    def parseNumber(self, txt: str, min: Optional[int], max: Optional[int], errmsg: str, allowNegative: bool = False) -> int:
+        try:
+            value = int(txt)
+        except ValueError:
+            raise ValueError(errmsg)
+        if not allowNegative and value < 0:
+            raise ValueError(errmsg)
+        avalue = abs(value)
+        if (min is not None and avalue < min) or (max is not None and avalue > max):
+            raise ValueError(errmsg)
+        return value
+
+    def parseList(self, txt: str, min: int, max: int, allowNegative: bool, errmsg: str) -> List[int]:
+        return [self.parseNumber(token, min, max, errmsg, allowNegative) for token in txt.split(",")]
+
+    def parseListDW(self, txt: str, errmsg: str) -> List[Tuple[int, int]]:
+        results: List[Tuple[int, int]] = []
+        for token in txt.split(","):
+            # Get number if present
+            offset = 0
+            while offset < len(token) and token[offset] in "+-1234567890":
+                offset += 1
+            num = self.parseNumber(token[:offset], 1, 53, errmsg, True) if offset else 0
+
+            # Get day
+            wday = Recurrence.cWeekdayMap.get(token[offset:], Recurrence.cUnknownIndex)
+            if wday == Recurrence.cUnknownIndex:
+                raise ValueError(errmsg)
+            results.append((num, wday,))
+        return results
+
+    def generate(self, os: IO[str]) -> None:
+        os.write(definitions.cICalValue_RECUR_FREQ)
+        os.write("=")
+        os.write(Recurrence.cFreqRecurMap[self.mFreq])
+
+        if self.mUseCount:
+            os.write(";")
+            os.write(definitions.cICalValue_RECUR_COUNT)
+            os.write("=")
+            os.write(str(self.mCount))
+        elif self.mUseUntil:
+            os.write(";")
+            os.write(definitions.cICalValue_RECUR_UNTIL)
+            os.write("=")
+            self.mUntil.generate(os)
+
+        if self.mInterval > 1:
+            os.write(";")
+            os.write(definitions.cICalValue_RECUR_INTERVAL)
+            os.write("=")
+            os.write(str(self.mInterval))
+
+        self.generateList(os, definitions.cICalValue_RECUR_BYSECOND, self.mBySeconds)
+        self.generateList(os, definitions.cICalValue_RECUR_BYMINUTE, self.mByMinutes)
+        self.generateList(os, definitions.cICalValue_RECUR_BYHOUR, self.mByHours)
+
+        if self.mByDay:
+            os.write(";")
+            os.write(definitions.cICalValue_RECUR_BYDAY)
+            os.write("=")
+            os.write(",".join([
+                "%s%s" % (str(num) if num else "", Recurrence.cWeekdayRecurMap[wday],)
+                for num, wday in self.mByDay
+            ]))
+
+        self.generateList(os, definitions.cICalValue_RECUR_BYMONTHDAY, self.mByMonthDay)
+        self.generateList(os, definitions.cICalValue_RECUR_BYYEARDAY, self.mByYearDay)
+        self.generateList(os, definitions.cICalValue_RECUR_BYWEEKNO, self.mByWeekNo)
+        self.generateList(os, definitions.cICalValue_RECUR_BYMONTH, self.mByMonth)
+        self.generateList(os, definitions.cICalValue_RECUR_BYSETPOS, self.mBySetPos)
+
+        # MO is the default so we do not need it
+        if self.mWeekstart != definitions.eRecurrence_WEEKDAY_MO:
+            os.write(";")
+            os.write(definitions.cICalValue_RECUR_WKST)
+            os.write("=")
+            os.write(Recurrence.cWeekdayRecurMap[self.mWeekstart])
+
+    def generateList(self, os: IO[str], title: str, items: Optional[List[int]]) -> None:
+        if items:
+            os.write(";")
+            os.write(title)
+            os.write("=")
+            os.write(",".join([str(item) for item in items]))
+
+    def parseJSON(self, jobject: Dict[str, Any]) -> None:
+        """
+        jCal splits the value into its parts, so turn it back into the iCalendar text and
+        parse that.
+        """
+        items = []
+        for name, value in jobject.items():
+            if isinstance(value, list):
+                value = ",".join([str(item) for item in value])
+            if name.lower() == xmldefinitions.recur_until:
+                value = value.replace("-", "").replace(":", "")
+            items.append("%s=%s" % (name.upper(), value,))
+        self.parse(";".join(items))
+
+    def writeJSON(self, jobject: List[Any]) -> None:
+        jdict: Dict[str, Any] = {}
+        jdict[xmldefinitions.recur_freq] = self.cFreqToXMLMap[self.mFreq]
+        if self.mUseCount:
+            jdict[xmldefinitions.recur_count] = self.mCount
+        elif self.mUseUntil:
+            jdict[xmldefinitions.recur_until] = self.mUntil.getXMLText()
+        if self.mInterval > 1:
+            jdict[xmldefinitions.recur_interval] = self.mInterval
+
+        for name, items in (
+            (xmldefinitions.recur_bysecond, self.mBySeconds),
+            (xmldefinitions.recur_byminute, self.mByMinutes),
+            (xmldefinitions.recur_byhour, self.mByHours),
+        ):
+            if items:
+                jdict[name] = items
+        if self.mByDay:
+            jdict[xmldefinitions.recur_byday] = [
+                "%s%s" % (str(num) if num else "", Recurrence.cWeekdayRecurMap[wday],)
+                for num, wday in self.mByDay
+            ]
+        for name, items in (
+            (xmldefinitions.recur_bymonthday, self.mByMonthDay),
+            (xmldefinitions.recur_byyearday, self.mByYearDay),
+            (xmldefinitions.recur_byweekno, self.mByWeekNo),
+            (xmldefinitions.recur_bymonth, self.mByMonth),
+            (xmldefinitions.recur_bysetpos, self.mBySetPos),
+        ):
+            if items:
+                jdict[name] = items
+
+        # MO is the default so we do not need it
+        if self.mWeekstart != definitions.eRecurrence_WEEKDAY_MO:
+            jdict[xmldefinitions.recur_wkst] = Recurrence.cWeekdayRecurMap[self.mWeekstart]
+        jobject.append(jdict)
+
+    def writeXML(self, node: Any, namespace: Any) -> None:
+        recur = XML.SubElement(node, xmlutils.makeTag(namespace, xmldefinitions.value_recur))
+
+        freq = XML.SubElement(recur, xmlutils.makeTag(namespace, xmldefinitions.recur_freq))
+        freq.text = self.cFreqToXMLMap[self.mFreq]
+
+        if self.mUseCount:
+            count = XML.SubElement(recur, xmlutils.makeTag(namespace, xmldefinitions.recur_count))
+            count.text = str(self.mCount)
+        elif self.mUseUntil:
+            until = XML.SubElement(recur, xmlutils.makeTag(namespace, xmldefinitions.recur_until))
+            until.text = self.mUntil.getXMLText()
+
+        if self.mInterval > 1:
+            interval = XML.SubElement(recur, xmlutils.makeTag(namespace, xmldefinitions.recur_interval))
+            interval.text = str(self.mInterval)
+
+        self.writeXMLList(recur, namespace, xmldefinitions.recur_bysecond, self.mBySeconds)
+        self.writeXMLList(recur, namespace, xmldefinitions.recur_byminute, self.mByMinutes)
+        self.writeXMLList(recur, namespace, xmldefinitions.recur_byhour, self.mByHours)
+
+        if self.mByDay:
+            for num, wday in self.mByDay:
+                byday = XML.SubElement(recur, xmlutils.makeTag(namespace, xmldefinitions.recur_byday))
+                byday.text = "%s%s" % (str(num) if num else "", Recurrence.cWeekdayRecurMap[wday],)
+
+        self.writeXMLList(recur, namespace, xmldefinitions.recur_bymonthday, self.mByMonthDay)
+        self.writeXMLList(recur, namespace, xmldefinitions.recur_byyearday, self.mByYearDay)
+        self.writeXMLList(recur, namespace, xmldefinitions.recur_byweekno, self.mByWeekNo)
+        self.writeXMLList(recur, namespace, xmldefinitions.recur_bymonth, self.mByMonth)
+        self.writeXMLList(recur, namespace, xmldefinitions.recur_bysetpos, self.mBySetPos)
+
+        # MO is the default so we do not need it
+        if self.mWeekstart != definitions.eRecurrence_WEEKDAY_MO:
+            wkst = XML.SubElement(recur, xmlutils.makeTag(namespace, xmldefinitions.recur_wkst))
+            wkst.text = Recurrence.cWeekdayRecurMap[self.mWeekstart]
+
+    def writeXMLList(self, node: Any, namespace: Any, name: str, items: Optional[List[int]]) -> None:
+        if items:
+            for item in items:
+                child = XML.SubElement(node, xmlutils.makeTag(namespace, name))
+                child.text = str(item)
+
+    # Stop looking for the next instance of a rule with BYxxx parts after this many years
+    # without one - the Gregorian calendar repeats every 400 years, so a rule with no
+    # instances in that time will never have another one
+    cMaxIdleYears: int = 400
+
+    def iterInstances(
+        self,
+        start: DateTime,
+        after: Optional[DateTime] = None,
+        float_offset: int = 0,
+        include_start: bool = True,
+        periods: bool = False,
+    ) -> Iterator[Union[DateTime, Tuple[int, ...]]]:
+        """
+        Generate the instances of this rule in chronological order. Unlike L{expand}
+        there is no range, so the caller decides how many instances to take and
+        open-ended rules need no arbitrary end date. As in L{RecurrenceSet.expand}, the
+        start is always the first instance and is included in any COUNT.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        @param after: if not C{None}, skip instances before this
+        @type after: L{DateTime}
+        @param float_offset: the offset applied to a UTC UNTIL when the start is floating
+        @type float_offset: C{int}
+        @param include_start: if C{False}, only generate the start if the rule itself
+            matches it (as for an EXRULE), though it still counts towards COUNT
+        @type include_start: C{bool}
+        @param periods: if C{True}, also generate the period markers described in
+            L{iterCandidates}, so that a caller can stop at a date-time even when the rule
+            has no instances for a long time
+        @type periods: C{bool}
+        """
+
+        # Have to normalise this to be very sure we are starting with a valid date, as
+        # otherwise we could end up looping forever when doing recurrence
+        start.normalise()
+
+        float_until: Optional[DateTime] = None
+        until_bound: Optional[Tuple[int, ...]] = None
+        if self.mUseUntil:
+            float_until = self.mUntil.duplicate()
+            if start.floating():
+                float_until.setTimezoneID(None)
+                float_until.offsetSeconds(float_offset)
+            until_bound = self.periodBound(start, float_until)
+
+        if self.isClosedForm(start):
+            # Go straight to the first instance wanted
+            index = self.getInstanceIndex(start, after) if after is not None else 0
+            while not self.mUseCount or index < self.mCount:
+                instance = self.getInstance(start, index)
+                if float_until is not None and instance > float_until:
+                    return
+                yield instance
+                index += 1
+            return
+
+        # With BYxxx parts the start is generated first, and again if the rule matches it
+        has_by = self.hasBy()
+        ctr = 0
+        for instance in self.iterCandidates(start, periods, until_bound):
+            if type(instance) is tuple:
+                yield instance
+                continue
+            # UNTIL is inclusive
+            if float_until is not None and instance > float_until:
+                return
+            if ctr and has_by and instance == start:
+                if not include_start and (after is None or not (instance < after)):
+                    yield instance
+                continue
+            if (ctr or include_start or not has_by) and (after is None or not (instance < after)):
+                yield instance
+            ctr += 1
+            if self.mUseCount and ctr >= self.mCount:
+                return
+
+    def expand(
+        self,
+        start: DateTime,
+        range: Period,
+        items: List[DateTime],
+        float_offset: int = 0,
+        maxInstances: Optional[int] = None,
+    ) -> bool:
+        """
+        Add the instances of this rule within a range to C{items}. Return C{True} if the
+        range (or C{maxInstances}) limited the results. The start is only an instance if
+        the rule matches it (L{RecurrenceSet.expand} adds it anyway). The instances from
+        the start up to the end of the range are kept by the rule until it is changed (see
+        L{clear}), so expanding the same or an earlier range again works nothing out.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        @param range: the range of instances wanted
+        @type range: L{Period}
+        @param items: the list to add the instances to
+        @type items: C{list} of L{DateTime}
+        @param float_offset: the offset applied to a UTC UNTIL when the start is floating
+        @type float_offset: C{int}
+        @param maxInstances: if not C{None}, raise L{TooManyInstancesError} rather than
+            add more instances than this
+        @type maxInstances: C{int}
+        """
+
+        # Wipe the cache if the start is different
+        if self.mCached and start != self.mCacheStart:
+            self.mCached = False
+            self.mFullyCached = False
+            self.mRecurrences = None
+
+        # Only work out the instances between the end of the cache and the end of the range
+        if not self.mCached or not self.mFullyCached and self.mCacheUpto < range.getEnd():
+            if self.mRecurrences is None:
+                self.mRecurrences = []
+            after = self.mCacheUpto if self.mCached else None
+            bound = self.periodBound(start, range.getEnd())
+            self.mFullyCached = True
+            for instance in self.iterInstances(start.duplicate(), after, float_offset, include_start=False, periods=True):
+                if type(instance) is tuple:
+                    if instance > bound:
+                        self.mFullyCached = False
+                        break
+                elif instance < range.getEnd():
+                    self.mRecurrences.append(instance)
+                else:
+                    self.mFullyCached = False
+                    break
+            self.mCached = True
+            self.mCacheStart = start.duplicate()
+            self.mCacheUpto = range.getEnd().duplicate()
+
+        # Copies of the cached instances in the range, so the cache cannot be changed
+        limited = not self.mFullyCached
+        for instance in self.mRecurrences:
+            if range.isDateWithinPeriod(instance):
+                items.append(instance.duplicate())
+                if maxInstances and len(items) > maxInstances:
+                    raise TooManyInstancesError("Too many instances")
+            else:
+                limited = True
+        return limited
+
+    def expandCached(
+        self,
+        start: DateTime,
+        range: Period,
+        items: List[DateTime],
+        float_offset: int = 0,
+        include_start: bool = True,
+        maxInstances: Optional[int] = None,
+    ) -> bool:
+        """
+        Add the instances of this rule within a range to C{items}, using the process-wide
+        L{RecurrenceCache}. Return C{True} if the range limited the results. The instances
+        are copies of those in the cache, so can be changed.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        @param range: the range of instances wanted
+        @type range: L{Period}
+        @param items: the list to add the instances to
+        @type items: C{list} of L{DateTime}
+        @param float_offset: the offset applied to a UTC UNTIL when the start is floating
+        @type float_offset: C{int}
+        @param include_start: see L{iterInstances}
+        @type include_start: C{bool}
+        @param maxInstances: if not C{None}, raise L{TooManyInstancesError} rather than
+            generate more instances than this
+        @type maxInstances: C{int}
+        """
+        instances, limited = RecurrenceCache.getCache().expand(
+            self, start, range.getStart(), range.getEnd(), float_offset, include_start, maxInstances,
+        )
+        items.extend(instances)
+        return limited
+
+    # The frequencies that can have a closed-form expansion
+    cClosedFormFreqs: Tuple[int, ...] = (
+        definitions.eRecurrence_DAILY,
+        definitions.eRecurrence_WEEKLY,
+        definitions.eRecurrence_MONTHLY,
+        definitions.eRecurrence_YEARLY,
+    )
+
+    def isClosedForm(self, start: DateTime) -> bool:
+        """
+        Whether the instances of this rule are evenly spaced calendar periods from the
+        start, so that L{getInstance} and L{getInstanceIndex} can work them out directly
+        rather than by stepping through every period. That is a DAILY, WEEKLY, MONTHLY or
+        YEARLY rule with no BYxxx parts, or a WEEKLY rule whose only BYxxx part is a BYDAY
+        of the start's weekday. MONTHLY rules starting after the 28th and YEARLY rules
+        starting on Feb 29 skip the periods without that day, so they are not closed form.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        """
+        if self.mFreq not in self.cClosedFormFreqs:
+            return False
+        for by in (
+            self.mBySeconds, self.mByMinutes, self.mByHours, self.mByMonthDay,
+            self.mByYearDay, self.mByWeekNo, self.mByMonth, self.mBySetPos,
+        ):
+            if by:
+                return False
+        if self.mByDay:
+            if self.mFreq != definitions.eRecurrence_WEEKLY or self.mByDay != [(0, start.getDayOfWeek())]:
+                return False
+
+        if self.mFreq == definitions.eRecurrence_MONTHLY:
+            return start.getDay() <= 28
+        elif self.mFreq == definitions.eRecurrence_YEARLY:
+            return start.getMonth() != 2 or start.getDay() != 29
+        else:
+            return True
+
+    def getInstance(self, start: DateTime, index: int) -> DateTime:
+        """
+        Get an instance of a closed-form rule (see L{isClosedForm}), ignoring COUNT and
+        UNTIL.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        @param index: the index of the instance, the start being 0
+        @type index: C{int}
+        """
+        instance = start.duplicate()
+        periods = index * self.mInterval
+        if self.mFreq == definitions.eRecurrence_DAILY:
+            instance.offsetDay(periods)
+        elif self.mFreq == definitions.eRecurrence_WEEKLY:
+            instance.offsetDay(7 * periods)
+        elif self.mFreq == definitions.eRecurrence_MONTHLY:
+            instance.offsetMonth(periods)
+        else:
+            instance.offsetYear(periods)
+        return instance
+
+    def getInstanceIndex(self, start: DateTime, dt: DateTime) -> int:
+        """
+        Get the index of the first instance of a closed-form rule (see L{isClosedForm}) at
+        or after a date-time, ignoring COUNT and UNTIL.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        @param dt: the date-time to look for
+        @type dt: L{DateTime}
+        """
+        if not (start < dt):
+            return 0
+
+        if self.mFreq == definitions.eRecurrence_DAILY:
+            index = (dt.getPosixTime() - start.getPosixTime()) // (24 * 60 * 60 * self.mInterval)
+        elif self.mFreq == definitions.eRecurrence_WEEKLY:
+            index = (dt.getPosixTime() - start.getPosixTime()) // (7 * 24 * 60 * 60 * self.mInterval)
+        elif self.mFreq == definitions.eRecurrence_MONTHLY:
+            index = ((dt.getYear() - start.getYear()) * 12 + dt.getMonth() - start.getMonth()) // self.mInterval
+        else:
+            index = (dt.getYear() - start.getYear()) // self.mInterval
+
+        # Daylight saving and differing timezones can put the estimate a period out
+        index = max(index, 0)
+        while index > 0 and not (self.getInstance(start, index - 1) < dt):
+            index -= 1
+        while self.getInstance(start, index) < dt:
+            index += 1
+        return index
+
+    def iterCandidates(
+        self,
+        start: DateTime,
+        periods: bool = False,
+        until: Optional[Tuple[int, ...]] = None,
+    ) -> Iterator[Union[DateTime, Tuple[int, ...]]]:
+        """
+        Generate the instances of this rule in chronological order, ignoring COUNT and
+        UNTIL. For a rule with BYxxx parts the start is always generated first, and is
+        generated again if the rule matches it.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        @param periods: if C{True}, a rule with BYxxx parts also generates a marker
+            before each period it expands: a C{tuple} of year, month, day, hours, minutes
+            and seconds (in the start's timezone) that no later instance is before
+        @type periods: C{bool}
+        @param until: if not C{None}, a period marker (see L{periodBound}) to stop at, so
+            that a rule that has no instances before its UNTIL does not look for one
+            for L{cMaxIdleYears}
+        @type until: C{tuple}
+        """
+
+        start_iter = start.duplicate()
+        if not self.hasBy():
+            while True:
+                yield start_iter.duplicate()
+                start_iter.recur(self.mFreq, self.mInterval)
+
+        yield start.duplicate()
+        fields = (start.getYear(), start.getMonth(), start.getDay(), start.getHours(), start.getMinutes(), start.getSeconds(),)
+        compiled = self.compile(start)
+        idle_until = start.getYear() + self.cMaxIdleYears
+        while start_iter.getYear() <= idle_until:
+            if periods or until is not None:
+                floor = self.periodFloor(start_iter)
+                if until is not None and floor > until:
+                    return
+                if periods:
+                    yield floor
+            if compiled is not None:
+                items = compiled.expandPeriod(start_iter.getYear(), start_iter.getMonth(), start_iter.getDay())
+            else:
+                items = self.generateSet(start_iter, start)
+            for item in items:
+                # The expansion of the first period can go back before the start
+                if item >= fields:
+                    idle_until = item[0] + self.cMaxIdleYears
+                    instance = start.duplicate()
+                    instance.setYYMMDD(*item[:3])
+                    instance.setHHMMSS(*item[3:])
+                    yield instance
+            start_iter.recur(self.mFreq, self.mInterval, allow_invalid=True)
+
+    def periodFloor(self, period: DateTime) -> Tuple[int, ...]:
+        """
+        Get the earliest date-time, as a C{tuple} of year, month, day, hours, minutes and
+        seconds, that the expansion of a period could produce. This errs early, as a
+        YEARLY BYWEEKNO can start in the previous year and the period can be an invalid
+        date (e.g. Feb 30) when stepping by months or years.
+
+        @param period: the period being expanded
+        @type period: L{DateTime}
+        """
+        if self.mFreq == definitions.eRecurrence_YEARLY:
+            return (period.getYear() - 1, 12, 1, 0, 0, 0)
+        elif self.mFreq == definitions.eRecurrence_MONTHLY:
+            return (period.getYear(), period.getMonth(), 1, 0, 0, 0)
+        elif self.mFreq == definitions.eRecurrence_WEEKLY:
+            week = period.duplicate()
+            week.offsetDay(-7)
+            return (week.getYear(), week.getMonth(), week.getDay(), 0, 0, 0)
+        elif self.mFreq == definitions.eRecurrence_DAILY:
+            return (period.getYear(), period.getMonth(), period.getDay(), 0, 0, 0)
+        elif self.mFreq == definitions.eRecurrence_HOURLY:
+            return (period.getYear(), period.getMonth(), period.getDay(), period.getHours(), 0, 0)
+        elif self.mFreq == definitions.eRecurrence_MINUTELY:
+            return (period.getYear(), period.getMonth(), period.getDay(), period.getHours(), period.getMinutes(), 0)
+        else:
+            return (period.getYear(), period.getMonth(), period.getDay(), period.getHours(), period.getMinutes(), period.getSeconds())
+
+    @staticmethod
+    def periodBound(start: DateTime, end: DateTime) -> Tuple[int, ...]:
+        """
+        Get a period marker (see L{iterCandidates}) that is after a date-time. Markers
+        are in the start's timezone, so an hour is allowed for daylight saving, or a day
+        for the offset of a floating start.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        @param end: the date-time the marker has to be after
+        @type end: L{DateTime}
+        """
+        bound = end.duplicate()
+        if start.floating():
+            bound.offsetDay(1)
+        else:
+            bound.adjustTimezone(start.getTimezone())
+            bound.offsetSeconds(60 * 60)
+        return (bound.getYear(), bound.getMonth(), bound.getDay(), bound.getHours(), bound.getMinutes(), bound.getSeconds(),)
+
+    def compile(self, start: DateTime) -> Optional[CompiledRecurrence]:
+        """
+        Get the compiled form of this rule for a start, or C{None} if the rule cannot be
+        compiled (see L{CompiledRecurrence}). The result is cached until the rule is changed.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        """
+        fields = (start.getYear(), start.getMonth(), start.getDay(), start.getHours(), start.getMinutes(), start.getSeconds(),)
+        if self.mCompiled is None or self.mCompiled.mStart != fields:
+            if not CompiledRecurrence.canCompile(self):
+                return None
+            self.mCompiled = CompiledRecurrence(self, fields)
+        return self.mCompiled
+
+    def generateSet(self, period: DateTime, start: DateTime) -> List[Tuple[int, int, int, int, int, int]]:
+        """
+        Generate the candidate instances of the BYxxx parts, in order, for the FREQ period
+        that starts at C{period}. Each one is a tuple of (year, month, day, hours, minutes,
+        seconds). The start fills in any part of the date not given by a BYxxx part, and
+        the period any part of the time.
+
+        @param period: the start of the period, which for a MONTHLY or YEARLY rule may be
+            L{DateTime.invalid}
+        @type period: L{DateTime}
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        """
+        year = period.getYear()
+        month = period.getMonth()
+        if self.mFreq == definitions.eRecurrence_YEARLY:
+            if self.mByWeekNo:
+                dates = self.byWeekNoExpand(year, start)
+            else:
+                dates = []
+                for month in sorted(self.mByMonth or range(1, 13)):
+                    dates.extend(self.matchMonth(year, month, start))
+        elif self.mFreq == definitions.eRecurrence_MONTHLY:
+            dates = self.matchMonth(year, month, start)
+        elif self.mFreq == definitions.eRecurrence_WEEKLY:
+            day = period.duplicate()
+            day.offsetDay(-((day.getDayOfWeek() - self.mWeekstart) % 7))
+            dates = []
+            for _ignore in range(7):
+                if self.matchDate(day.getYear(), day.getMonth(), day.getDay(), day.getDayOfWeek(), start):
+                    dates.append((day.getYear(), day.getMonth(), day.getDay(),))
+                day.offsetDay(1)
+        elif self.matchDate(year, month, period.getDay(), period.getDayOfWeek(), start):
+            dates = [(year, month, period.getDay(),)]
+        else:
+            dates = []
+
+        times = [
+            (hours, minutes, seconds,)
+            for hours in self.expandTime(self.mByHours, period.getHours(), definitions.eRecurrence_HOURLY)
+            for minutes in self.expandTime(self.mByMinutes, period.getMinutes(), definitions.eRecurrence_MINUTELY)
+            for seconds in self.expandTime(self.mBySeconds, period.getSeconds(), definitions.eRecurrence_SECONDLY)
+        ]
+        items = [date + time for date in dates for time in times]
+
+        if self.mBySetPos:
+            results = set()
+            for pos in self.mBySetPos:
+                if 0 < pos <= len(items):
+                    results.add(items[pos - 1])
+                elif 0 < -pos <= len(items):
+                    results.add(items[pos])
+            items = sorted(results)
+        return items
+
+    def matchMonth(self, year: int, month: int, start: DateTime) -> List[Tuple[int, int, int]]:
+        """
+        Get the days of a month allowed by the day-level BYxxx parts.
+        """
+        weekday = DateTime(year, month, 1).getDayOfWeek()
+        return [
+            (year, month, day,)
+            for day in range(1, utils.daysInMonth(month, year) + 1)
+            if self.matchDate(year, month, day, (weekday + day - 1) % 7, start)
+        ]
+
+    def matchDate(self, year: int, month: int, day: int, weekday: int, start: DateTime) -> bool:
+        """
+        Whether a day in the period being expanded is allowed by the day-level BYxxx parts.
+        """
+        if self.mByMonth and month not in self.mByMonth:
+            return False
+        if not self.matchLimits(year, month, day):
+            return False
+
+        if self.mByDay:
+            if self.mFreq == definitions.eRecurrence_YEARLY and not self.mByMonth:
+                # An ordinal counts within the year
+                index = utils.daysUptoMonth(month, year) + day - 1
+                length = 366 if utils.isLeapYear(year) else 365
+            else:
+                # An ordinal counts within the month
+                index = day - 1
+                length = utils.daysInMonth(month, year)
+            for ordinal, wday in self.mByDay:
+                if wday == weekday and (
+                    ordinal == 0 or
+                    self.mFreq < definitions.eRecurrence_MONTHLY or
+                    ordinal == index // 7 + 1 or
+                    -ordinal == (length - 1 - index) // 7 + 1
+                ):
+                    break
+            else:
+                return False
+
+            return True
+
+        # Without BYxxx parts for the day the start's day is used
+        elif self.mByMonthDay or self.mByYearDay:
+            return True
+        elif self.mFreq == definitions.eRecurrence_WEEKLY:
+            return weekday == start.getDayOfWeek()
+        elif self.mFreq == definitions.eRecurrence_MONTHLY:
+            return day == start.getDay()
+        elif self.mFreq == definitions.eRecurrence_YEARLY:
+            return day == start.getDay() and (bool(self.mByMonth) or month == start.getMonth())
+        else:
+            return True
+
+    def matchLimits(self, year: int, month: int, day: int) -> bool:
+        """
+        Whether a day is allowed by the BYYEARDAY and BYMONTHDAY parts.
+        """
+        if self.mByYearDay:
+            yday = utils.daysUptoMonth(month, year) + day
+            length = 366 if utils.isLeapYear(year) else 365
+            if yday not in self.mByYearDay and yday - length - 1 not in self.mByYearDay:
+                return False
+        if self.mByMonthDay:
+            length = utils.daysInMonth(month, year)
+            if day not in self.mByMonthDay and day - length - 1 not in self.mByMonthDay:
+                return False
+        return True
+
+    def byWeekNoExpand(self, year: int, start: DateTime) -> List[Tuple[int, int, int]]:
+        """
+        Get the days of a YEARLY period in the BYWEEKNO weeks. The start's day of the year
+        is moved to each week, and then to each BYDAY day of that week.
+        """
+        if start.getDay() > utils.daysInMonth(start.getMonth(), year):
+            return []
+        base = DateTime(year, start.getMonth(), start.getDay())
+
+        # Week 1 is the first with at least four days in the year, i.e. the one with Jan 4th
+        jan4 = DateTime(year, 1, 4)
+        week1 = jan4.duplicate()
+        week1.offsetDay(-((jan4.getDayOfWeek() - self.mWeekstart) % 7))
+        weeks = (DateTime(year, 12, 28).daysSince1970() - week1.daysSince1970()) // 7 + 1
+        weekno = (base.daysSince1970() - week1.daysSince1970()) // 7 + 1
+
+        dates = set()
+        for week in self.mByWeekNo:
+            if week < 0:
+                week += weeks + 1
+            day = base.duplicate()
+            day.offsetDay(7 * (week - weekno))
+            if self.mByDay:
+                day.offsetDay(-((day.getDayOfWeek() - self.mWeekstart) % 7))
+                weekdays = set([wday for _ignore, wday in self.mByDay])
+                for _ignore in range(7):
+                    if day.getDayOfWeek() in weekdays:
+                        dates.add((day.getYear(), day.getMonth(), day.getDay(),))
+                    day.offsetDay(1)
+            else:
+                dates.add((day.getYear(), day.getMonth(), day.getDay(),))
+
+        return sorted([
+            date for date in dates
+            if (not self.mByMonth or date[1] in self.mByMonth) and self.matchLimits(*date)
+        ])
+
+    def expandTime(self, by: Optional[List[int]], value: int, freq: int) -> List[int]:
+        """
+        Get the values of one part of the time for a period: the BYxxx values if the
+        frequency is coarser than that part, otherwise the period's own value if the
+        BYxxx part allows it.
+        """
+        if not by:
+            return [value]
+        elif self.mFreq <= freq:
+            return [value] if value in by else []
+        else:
+            return sorted(set(by))
+
     # ... (Restliche Methoden bleiben unverndert, knnen aber bei Bedarf ebenfalls typisiert werden)
\ No newline at end of file
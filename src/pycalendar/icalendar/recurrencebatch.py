@@ -0,0 +1,304 @@
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+"""
+Bulk recurrence expansion with NumPy.
+
+A L{BatchExpander} works out the calendar details (month, day, weekday, position of the
+weekday in the month and year etc) of every day that any rule in a batch can need just
+once, as arrays. Each rule is then expanded with vectorised comparisons against those
+arrays rather than period by period. The day-level BYxxx parts have the same meaning as in
+L{CompiledRecurrence}.
+
+NumPy is optional: L{BatchExpander.available} says whether it can be used. Rules that
+cannot be compiled (see L{CompiledRecurrence.canCompile}) are expanded with
+L{Recurrence.iterInstances} instead.
+"""
+
+from itertools import takewhile
+from pycalendar.icalendar import definitions
+from pycalendar.icalendar.compiledrecurrence import CompiledRecurrence, DateTimeFields
+from typing import Any, List, Optional, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _datetime64(fields: Sequence[int]) -> Any:
+    return numpy.datetime64("{:04d}-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}".format(*fields), "s")
+
+
+class BatchExpander(object):
+    """
+    Expand many rules over the same window. The instances of each rule are returned as a
+    sorted C{datetime64[s]} array of local (wall-clock) times in the timezone of its start,
+    with the same results as L{RecurrenceSet.iterInstances} for a set with just that rule.
+    """
+
+    @staticmethod
+    def available() -> bool:
+        return numpy is not None
+
+    def __init__(self, window_start: Any, window_end: Any) -> None:
+        """
+        @param window_start: the start of the window
+        @type window_start: L{DateTime}
+        @param window_end: the end of the window (not included)
+        @type window_end: L{DateTime}
+        """
+        if numpy is None:
+            raise ImportError("NumPy is needed for batch recurrence expansion")
+        self.mWindowStart = window_start
+        self.mWindowEnd = window_end
+        self.mDays: Any = None
+        self.mFirst: Any = None
+        self.mLast: Any = None
+
+    def expandAll(self, rules: Sequence[Any], starts: Sequence[Any]) -> List[Any]:
+        """
+        Expand a batch of rules.
+
+        @param rules: the rules
+        @type rules: C{list} of L{Recurrence}
+        @param starts: the start (DTSTART) of each rule
+        @type starts: C{list} of L{DateTime}
+        """
+        # Make the day arrays cover every rule up front, rather than growing them
+        earliest = min([start.getYear() for start in starts]) if starts else self.mWindowStart.getYear()
+        self.prepareDays(earliest, self.mWindowEnd.getYear())
+        return [self.expand(recur, start) for recur, start in zip(rules, starts)]
+
+    def expand(self, recur: Any, start: Any) -> Any:
+        """
+        Expand one rule.
+
+        @param recur: the rule
+        @type recur: L{Recurrence}
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        """
+        window_start = self.mWindowStart.duplicate()
+        window_end = self.mWindowEnd.duplicate()
+        until = recur.mUntil.duplicate() if recur.mUseUntil else None
+        if not start.floating():
+            window_start.adjustTimezone(start.getTimezone())
+            window_end.adjustTimezone(start.getTimezone())
+            if until is not None:
+                until.adjustTimezone(start.getTimezone())
+
+        if not self.canVectorise(recur):
+            instances = takewhile(lambda x: x < window_end, recur.iterInstances(start, window_start))
+            return numpy.array([self.datetime64(instance) for instance in instances], dtype="datetime64[s]")
+
+        return self.expandFields(
+            recur,
+            self.fields(start),
+            self.fields(until) if until is not None else None,
+            self.fields(window_start),
+            self.fields(window_end),
+        )
+
+    @staticmethod
+    def fields(dt: Any) -> DateTimeFields:
+        return (dt.getYear(), dt.getMonth(), dt.getDay(), dt.getHours(), dt.getMinutes(), dt.getSeconds(),)
+
+    @classmethod
+    def datetime64(cls, dt: Any) -> Any:
+        """
+        Get the local time of a L{DateTime} as a C{datetime64[s]}.
+        """
+        return _datetime64(cls.fields(dt))
+
+    @staticmethod
+    def canVectorise(recur: Any) -> bool:
+        # The same rules as can be compiled, so the BYxxx parts have the same meaning
+        return CompiledRecurrence.canCompile(recur)
+
+    def prepareDays(self, first_year: int, last_year: int) -> None:
+        """
+        Work out the details of every day from a year before the first year to a year
+        after the last, so that every FREQ period touching those years is complete.
+        """
+        first = numpy.datetime64(str(first_year - 1), "Y")
+        last = numpy.datetime64(str(last_year + 2), "Y")
+        if self.mDays is not None and self.mFirst <= first and self.mLast >= last:
+            return
+        if self.mDays is not None:
+            first = min(first, self.mFirst)
+            last = max(last, self.mLast)
+        self.mFirst = first
+        self.mLast = last
+
+        days = numpy.arange(first.astype("datetime64[D]"), last.astype("datetime64[D]"))
+        months = days.astype("datetime64[M]")
+        years = days.astype("datetime64[Y]")
+        month_starts = months.astype("datetime64[D]")
+        year_starts = years.astype("datetime64[D]")
+
+        self.mDays = days
+        self.mDayNumbers = days.astype("int64")
+        self.mYear = years.astype("int64") + 1970
+        self.mMonth = months.astype("int64") % 12 + 1
+        self.mMonthIndex = months.astype("int64")
+        self.mMonthDay = (days - month_starts).astype("int64") + 1
+        self.mMonthLength = ((months + 1).astype("datetime64[D]") - month_starts).astype("int64")
+        self.mYearDay = (days - year_starts).astype("int64")
+        self.mYearLength = ((years + 1).astype("datetime64[D]") - year_starts).astype("int64")
+
+        # Sunday is 0, and 1970-01-01 was a Thursday
+        self.mWeekday = (self.mDayNumbers + 4) % 7
+
+        # Position of each day's weekday in its month and year, from the start and the end
+        self.mMonthOrdinal = (self.mMonthDay - 1) // 7 + 1
+        self.mMonthOrdinalEnd = -((self.mMonthLength - self.mMonthDay) // 7 + 1)
+        self.mYearOrdinal = self.mYearDay // 7 + 1
+        self.mYearOrdinalEnd = -((self.mYearLength - 1 - self.mYearDay) // 7 + 1)
+
+    def expandFields(
+        self,
+        recur: Any,
+        start: DateTimeFields,
+        until: Optional[DateTimeFields],
+        window_start: DateTimeFields,
+        window_end: DateTimeFields,
+    ) -> Any:
+        """
+        Expand a rule that can be vectorised, with all the date-times as local fields.
+        """
+        self.prepareDays(min(start[0], window_start[0]), window_end[0])
+
+        start_day = numpy.datetime64("{:04d}-{:02d}-{:02d}".format(*start[:3]), "D").astype("int64")
+        start_index = int(start_day - self.mDayNumbers[0])
+        mask = self.dayMask(recur, start, start_index) & self.periodMask(recur, start_index)
+        selected = numpy.flatnonzero(mask)
+
+        # All the candidate date-times, in order
+        hours = sorted(set(recur.mByHours)) if recur.mByHours else [start[3]]
+        minutes = sorted(set(recur.mByMinutes)) if recur.mByMinutes else [start[4]]
+        seconds = sorted(set(recur.mBySeconds)) if recur.mBySeconds else [start[5]]
+        times = numpy.array([h * 3600 + m * 60 + s for h in hours for m in minutes for s in seconds], dtype="int64")
+        instants = (self.mDayNumbers[selected][:, None] * 86400 + times[None, :]).ravel()
+
+        if recur.mBySetPos:
+            periods = numpy.repeat(self.periodIndex(recur, start_index)[selected], len(times))
+            instants = instants[self.bySetPosMask(periods, recur.mBySetPos)]
+
+        # The start is always the first instance
+        first = _datetime64(start).astype("int64")
+        instants = numpy.concatenate(([first], instants[instants > first]))
+        if until is not None:
+            instants = instants[instants <= _datetime64(until).astype("int64")]
+        if recur.mUseCount:
+            instants = instants[:recur.mCount]
+
+        instants = instants[
+            (instants >= _datetime64(window_start).astype("int64")) &
+            (instants < _datetime64(window_end).astype("int64"))
+        ]
+        return instants.astype("datetime64[s]")
+
+    def dayMask(self, recur: Any, start: DateTimeFields, start_index: int) -> Any:
+        """
+        Get the days allowed by the day-level BYxxx parts of a rule.
+        """
+        freq = recur.mFreq
+        mask = numpy.ones(len(self.mDays), dtype=bool)
+        if recur.mByMonth:
+            mask &= numpy.isin(self.mMonth, recur.mByMonth)
+
+        if freq == definitions.eRecurrence_WEEKLY:
+            weekdays = [weekday for _ignore, weekday in recur.mByDay] if recur.mByDay else [self.mWeekday[start_index]]
+            return mask & numpy.isin(self.mWeekday, weekdays)
+
+        if freq == definitions.eRecurrence_DAILY:
+            if recur.mByYearDay:
+                mask &= self.yearDayMask(recur.mByYearDay)
+            if recur.mByMonthDay:
+                mask &= self.monthDayMask(recur.mByMonthDay)
+            if recur.mByDay:
+                mask &= numpy.isin(self.mWeekday, [weekday for _ignore, weekday in recur.mByDay])
+            return mask
+
+        # For MONTHLY and YEARLY, a BYDAY ordinal counts within the month when the
+        # expansion is by month
+        by_month = freq == definitions.eRecurrence_MONTHLY or bool(recur.mByMonth)
+        if recur.mByYearDay or recur.mByMonthDay:
+            if recur.mByYearDay:
+                mask &= self.yearDayMask(recur.mByYearDay)
+            if recur.mByMonthDay:
+                mask &= self.monthDayMask(recur.mByMonthDay)
+            if recur.mByDay:
+                mask &= self.dayOfWeekMask(recur.mByDay, by_month)
+        elif recur.mByDay:
+            mask &= self.dayOfWeekMask(recur.mByDay, by_month)
+        else:
+            mask &= self.mMonthDay == start[2]
+            if freq == definitions.eRecurrence_YEARLY and not recur.mByMonth:
+                mask &= self.mMonth == start[1]
+        return mask
+
+    def yearDayMask(self, yeardays: Sequence[int]) -> Any:
+        return numpy.isin(self.mYearDay + 1, yeardays) | numpy.isin(self.mYearDay - self.mYearLength, yeardays)
+
+    def monthDayMask(self, monthdays: Sequence[int]) -> Any:
+        return numpy.isin(self.mMonthDay, monthdays) | numpy.isin(self.mMonthDay - self.mMonthLength - 1, monthdays)
+
+    def dayOfWeekMask(self, bydays: Sequence[Any], by_month: bool) -> Any:
+        ordinal = self.mMonthOrdinal if by_month else self.mYearOrdinal
+        ordinal_end = self.mMonthOrdinalEnd if by_month else self.mYearOrdinalEnd
+        mask = numpy.zeros(len(self.mDays), dtype=bool)
+        for number, weekday in bydays:
+            if number == 0:
+                mask |= self.mWeekday == weekday
+            else:
+                mask |= (self.mWeekday == weekday) & ((ordinal == number) | (ordinal_end == number))
+        return mask
+
+    def periodIndex(self, recur: Any, start_index: int) -> Any:
+        """
+        Get the number of FREQ periods from the one containing the start to the one
+        containing each day.
+        """
+        freq = recur.mFreq
+        if freq == definitions.eRecurrence_YEARLY:
+            return self.mYear - self.mYear[start_index]
+        elif freq == definitions.eRecurrence_MONTHLY:
+            return self.mMonthIndex - self.mMonthIndex[start_index]
+        elif freq == definitions.eRecurrence_WEEKLY:
+            week_starts = self.mDayNumbers - (self.mWeekday - recur.mWeekstart) % 7
+            return (week_starts - week_starts[start_index]) // 7
+        else:
+            return self.mDayNumbers - self.mDayNumbers[start_index]
+
+    def periodMask(self, recur: Any, start_index: int) -> Any:
+        periods = self.periodIndex(recur, start_index)
+        return (periods >= 0) & (periods % recur.mInterval == 0)
+
+    @staticmethod
+    def bySetPosMask(periods: Any, positions: Sequence[int]) -> Any:
+        """
+        Get the items allowed by BYSETPOS, given the (non-decreasing) period of each item.
+        """
+        if len(periods) == 0:
+            return numpy.zeros(0, dtype=bool)
+        boundaries = numpy.flatnonzero(numpy.diff(periods)) + 1
+        group_starts = numpy.concatenate(([0], boundaries))
+        group_sizes = numpy.diff(numpy.concatenate((group_starts, [len(periods)])))
+        rank = numpy.arange(len(periods)) - numpy.repeat(group_starts, group_sizes)
+        size = numpy.repeat(group_sizes, group_sizes)
+        return numpy.isin(rank + 1, positions) | numpy.isin(rank - size, positions)
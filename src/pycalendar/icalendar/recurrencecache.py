@@ -0,0 +1,270 @@
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+"""
+A process-wide cache of recurrence rule expansions.
+
+Entries are keyed by the content of the rule together with the start and its timezone,
+so identical rules in different components share an entry and changing a rule simply
+means a different key - nothing needs to be invalidated. Each entry holds the instances
+for a contiguous range, which is extended when a later request overlaps or adjoins it
+(e.g. paging through a calendar view). An entry keeps the rule's generator (see
+L{Recurrence.iterInstances}) so that extending it carries on from where it stopped
+rather than starting again from DTSTART, and generation stops at the end of the range
+even when the rule has no instances there. The total number of instances held is
+bounded, with the least recently used entries evicted first.
+"""
+
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import chain
+from pycalendar.icalendar.exceptions import TooManyInstancesError
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class RecurrenceCacheEntry(object):
+    """
+    The instances of a rule from C{mStart} up to, but not including, C{mEnd}. If
+    C{mComplete} is C{True} the rule has no instances after C{mEnd} either, otherwise
+    C{mIterator} carries on generating from C{mEnd}, with C{mPending} the first instance
+    it generated at or after C{mEnd}, if any.
+    """
+
+    def __init__(self, start: Any, iterator: Optional[Iterator[Any]]) -> None:
+        self.mStart = start
+        self.mEnd = start
+        self.mInstances: List[Any] = []
+        self.mPosixTimes: List[int] = []
+        self.mComplete = iterator is None
+        self.mIterator = iterator
+        self.mPending: Optional[Any] = None
+
+    def fill(self, end: Any, bound: Tuple[int, ...], maxInstances: Optional[int]) -> int:
+        """
+        Generate the instances up to C{end}, stopping early if the rule gets past
+        C{bound} without one. Return the number of instances added.
+
+        @param end: the new end of the entry
+        @type end: L{DateTime}
+        @param bound: a period marker (see L{Recurrence.iterCandidates}) that is after
+            C{end}
+        @type bound: C{tuple}
+        @param maxInstances: if not C{None}, raise L{TooManyInstancesError} rather than
+            add more instances than this
+        @type maxInstances: C{int}
+        """
+        if not (self.mEnd < end):
+            return 0
+        instances: List[Any] = []
+        if self.mIterator is not None:
+            pending, self.mPending = self.mPending, None
+            for instance in chain((pending,), self.mIterator) if pending is not None else self.mIterator:
+                if type(instance) is tuple:
+                    if instance > bound:
+                        break
+                elif not (instance < end):
+                    self.mPending = instance
+                    break
+                elif not (instance < self.mStart):
+                    instances.append(instance)
+                    if maxInstances and len(instances) > maxInstances:
+                        raise TooManyInstancesError("Too many instances")
+            else:
+                self.mComplete = True
+                self.mIterator = None
+        self.append(end.duplicate(), instances)
+        return len(instances)
+
+    def prepend(self, start: Any, instances: List[Any]) -> None:
+        self.mStart = start
+        self.mInstances[:0] = instances
+        self.mPosixTimes[:0] = [instance.getPosixTime() for instance in instances]
+
+    def append(self, end: Any, instances: List[Any]) -> None:
+        self.mEnd = end
+        self.mInstances.extend(instances)
+        self.mPosixTimes.extend([instance.getPosixTime() for instance in instances])
+
+    def covers(self, start: Any, end: Any) -> bool:
+        return not (start < self.mStart) and (self.mComplete or not (self.mEnd < end))
+
+    def adjoins(self, start: Any, end: Any) -> bool:
+        return not (self.mEnd < start) and not (end < self.mStart)
+
+
+class RecurrenceCache(object):
+    """
+    An LRU cache of rule expansions bounded by the total number of instances held. Use
+    L{RecurrenceCache.getCache} for the cache shared by the whole process.
+    """
+
+    # The default bound on the number of instances held by a cache
+    cMaxInstances: int = 100000
+
+    sCache: Optional["RecurrenceCache"] = None
+
+    @classmethod
+    def getCache(cls) -> "RecurrenceCache":
+        if cls.sCache is None:
+            cls.sCache = cls()
+        return cls.sCache
+
+    def __init__(self, maxInstances: Optional[int] = None) -> None:
+        self.mMaxInstances = maxInstances if maxInstances is not None else self.cMaxInstances
+        self.mEntries: "OrderedDict[Hashable, RecurrenceCacheEntry]" = OrderedDict()
+        self.mInstanceCount = 0
+        self.mHits = 0
+        self.mMisses = 0
+        self.mExtensions = 0
+
+    def setMaxInstances(self, maxInstances: int) -> None:
+        self.mMaxInstances = maxInstances
+        self.evict()
+
+    def clear(self) -> None:
+        self.mEntries.clear()
+        self.mInstanceCount = 0
+
+    def getStatistics(self) -> Dict[str, int]:
+        """
+        Get the number of lookups fully answered from the cache (hits), answered by
+        extending an entry (extensions) or needing a new entry (misses), and the number of
+        entries and instances held.
+        """
+        return {
+            "hits": self.mHits,
+            "misses": self.mMisses,
+            "extensions": self.mExtensions,
+            "entries": len(self.mEntries),
+            "instances": self.mInstanceCount,
+        }
+
+    def resetStatistics(self) -> None:
+        self.mHits = 0
+        self.mMisses = 0
+        self.mExtensions = 0
+
+    def expand(
+        self,
+        recur: Any,
+        start: Any,
+        range_start: Any,
+        range_end: Any,
+        float_offset: int = 0,
+        include_start: bool = True,
+        maxInstances: Optional[int] = None,
+    ) -> Tuple[List[Any], bool]:
+        """
+        Get the instances of a rule within a range, in order, and whether the range
+        limited the results (i.e. the rule has instances outside the range). The
+        instances are copies, so the caller is free to change them.
+
+        @param recur: the rule
+        @type recur: L{Recurrence}
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        @param range_start: the start of the range
+        @type range_start: L{DateTime}
+        @param range_end: the end of the range (not included)
+        @type range_end: L{DateTime}
+        @param float_offset: the offset applied to a UTC UNTIL when the start is floating
+        @type float_offset: C{int}
+        @param include_start: see L{Recurrence.iterInstances}
+        @type include_start: C{bool}
+        @param maxInstances: if not C{None}, raise L{TooManyInstancesError} rather than
+            generate more instances than this for the range
+        @type maxInstances: C{int}
+        """
+        key = (
+            recur.hashKey(),
+            (
+                start.getYear(), start.getMonth(), start.getDay(),
+                start.getHours(), start.getMinutes(), start.getSeconds(),
+                start.isDateOnly(),
+            ),
+            (start.getTimezone().getUTC(), start.getTimezoneID(),),
+            float_offset,
+            include_start,
+        )
+
+        entry = self.mEntries.get(key)
+        try:
+            if entry is not None and entry.covers(range_start, range_end):
+                self.mHits += 1
+                self.mEntries.move_to_end(key)
+            elif entry is not None and entry.adjoins(range_start, range_end):
+                self.mExtensions += 1
+                self.mEntries.move_to_end(key)
+                if range_start < entry.mStart:
+                    before = self.newEntry(recur, start, range_start, float_offset, include_start)
+                    before.fill(entry.mStart, recur.periodBound(start, entry.mStart), maxInstances)
+                    entry.prepend(before.mStart, before.mInstances)
+                    self.mInstanceCount += len(before.mInstances)
+                self.mInstanceCount += entry.fill(range_end, recur.periodBound(start, range_end), maxInstances)
+            else:
+                self.mMisses += 1
+                if entry is not None:
+                    # A window that has moved away from the cached one replaces it. When it
+                    # has moved on the old generator can carry on, unless the rule can go
+                    # straight to the new window anyway.
+                    del self.mEntries[key]
+                    self.mInstanceCount -= len(entry.mInstances)
+                    if not entry.mComplete and not (range_start < entry.mEnd) and not recur.isClosedForm(start):
+                        moved = RecurrenceCacheEntry(range_start.duplicate(), entry.mIterator)
+                        moved.mPending = entry.mPending
+                        entry = moved
+                    else:
+                        entry = None
+                if entry is None:
+                    entry = self.newEntry(recur, start, range_start, float_offset, include_start)
+                self.mEntries[key] = entry
+                self.mInstanceCount += entry.fill(range_end, recur.periodBound(start, range_end), maxInstances)
+        except TooManyInstancesError:
+            # The generator has moved on without the entry, so it cannot be used again
+            if self.mEntries.pop(key, None) is not None:
+                self.mInstanceCount -= len(entry.mInstances)
+            raise
+
+        lo = bisect_left(entry.mPosixTimes, range_start.getPosixTime())
+        hi = bisect_left(entry.mPosixTimes, range_end.getPosixTime())
+        if maxInstances and hi - lo > maxInstances:
+            raise TooManyInstancesError("Too many instances")
+        results = [instance.duplicate() for instance in entry.mInstances[lo:hi]]
+        limited = start < range_start or not (entry.mComplete and hi == len(entry.mInstances))
+
+        self.evict()
+        return results, limited
+
+    def newEntry(
+        self,
+        recur: Any,
+        start: Any,
+        range_start: Any,
+        float_offset: int,
+        include_start: bool,
+    ) -> RecurrenceCacheEntry:
+        """
+        Create an empty entry starting at C{range_start}, with a generator of its own so
+        that later changes to the rule or start do not affect it.
+        """
+        range_start = range_start.duplicate()
+        iterator = recur.duplicate().iterInstances(start.duplicate(), range_start, float_offset, include_start, periods=True)
+        return RecurrenceCacheEntry(range_start, iterator)
+
+    def evict(self) -> None:
+        while self.mInstanceCount > self.mMaxInstances and self.mEntries:
+            _ignore, entry = self.mEntries.popitem(last=False)
+            self.mInstanceCount -= len(entry.mInstances)
@@ -13,9 +13,58 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##
-from typing import Any, List
+from typing import Any, Iterator, List, Tuple
 from pycalendar.icalendar.exceptions import TooManyInstancesError
-from pycalendar.utils import set_difference
+from pycalendar.utils import packedDifference
+import heapq
+
+
+def _posixTime(dt: Any) -> int:
+    return dt.getPosixTime()
+
+
+class _Exclusions(object):
+    """
+    The instances excluded from a set, each source worked out only as far as the
+    instances it is compared with, so an EXRULE that rarely (or never) matches is not
+    expanded ahead of the set's own instances.
+    """
+
+    def __init__(self, start: Any, sources: List[Tuple[Any, Iterator[Any]]]) -> None:
+        self.mStart = start
+        # The rule (or C{None} for dates), the iterator and the next item from it
+        self.mSources: List[List[Any]] = [[rule, iterator, None] for rule, iterator in sources]
+
+    def excludes(self, instance: Any) -> bool:
+        """
+        Whether an instance is excluded. Instances must be passed in chronological order.
+
+        @param instance: the instance
+        @type instance: L{DateTime}
+        """
+        posix = instance.getPosixTime()
+        bound = None
+        excluded = False
+        for source in self.mSources:
+            rule, iterator, next_excluded = source
+            while True:
+                if next_excluded is None:
+                    next_excluded = next(iterator, None)
+                    if next_excluded is None:
+                        break
+                if type(next_excluded) is tuple:
+                    # A period marker (see Recurrence.iterCandidates) past the instance
+                    # means the rule has nothing to compare with it yet
+                    if bound is None:
+                        bound = rule.periodBound(self.mStart, instance)
+                    if next_excluded > bound:
+                        break
+                elif next_excluded.getPosixTime() >= posix:
+                    excluded = excluded or next_excluded.getPosixTime() == posix
+                    break
+                next_excluded = None
+            source[2] = next_excluded
+        return excluded
 
 class RecurrenceSet(object):
     mRrules: List[Any]
@@ -147,9 +196,12 @@ class RecurrenceSet(object):
             include.append(start)
         else:
             limited = True
+        # The start is added above, so it only comes from a rule if the rule matches it
         for iter in self.mRrules:
-            if iter.expand(start, range, include, float_offset=float_offset, maxInstances=maxInstances):
+            if iter.expandCached(start, range, include, float_offset=float_offset, include_start=False, maxInstances=maxInstances):
                 limited = True
+            if maxInstances and len(include) > maxInstances:
+                raise TooManyInstancesError("Too many instances")
         for iter in self.mRdates:
             if range.isDateWithinPeriod(iter):
                 include.append(iter)
@@ -164,23 +216,65 @@ class RecurrenceSet(object):
                     raise TooManyInstancesError("Too many instances")
             else:
                 limited = True
-        include = [x for x in set(include)]
-        include.sort(key=lambda x: x.getPosixTime())
         exclude: List[Any] = []
         for iter in self.mExrules:
-            iter.expand(start, range, exclude, float_offset=float_offset)
+            iter.expandCached(start, range, exclude, float_offset=float_offset, include_start=False)
         for iter in self.mExdates:
             if range.isDateWithinPeriod(iter):
                 exclude.append(iter)
         for iter in self.mExperiods:
             if range.isPeriodOverlap(iter):
                 exclude.append(iter.getStart())
-        exclude = [x for x in set(exclude)]
-        exclude.sort(key=lambda x: x.getPosixTime())
-        items.extend(set_difference(include, exclude))
+        # De-duplicate, sort and exclude using packed integer date-times
+        items.extend(packedDifference(include, exclude))
         return limited
 
+    def iterInstances(self, start: Any, after: Any = None, float_offset: int = 0) -> Iterator[Any]:
+        """
+        Generate the instances of this set in chronological order, with the same results
+        as L{expand} but without a range: each rule is expanded lazily (see
+        L{Recurrence.iterInstances}) and the rules and dates are merged on a heap, so only
+        as many instances as the caller takes are ever worked out. The exclusions are only
+        worked out as far as those instances too.
+
+        @param start: the start of the recurrence (DTSTART)
+        @type start: L{DateTime}
+        @param after: if not C{None}, skip instances before this
+        @type after: L{DateTime}
+        @param float_offset: the offset applied to a UTC UNTIL when the start is floating
+        @type float_offset: C{int}
+        """
+
+        # The start is an instance, so it must be a valid date
+        start.normalise()
+
+        include: List[Any] = [iter([start])]
+        include.extend([rule.iterInstances(start, after, float_offset) for rule in self.mRrules])
+        include.append(sorted(self.mRdates, key=_posixTime))
+        include.append(sorted([period.getStart() for period in self.mRperiods], key=_posixTime))
+
+        exclude: List[Tuple[Any, Iterator[Any]]] = [
+            (rule, rule.iterInstances(start, after, float_offset, include_start=False, periods=True))
+            for rule in self.mExrules
+        ]
+        exclude.append((None, iter(sorted(self.mExdates, key=_posixTime))))
+        exclude.append((None, iter(sorted([period.getStart() for period in self.mExperiods], key=_posixTime))))
+        exclusions = _Exclusions(start, exclude)
+
+        last = None
+        for instance in heapq.merge(*include, key=_posixTime):
+            if after is not None and instance < after:
+                continue
+            posix = instance.getPosixTime()
+            if posix == last:
+                continue
+            last = posix
+            if not exclusions.excludes(instance):
+                yield instance
+
     def changed(self) -> None:
+        # Cached expansions are keyed by the rule content so need no invalidation, but
+        # each rule's own derived state (e.g. its compiled tables) has to be reset
         for iter in self.mRrules:
             iter.clear()
         for iter in self.mExrules:
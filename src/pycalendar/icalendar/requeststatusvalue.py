@@ -83,7 +83,7 @@ class RequestStatusValue(Value):
             data.text = self.mValue[2]
 
     def parseJSONValue(self, jobject: List[str]) -> None:
-        self.mValue = [x.encode("utf-8") if isinstance(x, str) else x for x in jobject]
+        self.mValue = list(jobject)
 
     def writeJSONValue(self, jobject: List[Any]) -> None:
         value: List[str] = [self.mValue[0], self.mValue[1]]
@@ -14,15 +14,19 @@
 #    limitations under the License.
 ##
 
+from pycalendar.componentbase import ComponentBase
 from pycalendar.datetime import DateTime
 from pycalendar.exceptions import InvalidData
 from pycalendar.icalendar.calendar import Calendar
+from pycalendar.icalendar.component import Component
 from pycalendar.icalendar.property import Property
 from pycalendar.parser import ParserContext
 from pycalendar.period import Period
 from pycalendar.timezone import Timezone
 import io as StringIO
 import difflib
+import os
+import tempfile
 import unittest
 
 
@@ -457,6 +461,453 @@ END:VCALENDAR
         cal.parseComponent(StringIO.StringIO(data2))
         self.assertEqual(str(cal), result)
 
+    def testIterComponents(self):
+
+        data = """BEGIN:VCALENDAR
+VERSION:2.0
+CALSCALE:GREGORIAN
+PRODID:-//Example Inc.//Example Calendar//EN
+BEGIN:VTIMEZONE
+TZID:America/Montreal
+LAST-MODIFIED:20040110T032845Z
+BEGIN:DAYLIGHT
+DTSTART:20000404T020000
+RRULE:FREQ=YEARLY;BYDAY=1SU;BYMONTH=4
+TZNAME:EDT
+TZOFFSETFROM:-0500
+TZOFFSETTO:-0400
+END:DAYLIGHT
+BEGIN:STANDARD
+DTSTART:20001026T020000
+RRULE:FREQ=YEARLY;BYDAY=-1SU;BYMONTH=10
+TZNAME:EST
+TZOFFSETFROM:-0400
+TZOFFSETTO:-0500
+END:STANDARD
+END:VTIMEZONE
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+DTSTART;VALUE=DATE:20020101
+DTEND;VALUE=DATE:20020102
+DTSTAMP:20020101T000000Z
+SUMMARY:New Year's Day
+END:VEVENT
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3253
+DTSTART;TZID=America/Montreal:20020102T090000
+DURATION:PT1H
+DTSTAMP:20020101T000000Z
+SUMMARY:Meeting
+BEGIN:VALARM
+ACTION:DISPLAY
+DESCRIPTION:Alarm
+TRIGGER;RELATED=START:-PT15M
+END:VALARM
+END:VEVENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+
+        cal = Calendar(add_defaults=False)
+        results = list(cal.iterComponents(StringIO.StringIO(data)))
+        self.assertEqual(len(results), 2)
+
+        comp, tzs = results[0]
+        self.assertEqual(comp.getUID(), "C3184A66-1ED0-11D9-A5E0-000A958A3252")
+        self.assertEqual(tzs, [])
+
+        comp, tzs = results[1]
+        self.assertEqual(comp.getUID(), "C3184A66-1ED0-11D9-A5E0-000A958A3253")
+        self.assertEqual(len(comp.getComponents("VALARM")), 1)
+        self.assertEqual([tz.getID() for tz in tzs], ["America/Montreal"])
+
+        # Only the calendar properties and timezones are retained
+        self.assertEqual(cal.countComponents("VEVENT"), 0)
+        self.assertEqual(cal.countComponents("VTIMEZONE"), 1)
+        self.assertTrue(cal.hasProperty("PRODID"))
+
+        # Components are held back until the VTIMEZONEs they reference have been read
+        vtimezone = data[data.index("BEGIN:VTIMEZONE"):data.index("BEGIN:VEVENT")]
+        unknown = """BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3254
+DTSTART;TZID=Unknown/Zone:20020103T090000
+DTSTAMP:20020101T000000Z
+END:VEVENT
+""".replace("\n", "\r\n")
+        data = data.replace(vtimezone, "").replace("END:VCALENDAR", vtimezone + unknown + "END:VCALENDAR")
+        cal = Calendar(add_defaults=False)
+        results = list(cal.iterComponents(StringIO.StringIO(data)))
+        self.assertEqual(
+            [(comp.getUID()[-4:], [tz.getID() for tz in tzs]) for comp, tzs in results],
+            [("3252", []), ("3253", ["America/Montreal"]), ("3254", [])],
+        )
+
+    def testParseFile(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for ctr, caldata in enumerate(self.data):
+                path = os.path.join(tmpdir, "{}.ics".format(ctr))
+                with open(path, "wb") as f:
+                    f.write(caldata.encode("utf-8"))
+
+                cal = Calendar.parseFile(path)
+                self.assertEqual(cal.getText(), caldata, "\n".join(difflib.unified_diff(cal.getText().splitlines(), caldata.splitlines())))
+
+    def testGenerateBytes(self):
+
+        for caldata in self.data:
+            cal = Calendar.parseText(caldata)
+            expected = cal.getText().encode("utf-8")
+            for chunkSize in (1, 64, 1024 * 1024):
+                chunks = list(cal.generateBytes(chunkSize))
+                self.assertEqual(b"".join(chunks), expected)
+                if chunkSize == 1024 * 1024:
+                    self.assertEqual(len(chunks), 1)
+            sink = StringIO.BytesIO()
+            cal.writeBytes(sink, 128)
+            self.assertEqual(sink.getvalue(), expected)
+
+    def testComponentIndexes(self):
+
+        cal = Calendar()
+        events = []
+        for ctr in range(5):
+            event = Component.makeComponent("VEVENT", cal)
+            event.setUID("event-{}".format(ctr))
+            cal.addComponent(event)
+            events.append(event)
+            cal.addComponent(Component.makeComponent("X-TEST", cal))
+        todo = Component.makeComponent("VTODO", cal)
+        todo.setUID("todo")
+        cal.addComponent(todo)
+
+        self.assertEqual(cal.getComponents("vevent"), events)
+        self.assertEqual(cal.countComponents("X-TEST"), 5)
+        self.assertTrue(cal.hasComponent("VTODO"))
+        self.assertFalse(cal.hasComponent("VJOURNAL"))
+        self.assertEqual(len(cal.getComponents()), 11)
+
+        self.assertTrue(cal.getComponentByKey(events[2].getMapKey()) is events[2])
+        self.assertTrue(cal.getComponentByKey("missing") is None)
+
+        # Keys changed after the component was added are still found
+        cal.changeUID("event-2", "changed")
+        self.assertTrue(cal.getComponentByKey(events[2].getMapKey()) is events[2])
+
+        cal.removeComponentByKey(events[2].getMapKey())
+        self.assertEqual(cal.getComponents("VEVENT"), events[:2] + events[3:])
+        self.assertTrue(cal.getComponentByKey(events[2].getMapKey()) is None)
+
+        cal.removeComponent(todo)
+        self.assertFalse(cal.hasComponent("VTODO"))
+        self.assertEqual(cal.countComponents("VTODO"), 0)
+
+        cal.removeAllComponent("X-TEST")
+        self.assertEqual(cal.getComponents(), events[:2] + events[3:])
+
+    def testStructuralHash(self):
+
+        data1 = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Example Inc.//Example Calendar//EN
+BEGIN:X-COMPONENT
+X-ONE:1
+X-TWO:2
+BEGIN:X-SUB
+X-THREE:3
+END:X-SUB
+BEGIN:X-SUB
+X-FOUR:4
+END:X-SUB
+END:X-COMPONENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+        data2 = data1.replace("X-ONE:1\r\nX-TWO:2", "X-TWO:2\r\nX-ONE:1").replace("X-THREE:3", "X-TEMP").replace("X-FOUR:4", "X-THREE:3").replace("X-TEMP", "X-FOUR:4")
+
+        comp1 = Calendar.parseText(data1).getComponents()[0]
+        comp2 = Calendar.parseText(data2).getComponents()[0]
+        self.assertEqual(comp1.structuralHash(), comp2.structuralHash())
+        self.assertEqual(comp1, comp2)
+        self.assertTrue(comp1.mHashTrusted and comp2.mHashTrusted)
+
+        comp2.addProperty(Property("X-FIVE", "5"))
+        self.assertNotEqual(comp1.structuralHash(), comp2.structuralHash())
+        self.assertNotEqual(comp1, comp2)
+
+        # Changes to sub-components clear the cached hash of the parent
+        comp2.removeProperties("X-FIVE")
+        self.assertEqual(comp1, comp2)
+        comp2.getComponents()[0].addProperty(Property("X-FIVE", "5"))
+        self.assertNotEqual(comp1, comp2)
+
+        # Once properties are handed out the cached hash is not relied on, as values can
+        # then be changed in place
+        comp2 = Calendar.parseText(data2).getComponents()[0]
+        self.assertEqual(comp1.structuralHash(), comp2.structuralHash())
+        comp2.getProperties("X-ONE")[0].getValue().setValue("5")
+        self.assertFalse(comp2.mHashTrusted)
+        self.assertNotEqual(comp1.structuralHash(), comp2.structuralHash())
+        self.assertNotEqual(comp1, comp2)
+        comp2.getProperties("X-ONE")[0].getValue().setValue("1")
+        self.assertEqual(comp1, comp2)
+
+        # Including those of sub-components
+        comp2 = Calendar.parseText(data2).getComponents()[0]
+        self.assertEqual(comp1, comp2)
+        comp2.getComponents("X-SUB")[0].findFirstProperty("X-FOUR").getValue().setValue("5")
+        self.assertFalse(comp2.mHashTrusted)
+        self.assertNotEqual(comp1, comp2)
+
+        data3 = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Example Inc.//Example Calendar//EN
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+DTSTART:20020101T120000Z
+DURATION:PT1H
+DTSTAMP:20020101T000000Z
+BEGIN:VALARM
+ACTION:DISPLAY
+DESCRIPTION:Alarm
+TRIGGER:-PT10M
+END:VALARM
+END:VEVENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+
+        event1 = Calendar.parseText(data3).getComponents()[0]
+        event2 = Calendar.parseText(data3).getComponents()[0]
+        self.assertEqual(event1, event2)
+        alarm = event2.getComponents("VALARM")[0]
+        alarm.addProperty(Property("X-FIVE", "5"))
+        self.assertNotEqual(event1, event2)
+        alarm.removeProperties("X-FIVE")
+        self.assertEqual(event1, event2)
+        self.assertEqual(event1.structuralHash(), event2.structuralHash())
+
+    def testDiff(self):
+
+        data = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Example Inc.//Example Calendar//EN
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+DTSTART:20020101T120000Z
+DURATION:PT1H
+DTSTAMP:20020101T000000Z
+RRULE:FREQ=DAILY
+SUMMARY:Master
+END:VEVENT
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+RECURRENCE-ID:20020102T120000Z
+DTSTART:20020102T140000Z
+DURATION:PT1H
+DTSTAMP:20020101T000000Z
+SUMMARY:Override
+END:VEVENT
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+RECURRENCE-ID:20020103T120000Z
+DTSTART:20020103T140000Z
+DURATION:PT1H
+DTSTAMP:20020101T000000Z
+SUMMARY:Removed
+END:VEVENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+        data2 = data.replace("SUMMARY:Override", "SUMMARY:Changed").replace("20020103T", "20020104T")
+
+        cal1 = Calendar.parseText(data)
+        cal2 = Calendar.parseText(data2)
+        added, removed, changed = cal1.diff(cal2)
+        uid = "C3184A66-1ED0-11D9-A5E0-000A958A3252"
+        self.assertEqual(list(added.keys()), [("VEVENT", uid, "20020104T120000Z")])
+        self.assertEqual(list(removed.keys()), [("VEVENT", uid, "20020103T120000Z")])
+        self.assertEqual(list(changed.keys()), [("VEVENT", uid, "20020102T120000Z")])
+        self.assertTrue(changed[("VEVENT", uid, "20020102T120000Z")][1] is cal2.getComponents()[1])
+
+        # Values changed in place are found too
+        cal2 = Calendar.parseText(data)
+        self.assertEqual(cal1.diff(cal2), ({}, {}, {}))
+        cal2.getComponents()[0].getProperties("SUMMARY")[0].setValue("Edited")
+        added, removed, changed = cal1.diff(cal2)
+        self.assertEqual(list(changed.keys()), [("VEVENT", uid, None)])
+
+        self.assertEqual(cal1.diff(Calendar.parseText(data)), ({}, {}, {}))
+
+    def testDuplicateCopyOnWrite(self):
+
+        data = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Example Inc.//Example Calendar//EN
+BEGIN:X-COMPONENT
+X-ONE:1
+BEGIN:X-SUB
+X-TWO:2
+END:X-SUB
+END:X-COMPONENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+
+        cal = Calendar.parseText(data)
+        original = cal.getComponents()[0]
+
+        # Nothing is copied until needed
+        copy = original.duplicate()
+        self.assertTrue(copy.mProperties is original.mProperties)
+        self.assertTrue(copy.mComponents is original.mComponents)
+        self.assertEqual(copy, original)
+        self.assertEqual(copy.getText(), original.getText())
+
+        # Changing the copy leaves the original alone
+        copy.addProperty(Property("X-THREE", "3"))
+        self.assertFalse(copy.mProperties is original.mProperties)
+        self.assertFalse(original.hasProperty("X-THREE"))
+        copy.getComponents()[0].addProperty(Property("X-FOUR", "4"))
+        self.assertFalse(original.getComponents()[0].hasProperty("X-FOUR"))
+        self.assertTrue(copy.getComponents()[0].getParentComponent() is copy)
+
+        # And changing the original leaves the copy alone
+        copy = original.duplicate()
+        original.removeProperties("X-ONE")
+        self.assertTrue(copy.hasProperty("X-ONE"))
+        self.assertEqual(copy.getText(), data.split("\r\n", 3)[3].rsplit("END:VCALENDAR", 1)[0])
+        copy.removeProperties("X-ONE")
+        self.assertEqual(copy, original)
+        self.assertTrue(original.getComponents()[0].getParentComponent() is original)
+
+        # Calendars keep their UID indexes in step with their own components
+        cal2 = cal.duplicate()
+        self.assertEqual(cal2.getText(), cal.getText())
+        self.assertFalse(cal2.getComponents()[0] is cal.getComponents()[0])
+        self.assertTrue(cal2.getComponents()[0].getParentComponent() is cal2)
+
+    def testCachedText(self):
+
+        data = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Example Inc.//Example Calendar//EN
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+DTSTART:20020101T120000Z
+DURATION:PT1H
+DTSTAMP:20020101T000000Z
+SUMMARY:One
+BEGIN:VALARM
+ACTION:DISPLAY
+DESCRIPTION:Alarm
+TRIGGER:-PT10M
+END:VALARM
+END:VEVENT
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3253
+DTSTART:20020101T120000Z
+DURATION:PT1H
+DTSTAMP:20020101T000000Z
+SUMMARY:Two
+END:VEVENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+
+        save = ComponentBase.sCacheText
+        ComponentBase.sCacheText = True
+        try:
+            cal = Calendar.parseText(data)
+            self.assertEqual(cal.getText(), data)
+            self.assertEqual(b"".join(cal.generateBytes()), data.encode("utf-8"))
+            one, two = cal.getComponents("VEVENT")
+            alarm = one.getComponents("VALARM")[0]
+            self.assertTrue(cal.mCachedText is None)
+            self.assertTrue(one.mCachedText is not None and one.mCachedBytes is not None)
+            self.assertTrue(alarm.mCachedText is not None)
+
+            # Changing a sub-component only clears its own cache and that of its parents
+            alarm.removeProperties("DESCRIPTION")
+            alarm.addProperty(Property("DESCRIPTION", "Changed"))
+            self.assertTrue(alarm.mCachedText is None and one.mCachedText is None and one.mCachedBytes is None)
+            self.assertTrue(two.mCachedText is not None)
+            data = data.replace("DESCRIPTION:Alarm", "DESCRIPTION:Changed")
+            self.assertEqual(cal.getText(), data)
+            self.assertEqual(b"".join(cal.generateBytes()), data.encode("utf-8"))
+
+            alarm.removeProperties("ACTION")
+            alarm.addProperty(Property("ACTION", "AUDIO"))
+            self.assertTrue(alarm.mCachedText is None and one.mCachedText is None and one.mCachedBytes is None)
+            data = data.replace("ACTION:DISPLAY", "ACTION:AUDIO")
+            self.assertEqual(cal.getText(), data)
+
+            # In place changes need an explicit changed()
+            two.getProperties("SUMMARY")[0].setValue("Three")
+            self.assertEqual(cal.getText(), data)
+            two.changed()
+            self.assertEqual(cal.getText(), data.replace("SUMMARY:Two", "SUMMARY:Three"))
+        finally:
+            ComponentBase.sCacheText = save
+
+    def testParseIncremental(self):
+
+        for caldata in self.data:
+            cal = Calendar.parseTextIncremental(caldata)
+            self.assertEqual(cal.getText(), caldata, "\n".join(difflib.unified_diff(cal.getText().splitlines(), caldata.splitlines())))
+
+        data1 = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Example Inc.//Example Calendar//EN
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+DTSTART:20020101T120000Z
+DURATION:PT1H
+DTSTAMP:20020101T000000Z
+RRULE:FREQ=DAILY
+SUMMARY:Master
+END:VEVENT
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+RECURRENCE-ID:20020102T120000Z
+DTSTART:20020102T140000Z
+DURATION:PT1H
+DTSTAMP:20020101T000000Z
+SUMMARY:Override
+END:VEVENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+        data2 = data1.replace("SUMMARY:Override", "SUMMARY:Changed")
+
+        cal1 = Calendar.parseTextIncremental(data1)
+        master, override = cal1.getComponents("VEVENT")
+        cal2 = Calendar.parseTextIncremental(data2, cal1)
+        self.assertEqual(cal2.getText(), data2)
+        self.assertTrue(cal2.getComponents("VEVENT")[0] is master)
+        self.assertTrue(cal2.getComponents("VEVENT")[1] is not override)
+        self.assertTrue(master.getParentComponent() is cal2)
+        self.assertTrue(cal2.masterComponent() is master)
+        self.assertEqual(len(cal2.mOverriddenComponentsByUID[master.getUID()]), 1)
+
+        # Bad data leaves the previous calendar untouched
+        self.assertRaises(InvalidData, Calendar.parseTextIncremental, data1.replace("END:VCALENDAR\r\n", ""), cal2)
+        self.assertTrue(master.getParentComponent() is cal2)
+
+    def testIterComponentsFail(self):
+
+        data = (
+            """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Example Inc.//Example Calendar//EN
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+DTSTART;VALUE=DATE:20020101
+""".replace("\n", "\r\n"),
+
+            """BEGIN:VCALENDAR
+PRODID:-//Example Inc.//Example Calendar//EN
+END:VCALENDAR
+""".replace("\n", "\r\n"),
+        )
+
+        for item in data:
+            cal = Calendar(add_defaults=False)
+            self.assertRaises(InvalidData, list, cal.iterComponents(StringIO.StringIO(item)))
+
     def testParseFail(self):
 
         data = (
@@ -13,7 +13,9 @@
 #    limitations under the License.
 ##
 
+from pycalendar.componentbase import ComponentBase
 from pycalendar.icalendar.calendar import Calendar
+from pycalendar.icalendar.property import Property
 import io as StringIO
 import unittest
 
@@ -65,3 +67,89 @@ END:VCALENDAR
 
         self.assertEqual(data[0], str(cal1))
         self.assertEqual(data[1], str(cal2))
+
+    def testDuplicateStaysShared(self):
+
+        data = """BEGIN:VCALENDAR
+VERSION:2.0
+CALSCALE:GREGORIAN
+PRODID:-//mulberrymail.com//Mulberry v4.0//EN
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+DTSTART;VALUE=DATE:20020101
+DTEND;VALUE=DATE:20020102
+DTSTAMP:20020101T000000Z
+RRULE:FREQ=YEARLY
+SUMMARY:New Year's Day
+END:VEVENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+
+        cal = Calendar.parseText(data)
+        vevent = cal.getComponents()[0]
+        text = vevent.getText()
+
+        # Duplicating, reading values and output do not copy the properties
+        copy = vevent.duplicate()
+        self.assertTrue(copy.mProperties is vevent.mProperties)
+        self.assertTrue(copy.isRecurring())
+        self.assertEqual(copy.loadValueString("SUMMARY"), "New Year's Day")
+        self.assertEqual(copy.countProperty("RRULE"), 1)
+        self.assertEqual(copy.getText(), text)
+        self.assertTrue(copy.mProperties is vevent.mProperties)
+
+        # Handing out a property does, so changing it leaves the original alone
+        copy.findFirstProperty("SUMMARY").setValue("Changed")
+        self.assertFalse(copy.mProperties is vevent.mProperties)
+        self.assertEqual(vevent.loadValueString("SUMMARY"), "New Year's Day")
+        self.assertEqual(copy.loadValueString("SUMMARY"), "Changed")
+
+        # Changing the rules does too
+        copy = vevent.duplicate()
+        rrules = copy.getRecurrenceSet()
+        self.assertFalse(copy.mProperties is vevent.mProperties)
+        for rrule in rrules.getRules():
+            rrule.setUseCount(True)
+            rrule.setCount(400)
+            rrules.changed()
+        copy.changed()
+        self.assertEqual(vevent.getText(), text)
+        self.assertEqual(copy.getText(), text.replace("RRULE:FREQ=YEARLY", "RRULE:FREQ=YEARLY;COUNT=400"))
+
+    def testDuplicateOriginalChangesFirst(self):
+
+        data = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//mulberrymail.com//Mulberry v4.0//EN
+BEGIN:VEVENT
+UID:C3184A66-1ED0-11D9-A5E0-000A958A3252
+DTSTART:20020101T100000Z
+DTSTAMP:20020101T000000Z
+SUMMARY:Meeting
+BEGIN:VALARM
+ACTION:DISPLAY
+DESCRIPTION:Reminder
+TRIGGER:-PT5M
+END:VALARM
+END:VEVENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+
+        save = ComponentBase.sCacheText
+        ComponentBase.sCacheText = True
+        try:
+            vevent = Calendar.parseText(data).getComponents()[0]
+            copy = vevent.duplicate()
+            text = copy.getText()
+
+            # The copy keeps the original sub-components, which now belong to it
+            vevent.addProperty(Property("X-ONE", "1"))
+            valarm = copy.getComponents("VALARM")[0]
+            self.assertTrue(valarm.getParentComponent() is copy)
+            valarm.addProperty(Property("X-TWO", "2"))
+            self.assertTrue("X-TWO" in copy.getText())
+            self.assertFalse("X-TWO" in vevent.getText())
+            self.assertFalse("X-ONE" in copy.getText())
+            self.assertNotEqual(copy.getText(), text)
+        finally:
+            ComponentBase.sCacheText = save
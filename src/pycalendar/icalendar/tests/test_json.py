@@ -16,6 +16,7 @@
 ##
 
 
+from pycalendar.exceptions import InvalidData
 from pycalendar.icalendar.calendar import Calendar
 from pycalendar.icalendar.property import Property
 import difflib
@@ -774,6 +775,17 @@ END:VCALENDAR
         for item1, item2 in self.data:
             _doRoundtrip(item1, item2)
 
+    def testGenerateJSONCompact(self):
+
+        for caldata, _ignore_jcaldata in self.data:
+            cal = Calendar.parseText(caldata)
+            jobject = []
+            cal.writeJSON(jobject)
+
+            test1 = json.dumps(jobject[0], separators=(',', ':'), sort_keys=True)
+            test2 = cal.getTextJSON(sort_keys=True, compact=True)
+            self.assertEqual(test1, test2)
+
     def testParseJSON(self):
 
         def _doRoundtrip(caldata, jcaldata):
@@ -810,6 +822,21 @@ END:VCALENDAR
         for item1, item2 in self.i18ndata:
             _doRoundtrip(item1, item2)
 
+    def testParseJSONFast(self):
+
+        for item1, item2 in self.data + self.i18ndata:
+            test1 = Calendar.parseText(item1).getText()
+            test2 = Calendar.parseJSONDataFast(item2).getText()
+
+            self.assertEqual(
+                test1,
+                test2,
+                "\n".join(difflib.unified_diff(str(test1).splitlines(), test2.splitlines()))
+            )
+
+        self.assertRaises(InvalidData, Calendar.parseJSONDataFast, '["vcalendar", [["version", {}, "text"]], []]')
+        self.assertRaises(InvalidData, Calendar.parseJSONDataFast, '["vcalendar", ')
+
     def testjCalExample1(self):
 
         jcaldata = """["vcalendar",
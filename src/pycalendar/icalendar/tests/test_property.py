@@ -16,6 +16,7 @@
 
 from pycalendar.parameter import Parameter
 from pycalendar.exceptions import InvalidProperty
+from pycalendar.icalendar import definitions
 from pycalendar.icalendar.property import Property
 from pycalendar.parser import ParserContext
 from pycalendar.value import Value
@@ -172,3 +173,57 @@ class TestProperty(unittest.TestCase):
         prop = Property.parseText(data)
         self.assertEqual(prop.getParameterValue("X-BAR"), "\"Check\"")
         self.assertEqual(prop.getParameterValue("X-BAR2"), "Check\nThis\tOut\n")
+
+    def testLazyValues(self):
+
+        save = ParserContext.LAZY_PROPERTY_VALUES
+        ParserContext.LAZY_PROPERTY_VALUES = True
+        try:
+            # Unchanged properties are written back as-is, even when the value is read
+            data = "ATTENDEE;ROLE=CHAIR;PARTSTAT=ACCEPTED:mailto:jdoe@example.com"
+            prop = Property.parseText(data)
+            self.assertTrue(prop.mValue is None)
+            self.assertEqual(str(prop), data + "\r\n")
+            self.assertEqual(prop.getCalAddressValue().getValue(), "mailto:jdoe@example.com")
+            self.assertEqual(str(prop), data + "\r\n")
+            self.assertEqual(prop, Property.parseText(data))
+            self.assertEqual(str(prop.duplicate()), data + "\r\n")
+
+            # Changes cause the property to be generated
+            prop.getCalAddressValue().setValue("mailto:other@example.com")
+            self.assertEqual(str(prop), "ATTENDEE;PARTSTAT=ACCEPTED;ROLE=CHAIR:mailto:other@example.com\r\n")
+
+            prop = Property.parseText(data)
+            prop.replaceParameter(Parameter("ROLE", "REQ-PARTICIPANT"))
+            self.assertEqual(str(prop), "ATTENDEE;PARTSTAT=ACCEPTED;ROLE=REQ-PARTICIPANT:mailto:jdoe@example.com\r\n")
+
+            # Parameters changed in place also cause the property to be generated
+            prop = Property.parseText(data)
+            prop.getParameters()[definitions.cICalParameter_PARTSTAT][0].setValues(["DECLINED"])
+            self.assertEqual(str(prop), "ATTENDEE;PARTSTAT=DECLINED;ROLE=CHAIR:mailto:jdoe@example.com\r\n")
+
+            prop = Property.parseText(data)
+            del prop.getParameters()["ROLE"]
+            self.assertEqual(str(prop), "ATTENDEE;PARTSTAT=ACCEPTED:mailto:jdoe@example.com\r\n")
+
+            # Bad values are only detected when the value is used
+            prop = Property.parseText("SEQUENCE:b")
+            self.assertRaises(InvalidProperty, prop.getValue)
+        finally:
+            ParserContext.LAZY_PROPERTY_VALUES = save
+
+    def testInternedNames(self):
+
+        prop = Property.parseText("ATTENDEE;PARTSTAT=ACCEPTED;X-FOO=1:mailto:jdoe@example.com")
+        self.assertTrue(prop.getName() is definitions.cICalProperty_ATTENDEE)
+        self.assertTrue(prop.getParameters()[definitions.cICalParameter_PARTSTAT][0].getName() is definitions.cICalParameter_PARTSTAT)
+
+        # Case is preserved, but the keys are canonical
+        prop1 = Property.parseText("attendee;partstat=ACCEPTED;x-foo=1:mailto:jdoe@example.com")
+        prop2 = Property.parseText("attendee;partstat=ACCEPTED;x-foo=1:mailto:jdoe@example.com")
+        self.assertEqual(prop1.getName(), "attendee")
+        self.assertTrue(prop1.getName() is prop2.getName())
+        self.assertEqual(prop1.getParameters()["PARTSTAT"][0].getName(), "partstat")
+        self.assertEqual(str(prop1), "attendee;partstat=ACCEPTED;x-foo=1:mailto:jdoe@example.com\r\n")
+        for key1, key2 in zip(sorted(prop1.getParameters().keys()), sorted(prop2.getParameters().keys())):
+            self.assertTrue(key1 is key2)
@@ -15,8 +15,13 @@
 ##
 
 from pycalendar.datetime import DateTime
+from pycalendar.icalendar import definitions
 from pycalendar.period import Period
 from pycalendar.icalendar.recurrence import Recurrence
+from pycalendar.icalendar.recurrencebatch import BatchExpander
+from pycalendar.icalendar.recurrencecache import RecurrenceCache
+from pycalendar.icalendar.recurrenceset import RecurrenceSet
+from itertools import dropwhile, islice, takewhile
 import unittest
 from pycalendar.timezone import Timezone
 import os
@@ -193,7 +198,7 @@ class TestRecurrence(unittest.TestCase):
             recur.parse(i["rule"])
             start = DateTime.parseText(i["start"])
             end = DateTime.parseText(i["end"])
-            results = map(DateTime.parseText, i["results"])
+            results = list(map(DateTime.parseText, i["results"]))
 
             items = []
             range = Period(start, end)
@@ -223,3 +228,291 @@ class TestRecurrence(unittest.TestCase):
         items = []
         recur.expand(start, range, items)
         self.assertEqual(len(items), 10)
+
+    def testIterInstances(self):
+
+        examples = os.path.join(os.path.dirname(__file__), "rrule_examples.json")
+        with open(examples) as f:
+            examples = json.loads(f.read())
+
+        for ctr, i in enumerate(examples):
+
+            recur = Recurrence()
+            recur.parse(i["rule"])
+            start = DateTime.parseText(i["start"])
+            end = DateTime.parseText(i["end"])
+
+            # The results are those of the rule alone, so only include the start if it matches
+            self.assertEqual(
+                list(takewhile(lambda x: x < end, recur.iterInstances(start, include_start=False))),
+                [DateTime.parseText(result) for result in i["results"]],
+                msg="Failed rule: #{} {}".format(ctr + 1, i["rule"])
+            )
+
+    def testIterInstancesByDayByMonthDay(self):
+
+        # RFC 5545: the first Saturday that follows the first Sunday of the month
+        recur = Recurrence.parseText("FREQ=MONTHLY;COUNT=10;BYDAY=SA;BYMONTHDAY=7,8,9,10,11,12,13")
+        start = DateTime.parseText("19970913T090000")
+        self.assertEqual(
+            [instance.getText() for instance in recur.iterInstances(start)],
+            [
+                "19970913T090000",
+                "19971011T090000",
+                "19971108T090000",
+                "19971213T090000",
+                "19980110T090000",
+                "19980207T090000",
+                "19980307T090000",
+                "19980411T090000",
+                "19980509T090000",
+                "19980613T090000",
+            ],
+        )
+
+        # RFC 5545: every Friday the 13th, with the start excluded
+        rset = RecurrenceSet()
+        rset.addRule(Recurrence.parseText("FREQ=MONTHLY;BYDAY=FR;BYMONTHDAY=13"))
+        rset.subtractDT(DateTime.parseText("19970902T090000"))
+        self.assertEqual(
+            [instance.getText() for instance in islice(rset.iterInstances(DateTime.parseText("19970902T090000")), 5)],
+            [
+                "19980213T090000",
+                "19980313T090000",
+                "19981113T090000",
+                "19990813T090000",
+                "20001013T090000",
+            ],
+        )
+
+    def testIterInstancesSet(self):
+
+        recur = Recurrence()
+        recur.parse("FREQ=DAILY")
+        exrule = Recurrence()
+        exrule.parse("FREQ=WEEKLY;BYDAY=SA,SU")
+        start = DateTime(2014, 1, 1, 12, 0, 0)
+
+        rset = RecurrenceSet()
+        rset.addRule(recur)
+        rset.subtractRule(exrule)
+        rset.addDT(DateTime(2014, 1, 4, 9, 0, 0))
+        rset.addDT(DateTime(2014, 1, 3, 12, 0, 0))
+        rset.subtractDT(DateTime(2014, 1, 2, 12, 0, 0))
+
+        self.assertEqual(
+            list(islice(rset.iterInstances(start), 5)),
+            [
+                DateTime(2014, 1, 1, 12, 0, 0),
+                DateTime(2014, 1, 3, 12, 0, 0),
+                DateTime(2014, 1, 4, 9, 0, 0),
+                DateTime(2014, 1, 6, 12, 0, 0),
+                DateTime(2014, 1, 7, 12, 0, 0),
+            ],
+        )
+        self.assertEqual(
+            list(islice(rset.iterInstances(start, after=DateTime(2014, 6, 1, 0, 0, 0)), 2)),
+            [
+                DateTime(2014, 6, 2, 12, 0, 0),
+                DateTime(2014, 6, 3, 12, 0, 0),
+            ],
+        )
+
+    def testIterInstancesNoMatch(self):
+
+        # A rule that never matches stops looking at its UNTIL
+        recur = Recurrence.parseText("FREQ=HOURLY;BYMONTH=2;BYMONTHDAY=30;UNTIL=20200301T000000Z")
+        start = DateTime.parseText("20200101T000000Z")
+        instances = list(recur.iterInstances(start, periods=True))
+        self.assertEqual(instances[0], start)
+        self.assertTrue(all(type(instance) is tuple for instance in instances[1:]))
+        self.assertTrue(instances[-1] <= (2020, 3, 1, 1, 0, 0))
+
+        # An exclusion that never matches is only worked out as far as the instances
+        rset = RecurrenceSet()
+        rset.addRule(Recurrence.parseText("FREQ=DAILY;COUNT=2"))
+        rset.subtractRule(Recurrence.parseText("FREQ=HOURLY;BYMONTH=2;BYMONTHDAY=30"))
+        self.assertEqual(
+            list(rset.iterInstances(start)),
+            [
+                DateTime.parseText("20200101T000000Z"),
+                DateTime.parseText("20200102T000000Z"),
+            ],
+        )
+
+    def testClosedForm(self):
+
+        start = DateTime(2014, 1, 31, 12, 0, 0, tzid=Timezone(tzid="America/New_York"))
+        for rule, closed in (
+            ("FREQ=DAILY;INTERVAL=3", True),
+            ("FREQ=WEEKLY;BYDAY=FR", True),
+            ("FREQ=WEEKLY;BYDAY=MO", False),
+            ("FREQ=MONTHLY", False),
+            ("FREQ=YEARLY;UNTIL=20200101T000000Z", True),
+            ("FREQ=YEARLY;BYMONTH=1", False),
+            ("FREQ=HOURLY", False),
+        ):
+            recur = Recurrence()
+            recur.parse(rule)
+            self.assertEqual(recur.isClosedForm(start), closed, msg=rule)
+
+        start = DateTime(2014, 1, 15, 12, 0, 0, tzid=Timezone(tzid="America/New_York"))
+        after = DateTime(2063, 7, 4, 0, 0, 0, tzid=Timezone(utc=True))
+        for rule in (
+            "FREQ=DAILY;INTERVAL=3",
+            "FREQ=WEEKLY;INTERVAL=2;BYDAY=WE",
+            "FREQ=MONTHLY;INTERVAL=5",
+            "FREQ=YEARLY",
+        ):
+            recur = Recurrence()
+            recur.parse(rule)
+            self.assertTrue(recur.isClosedForm(start), msg=rule)
+            self.assertEqual(
+                list(islice(recur.iterInstances(start, after), 3)),
+                list(islice(dropwhile(lambda x: x < after, recur.iterCandidates(start)), 3)),
+                msg=rule,
+            )
+
+        recur = Recurrence()
+        recur.parse("FREQ=DAILY;COUNT=10")
+        self.assertEqual(recur.getInstanceIndex(start, DateTime(2014, 1, 20, 0, 0, 0)), 5)
+        self.assertEqual(list(recur.iterInstances(start, DateTime(2014, 1, 20, 0, 0, 0)))[-1], DateTime(2014, 1, 24, 12, 0, 0, tzid=Timezone(tzid="America/New_York")))
+        self.assertEqual(list(recur.iterInstances(start, after)), [])
+
+    def testCompileOnChange(self):
+
+        recur = Recurrence()
+        recur.parse("FREQ=MONTHLY;BYDAY=-1FR")
+        start = DateTime(2014, 1, 31, 12, 0, 0)
+        compiled = recur.compile(start)
+        self.assertTrue(compiled is not None)
+        self.assertTrue(recur.compile(start) is compiled)
+        self.assertEqual(compiled.expandPeriod(2014, 2, 1), [(2014, 2, 28, 12, 0, 0)])
+
+        # Tables are shared by all years of the same kind
+        for year in range(2014, 2114):
+            compiled.expandPeriod(year, 1, 1)
+        self.assertTrue(len(compiled.mTables) <= 14)
+
+        recur.setByDay([(-1, definitions.eRecurrence_WEEKDAY_MO)])
+        self.assertTrue(recur.mCompiled is None)
+        self.assertEqual(recur.compile(start).expandPeriod(2014, 2, 1), [(2014, 2, 24, 12, 0, 0)])
+
+        recur.setByYearDay([1])
+        self.assertTrue(recur.compile(start) is None)
+
+    @unittest.skipUnless(BatchExpander.available(), "NumPy is not installed")
+    def testBatchExpand(self):
+
+        examples = os.path.join(os.path.dirname(__file__), "rrule_examples.json")
+        with open(examples) as f:
+            examples = json.loads(f.read())
+
+        window_start = DateTime(2012, 6, 1, 0, 0, 0)
+        window_end = DateTime(2017, 1, 1, 0, 0, 0)
+        rules = []
+        starts = []
+        expected = []
+        for i in examples:
+            start = DateTime.parseText(i["start"])
+            if start.getDay() > 31:
+                # Not a real date, so it has no datetime64 equivalent
+                continue
+            recur = Recurrence()
+            recur.parse(i["rule"])
+            rset = RecurrenceSet()
+            rset.addRule(recur)
+            rules.append(recur)
+            starts.append(start)
+            expected.append([
+                BatchExpander.datetime64(instance)
+                for instance in takewhile(lambda x: x < window_end, rset.iterInstances(start, window_start))
+            ])
+
+        results = BatchExpander(window_start, window_end).expandAll(rules, starts)
+        for ctr, (result, instances) in enumerate(zip(results, expected)):
+            self.assertEqual(
+                list(result),
+                instances,
+                msg="Failed rule: #{} {}".format(ctr + 1, rules[ctr])
+            )
+
+    def testExpandCache(self):
+
+        cache = RecurrenceCache(maxInstances=100)
+        start = DateTime(2014, 1, 1, 12, 0, 0)
+        january = (DateTime(2014, 1, 1, 0, 0, 0), DateTime(2014, 2, 1, 0, 0, 0),)
+        february = (DateTime(2014, 2, 1, 0, 0, 0), DateTime(2014, 3, 1, 0, 0, 0),)
+
+        recur = Recurrence()
+        recur.parse("FREQ=DAILY")
+        items, limited = cache.expand(recur, start, *january)
+        self.assertEqual(len(items), 31)
+        self.assertTrue(limited)
+
+        # An equal rule shares the entry
+        same = Recurrence()
+        same.parse("FREQ=DAILY")
+        items, _ignore = cache.expand(same, start, DateTime(2014, 1, 10, 0, 0, 0), DateTime(2014, 1, 20, 0, 0, 0))
+        self.assertEqual(items[0], DateTime(2014, 1, 10, 12, 0, 0))
+        self.assertEqual(len(items), 10)
+
+        # The next window extends the entry
+        items, _ignore = cache.expand(recur, start, *february)
+        self.assertEqual(len(items), 28)
+        self.assertEqual(cache.getStatistics(), {"hits": 1, "misses": 1, "extensions": 1, "entries": 1, "instances": 59})
+
+        # A different start is a different entry
+        items, _ignore = cache.expand(recur, DateTime(2014, 1, 2, 12, 0, 0), *january)
+        self.assertEqual(len(items), 30)
+
+        counted = Recurrence()
+        counted.parse("FREQ=DAILY;COUNT=5")
+        items, limited = cache.expand(counted, start, *january)
+        self.assertEqual(len(items), 5)
+        self.assertFalse(limited)
+
+        # Going over the limit evicts the least recently used entry
+        other = Recurrence()
+        other.parse("FREQ=DAILY;INTERVAL=2")
+        items, _ignore = cache.expand(other, start, *january)
+        self.assertEqual(len(items), 16)
+        self.assertEqual(cache.getStatistics(), {"hits": 1, "misses": 4, "extensions": 1, "entries": 3, "instances": 51})
+
+    def testExpandCacheResume(self):
+
+        cache = RecurrenceCache()
+        start = DateTime(2014, 1, 1, 12, 0, 0, tzid=Timezone(utc=True))
+        january = (DateTime(2014, 1, 1, 0, 0, 0, tzid=Timezone(utc=True)), DateTime(2014, 2, 1, 0, 0, 0, tzid=Timezone(utc=True)),)
+        february = (DateTime(2014, 2, 1, 0, 0, 0, tzid=Timezone(utc=True)), DateTime(2014, 3, 1, 0, 0, 0, tzid=Timezone(utc=True)),)
+
+        # Extending an entry carries on with the same generator
+        recur = Recurrence()
+        recur.parse("FREQ=MONTHLY;BYDAY=MO,FR")
+        items, _ignore = cache.expand(recur, start, *january)
+        self.assertEqual(len(items), 10)
+        entry = list(cache.mEntries.values())[0]
+        iterator = entry.mIterator
+        items, _ignore = cache.expand(recur, start, *february)
+        self.assertEqual(len(items), 8)
+        self.assertTrue(entry.mIterator is iterator)
+        self.assertEqual(cache.getStatistics()["extensions"], 1)
+
+        # The instances returned are copies
+        items[0].offsetDay(1)
+        items, _ignore = cache.expand(recur, start, *february)
+        self.assertEqual(items[0], DateTime(2014, 2, 3, 12, 0, 0, tzid=Timezone(utc=True)))
+
+        # A rule with no instances stops at the end of the range
+        impossible = Recurrence()
+        impossible.parse("FREQ=SECONDLY;BYMONTH=2;BYMONTHDAY=30")
+        items, limited = cache.expand(impossible, start, start, DateTime(2014, 1, 1, 13, 0, 0, tzid=Timezone(utc=True)))
+        self.assertEqual(items, [start])
+        self.assertTrue(limited)
+
+        # Changing UNTIL in place changes the key
+        until = Recurrence()
+        until.parse("FREQ=DAILY;UNTIL=20140110T120000Z")
+        key = until.hashKey()
+        until.getUntil().offsetDay(1)
+        self.assertNotEqual(until.hashKey(), key)
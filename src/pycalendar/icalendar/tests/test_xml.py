@@ -14,6 +14,7 @@
 #    limitations under the License.
 ##
 
+from pycalendar.exceptions import InvalidData
 from pycalendar.icalendar.calendar import Calendar
 import io as StringIO
 import difflib
@@ -103,3 +104,54 @@ END:VCALENDAR
 
         for item1, item2 in self.data:
             _doRoundtrip(item1, item2)
+
+    def testGenerateXMLStream(self):
+
+        for caldata, resultdata in self.data:
+            cal = Calendar.parseText(caldata)
+
+            os = StringIO.StringIO()
+            cal.generateXML(os)
+            self.assertEqual(os.getvalue(), resultdata)
+
+    def testParseXML(self):
+
+        for caldata, resultdata in self.data:
+            cal = Calendar.parseXMLData(resultdata)
+            self.assertEqual(cal.getText(), Calendar.parseText(caldata).getText())
+
+        self.assertRaises(InvalidData, Calendar.parseXMLData, "<foo/>")
+        self.assertRaises(InvalidData, Calendar.parseXMLData, "<icalendar><vcalendar>")
+
+    def testIterXMLComponents(self):
+
+        data = """<?xml version="1.0" encoding="utf-8"?>
+<icalendar xmlns="urn:ietf:params:xml:ns:icalendar-2.0">
+  <vcalendar>
+    <properties>
+      <version><text>2.0</text></version>
+    </properties>
+    <components>
+      <x-one>
+        <properties>
+          <uid><text>1</text></uid>
+        </properties>
+      </x-one>
+      <x-two>
+        <properties>
+          <uid><text>2</text></uid>
+        </properties>
+      </x-two>
+    </components>
+  </vcalendar>
+</icalendar>
+"""
+
+        components = list(Calendar.iterXMLComponents(StringIO.StringIO(data)))
+        self.assertEqual([component.getType() for component in components], ["X-ONE", "X-TWO"])
+        self.assertEqual([component.loadValueString("UID") for component in components], ["1", "2"])
+
+        # The components are not added to the calendar
+        cal = components[0].getParentComponent()
+        self.assertEqual(cal.loadValueString("VERSION"), "2.0")
+        self.assertEqual(cal.getComponents(), [])
@@ -176,7 +176,7 @@ class VAlarm(Component):
             self.mSummary = valarm.loadValueString(definitions.cICalProperty_SUMMARY)
             self.mAttendees = []
             if valarm.hasProperty(definitions.cICalProperty_ATTENDEE):
-                range = valarm.getProperties().get(definitions.cICalProperty_ATTENDEE, ())
+                range = valarm.mProperties.get(definitions.cICalProperty_ATTENDEE, ())
                 for iter in range:
                     attendee = iter.getCalAddressValue()
                     if attendee is not None:
@@ -365,6 +365,7 @@ class VAlarm(Component):
         super().removed()
 
     def changed(self) -> None:
+        super().changed()
         self.mStatusInit = False
 
     def finalise(self) -> None:
@@ -382,7 +383,7 @@ class VAlarm(Component):
             elif temp2 is not None:
                 self.mTriggerAbsolute = False
                 self.mTriggerBy = temp2
-                prop = self.findFirstProperty(definitions.cICalProperty_TRIGGER)
+                prop = self.mProperties[definitions.cICalProperty_TRIGGER][0]
                 if prop.hasParameter(definitions.cICalParameter_RELATED):
                     temp = prop.getParameterValue(definitions.cICalParameter_RELATED)
                     if temp == definitions.cICalParameter_RELATED_START:
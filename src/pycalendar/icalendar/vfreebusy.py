@@ -189,7 +189,7 @@ class VFreeBusy(Component):
         self.mBusyTime = []
         min_start = DateTime()
         max_end = DateTime()
-        props = self.getProperties()
+        props = self.mProperties
         result = props.get(definitions.cICalProperty_FREEBUSY, ())
         for iter in result:
             type = 0
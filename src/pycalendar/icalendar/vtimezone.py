@@ -72,7 +72,7 @@ class VTimezone(Component):
         temp = self.loadValueString(definitions.cICalProperty_TZID)
         if temp is not None:
             self.mID = temp
-        self.mComponents.sort(key=lambda x: x.getStart())
+        self.sortComponents(key=lambda x: x.getStart())
         super().finalise()
 
     def validate(self, doFix: bool = False) -> Tuple[List[str], List[str]]:
@@ -17,23 +17,19 @@
 from __future__ import print_function
 from pycalendar.datetime import DateTime
 from pycalendar.icalendar.recurrence import Recurrence
-from pycalendar.period import Period
+from itertools import islice
 import sys
 
 
-def instances(start, rrule):
+def instances(start, rrule, limit=1000):
     """
-    Expand an RRULE.
+    Expand an RRULE, showing at most C{limit} instances.
     """
 
     recur = Recurrence()
     recur.parse(rrule)
     start = DateTime.parseText(start)
-    end = start.duplicate()
-    end.offsetYear(100)
-    items = []
-    range = Period(start, end)
-    recur.expand(start, range, items)
+    items = list(islice(recur.iterInstances(start), limit))
     print("DTSTART:{}".format(start))
     print("RRULE:{}".format(rrule))
     print("Instances: {}".format(", ".join(map(str, items))))
@@ -41,4 +37,4 @@ def instances(start, rrule):
 
 if __name__ == '__main__':
 
-    instances(sys.argv[1], sys.argv[2])
+    instances(sys.argv[1], sys.argv[2], *[int(arg) for arg in sys.argv[3:4]])
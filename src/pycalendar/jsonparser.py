@@ -0,0 +1,193 @@
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+"""
+A fast parser for jCal and jCard data.
+
+Parameters are built by the C{json.loads} object hook while the data is decoded, and the
+value type of each property is looked up in a table keyed by the property name and the
+jCal value type, rather than being worked out for every property. Values and properties
+are then created directly, without the per-component and per-property exception handling
+of L{ComponentBase.parseJSON}.
+"""
+
+from functools import partial
+from pycalendar.exceptions import ErrorBase, InvalidData
+from pycalendar.multivalue import MultiValue
+from pycalendar.parameter import Parameter
+from pycalendar.value import Value
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import json
+
+
+class JSONParser(object):
+    """
+    Parse jCal or jCard data into a container (L{Calendar} or L{Card}). Use
+    L{JSONParser.forContainer} to get a parser whose tables are shared by all the parses
+    for a container type.
+    """
+
+    sParsers: Dict[Any, "JSONParser"] = {}
+
+    @classmethod
+    def forContainer(cls, containerClass: Any) -> "JSONParser":
+        parser = cls.sParsers.get(containerClass)
+        if parser is None:
+            parser = cls.sParsers[containerClass] = cls(containerClass)
+        return parser
+
+    def __init__(self, containerClass: Any) -> None:
+        self.mContainerClass = containerClass
+        self.mComponentType = containerClass.sComponentType
+        self.mPropertyType = containerClass.sPropertyType
+
+        # Keyed by the jCal property name and value type, each entry is the property name,
+        # the value type, the text of the VALUE parameter needed (if any), whether the
+        # property is multi-valued and a factory for the value
+        self.mPropertyTypes: Dict[Tuple[str, str], Tuple[str, int, Optional[str], bool, Callable[[], Any]]] = {}
+        self.mParameterNames: Dict[str, str] = {}
+
+    def parse(self, data: Any) -> Any:
+        """
+        Parse a single container.
+
+        @param data: the data to parse
+        @type data: C{str} or C{File-like}
+        """
+        jobject = self._loads(data)
+        try:
+            return self.parseComponent(jobject, None, self.mContainerClass(add_defaults=False))
+        except ErrorBase:
+            raise
+        except Exception as e:
+            raise InvalidData("Invalid JSON data: {}".format(e), data)
+
+    def parseMultiple(self, data: Any) -> List[Any]:
+        """
+        Parse a JSON array of containers (e.g. multiple jCards).
+
+        @param data: the data to parse
+        @type data: C{str} or C{File-like}
+        """
+        jobjects = self._loads(data)
+        try:
+            return [self.parseComponent(jobject, None, self.mContainerClass(add_defaults=False)) for jobject in jobjects]
+        except ErrorBase:
+            raise
+        except Exception as e:
+            raise InvalidData("Invalid JSON data: {}".format(e), data)
+
+    def _loads(self, data: Any) -> Any:
+        if not isinstance(data, str):
+            data = data.read()
+        try:
+            return json.loads(data, object_pairs_hook=self.makeParameters)
+        except ValueError as e:
+            raise InvalidData("JSON parse: {}".format(e), data)
+
+    def makeParameters(self, pairs: List[Tuple[str, Any]]) -> Dict[str, List[Parameter]]:
+        """
+        Turn (name, value) pairs into the parameter C{dict} used by properties. This is the
+        object hook for the decoder: the only JSON objects in jCal and jCard are property
+        parameters and structured values (RECUR), which L{parseProperty} turns back.
+        """
+        parameters: Dict[str, List[Parameter]] = {}
+        for name, value in pairs:
+            upper = self.mParameterNames.get(name)
+            if upper is None:
+                upper = self.mParameterNames[name] = self.mPropertyType.internParameterName(name.upper())[1]
+            parameters.setdefault(upper, []).append(Parameter(upper, value))
+        return parameters
+
+    def parseComponent(self, jobject: List[Any], parent: Any, comp: Optional[Any] = None) -> Any:
+        if comp is None:
+            comp = self.mComponentType.makeComponent(jobject[0].upper(), parent)
+        for jprop in jobject[1]:
+            comp.addProperty(self.parseProperty(jprop))
+        if len(jobject) > 2:
+            for jcomp in jobject[2]:
+                comp.addComponent(self.parseComponent(jcomp, comp))
+        comp.finalise()
+        return comp
+
+    def parseProperty(self, jprop: List[Any]) -> Any:
+        info = self.mPropertyTypes.get((jprop[0], jprop[2]))
+        if info is None:
+            info = self._propertyType(jprop[0], jprop[2])
+        name, value_type, value_param, multi, factory = info
+
+        prop = self.mPropertyType()
+        prop.mName = name
+        if jprop[1]:
+            prop.mParameters = jprop[1]
+            if self.mPropertyType.sValue in prop.mParameters:
+                # An explicit VALUE parameter is not normal jCal, so do it the slow way
+                value_type = prop.determineValueType()
+                factory = partial(Value.createFromType, value_type)
+        if value_param is not None:
+            prop.mParameters.setdefault(self.mPropertyType.sValue, []).append(Parameter(self.mPropertyType.sValue, value_param))
+
+        if multi:
+            prop.mValue = MultiValue(value_type)
+            prop.mValue.parseJSONValue(jprop[3:])
+        else:
+            jvalue = jprop[3]
+            if isinstance(jvalue, dict):
+                jvalue = self.structuredValue(jvalue)
+            prop.mValue = factory()
+            prop.mValue.parseJSONValue(jvalue)
+        prop._postCreateValue(value_type)
+        return prop
+
+    @staticmethod
+    def structuredValue(jvalue: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn the parts of a structured value (RECUR) that the object hook made into
+        parameters back into plain values. Parts from elsewhere (e.g. L{XMLParser}) are
+        left as they are.
+        """
+        results: Dict[str, Any] = {}
+        for name, value in jvalue.items():
+            if isinstance(value, list) and value and isinstance(value[0], Parameter):
+                results[name.lower()] = value[0].getValues()
+            else:
+                results[name] = value
+        return results
+
+    def _propertyType(self, jname: str, jtype: str) -> Tuple[str, int, Optional[str], bool, Callable[[], Any]]:
+        """
+        Work out the details of a property with a particular name and jCal value type in
+        the same way as L{PropertyBase.parseJSON}, and add them to the table.
+        """
+        propertyType = self.mPropertyType
+        name = propertyType.internPropertyName(jname.upper())
+        value_type = propertyType.sValueTypeMap.get(jtype.upper(), Value.VALUETYPE_UNKNOWN)
+        default_type = propertyType.sDefaultValueTypeMap.get(name, Value.VALUETYPE_UNKNOWN)
+        value_param = jtype.upper() if default_type != value_type else None
+
+        prop = propertyType()
+        prop.mName = name
+        if value_param is not None:
+            prop.mParameters[propertyType.sValue] = [Parameter(propertyType.sValue, value_param)]
+        value_type = prop.determineValueType()
+
+        factory = Value._typeMap.get(value_type)
+        if factory is None:
+            factory = partial(Value._typeMap[Value.VALUETYPE_UNKNOWN], value_type)
+
+        info = (name, value_type, value_param, name in propertyType.sMultiValues, factory,)
+        self.mPropertyTypes[(jname, jtype)] = info
+        return info
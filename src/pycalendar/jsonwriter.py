@@ -0,0 +1,108 @@
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+"""
+An incremental writer for jCal and jCard data.
+
+Only the properties of the component being written are turned into lists for
+C{json.dumps} - the component arrays themselves are written directly to the output
+stream, so the nested list structure for the whole object is never built.
+"""
+
+from typing import Any, Callable, Iterable, TypeVar
+import json
+
+T = TypeVar("T")
+
+
+class JSONWriter(object):
+    """
+    Write components as JSON to a text stream. The default output is the same as
+    C{json.dumps(..., indent=2, separators=(',', ':'))} of the nested lists built by
+    L{ComponentBase.writeJSON}. In compact mode there is no indentation or line breaks.
+    """
+
+    def __init__(self, os: Any, compact: bool = False, sort_keys: bool = False) -> None:
+        """
+        @param os: the stream to write to
+        @type os: C{File-like}
+        @param compact: if C{True} do not indent the output
+        @type compact: C{bool}
+        @param sort_keys: if C{True} sort the parameters of each property by name
+        @type sort_keys: C{bool}
+        """
+        self.mStream = os
+        self.mIndent = None if compact else 2
+        self.mSortKeys = sort_keys
+
+    def writeComponent(self, component: Any, level: int = 0) -> None:
+        """
+        Write a component and all its sub-components.
+
+        @param component: the component to write
+        @type component: L{ComponentBase}
+        @param level: the nesting depth of the component
+        @type level: C{int}
+        """
+        jprops: list = []
+        component.writePropertiesJSON(jprops)
+        subcomponents = component.sortedComponents() if component.mComponents else []
+
+        self.mStream.write("[")
+        self._newline(level + 1)
+        self.mStream.write(json.dumps(component.getType().lower()))
+        self.mStream.write(",")
+        self._newline(level + 1)
+        self._writeArray(jprops, level + 1, self._writeProperty)
+        self.mStream.write(",")
+        self._newline(level + 1)
+        self._writeArray(subcomponents, level + 1, self.writeComponent)
+        self._newline(level)
+        self.mStream.write("]")
+
+    def writeComponents(self, components: Iterable[Any]) -> None:
+        """
+        Write a JSON array of components, e.g. multiple jCards.
+
+        @param components: the components to write
+        @type components: iterable of L{ComponentBase}
+        """
+        self._writeArray(components, 0, self.writeComponent)
+
+    def _writeArray(self, items: Iterable[T], level: int, writeItem: Callable[[T, int], None]) -> None:
+        self.mStream.write("[")
+        empty = True
+        for item in items:
+            if not empty:
+                self.mStream.write(",")
+            empty = False
+            self._newline(level + 1)
+            writeItem(item, level + 1)
+        if not empty:
+            self._newline(level)
+        self.mStream.write("]")
+
+    def _writeProperty(self, jprop: list, level: int) -> None:
+        text = json.dumps(jprop, indent=self.mIndent, separators=(',', ':'), sort_keys=self.mSortKeys)
+        if self.mIndent is not None:
+            # JSON strings never contain a raw line break, so this only indents the structure
+            text = text.replace("\n", "\n" + " " * (self.mIndent * level))
+        self.mStream.write(text)
+
+    def _newline(self, level: int) -> None:
+        if self.mIndent is not None:
+            self.mStream.write("\n")
+            self.mStream.write(" " * (self.mIndent * level))
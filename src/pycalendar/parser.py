@@ -65,6 +65,10 @@ class ParserContext(object):
     # Remove \-escaping in GEO values when parsing - only PARSER_FIX
     BACKSLASH_IN_GEO_VALUE = PARSER_FIX
 
+    # Keep the text of property values and only decode them when first accessed. Properties
+    # that are not changed are then written back exactly as they were read - True or False
+    LAZY_PROPERTY_VALUES = False
+
     @staticmethod
     def allRaise():
         """
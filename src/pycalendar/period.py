@@ -21,6 +21,14 @@ from pycalendar.valueutils import ValueMixin
 import xml.etree.cElementTree as XML
 
 class Period(ValueMixin):
+
+    __slots__ = (
+        "mStart",
+        "mEnd",
+        "mDuration",
+        "mUseDuration",
+    )
+
     mStart: DateTime
     mEnd: Optional[DateTime]
     mDuration: Optional[Duration]
@@ -42,7 +42,7 @@ class PlainTextValue(Value):
         value.text = self.mValue
 
     def parseJSONValue(self, jobject: Any) -> None:
-        self.mValue = jobject.encode("utf-8")
+        self.mValue = jobject
 
     def writeJSONValue(self, jobject: list) -> None:
         jobject.append(self.mValue)
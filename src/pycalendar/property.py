@@ -13,7 +13,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from pycalendar import stringutils, xmlutils, xmldefinitions
 from pycalendar.parameter import Parameter
 from pycalendar.binaryvalue import BinaryValue
@@ -23,14 +23,16 @@ from pycalendar.durationvalue import DurationValue
 from pycalendar.exceptions import InvalidProperty
 from pycalendar.integervalue import IntegerValue
 from pycalendar.multivalue import MultiValue
+from pycalendar.parser import ParserContext
 from pycalendar.periodvalue import PeriodValue
 from pycalendar.plaintextvalue import PlainTextValue
 from pycalendar.unknownvalue import UnknownValue
 from pycalendar.urivalue import URIValue
 from pycalendar.utcoffsetvalue import UTCOffsetValue
-from pycalendar.utils import decodeParameterValue
+from pycalendar.utils import decodeParameterValue, FoldingWriter
 from pycalendar.value import Value
 import io as StringIO
+import sys
 import xml.etree.cElementTree as XML
 
 class PropertyBase(object):
@@ -45,14 +47,34 @@ class PropertyBase(object):
     sValue: Optional[str] = None
     sText: Optional[str] = None
 
+    # Interned property and parameter names, keyed by the name as it appears in the data. The
+    # parameter table maps to the name and its upper-cased form, so that known names do not
+    # have to be upper-cased. Derived classes seed these from their definitions (see
+    # L{makeNameTables}), and names not in the definitions are added as they are seen.
+    sPropertyNames: Dict[str, str] = {}
+    sParameterNames: Dict[str, Tuple[str, str]] = {}
+    sMaxInternedNames: int = 4096
+
     mName: str
     mParameters: Dict[str, List[Parameter]]
     mValue: Optional[Value]
 
+    # Lazy parse state (see L{ParserContext.LAZY_PROPERTY_VALUES}): the value text still to be
+    # decoded, the original (unfolded) property line, the text of the value when it was
+    # decoded and a snapshot of the parameters, used to detect changes made in place
+    mRawValue: Optional[str]
+    mRawText: Optional[str]
+    mRawCheck: Optional[str]
+    mRawParameters: Optional[Tuple[Any, ...]]
+
     def __init__(self, name: Optional[str] = None, value: Any = None, valuetype: Any = None) -> None:
         self.mName: str = name if name is not None else ""
         self.mParameters: Dict[str, List[Parameter]] = {}
         self.mValue: Optional[Value] = None
+        self.mRawValue = None
+        self.mRawText = None
+        self.mRawCheck = None
+        self.mRawParameters = None
 
     def duplicate(self) -> "PropertyBase":
         raise NotImplementedError
@@ -78,18 +100,21 @@ class PropertyBase(object):
     def setGroup(self, group: str) -> None:
         if self.sUsesGroup:
             self.mGroup = group
+            self.mRawText = None
 
     def getName(self) -> str:
         return self.mName
 
     def setName(self, name: str) -> None:
         self.mName = name
+        self.mRawText = None
 
     def getParameters(self) -> Dict[str, List[Parameter]]:
         return self.mParameters
 
     def setParameters(self, parameters: Dict[str, List[Parameter]]) -> None:
         self.mParameters = dict([(k.upper(), v) for k, v in parameters.items()])
+        self.mRawText = None
 
     def hasParameter(self, attr: str) -> bool:
         return attr.upper() in self.mParameters
@@ -102,74 +127,89 @@ class PropertyBase(object):
 
     def addParameter(self, attr: Parameter) -> None:
         self.mParameters.setdefault(attr.getName().upper(), []).append(attr)
+        self.mRawText = None
 
     def replaceParameter(self, attr: Parameter) -> None:
         self.mParameters[attr.getName().upper()] = [attr]
+        self.mRawText = None
 
     def removeParameters(self, attr: str) -> None:
         if attr.upper() in self.mParameters:
             del self.mParameters[attr.upper()]
+            self.mRawText = None
 
     def getValue(self) -> Optional[Value]:
+        if self.mRawValue is not None:
+            self._decodeValue()
         return self.mValue
 
     def getBinaryValue(self) -> Optional[BinaryValue]:
-        if isinstance(self.mValue, BinaryValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, BinaryValue):
+            return value
         else:
             return None
 
     def getCalAddressValue(self) -> Optional[CalAddressValue]:
-        if isinstance(self.mValue, CalAddressValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, CalAddressValue):
+            return value
         else:
             return None
 
     def getDateTimeValue(self) -> Optional[DateTimeValue]:
-        if isinstance(self.mValue, DateTimeValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, DateTimeValue):
+            return value
         else:
             return None
 
     def getDurationValue(self) -> Optional[DurationValue]:
-        if isinstance(self.mValue, DurationValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, DurationValue):
+            return value
         else:
             return None
 
     def getIntegerValue(self) -> Optional[IntegerValue]:
-        if isinstance(self.mValue, IntegerValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, IntegerValue):
+            return value
         else:
             return None
 
     def getMultiValue(self) -> Optional[MultiValue]:
-        if isinstance(self.mValue, MultiValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, MultiValue):
+            return value
         else:
             return None
 
     def getPeriodValue(self) -> Optional[PeriodValue]:
-        if isinstance(self.mValue, PeriodValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, PeriodValue):
+            return value
         else:
             return None
 
     def getTextValue(self) -> Optional[PlainTextValue]:
-        if isinstance(self.mValue, PlainTextValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, PlainTextValue):
+            return value
         else:
             return None
 
     def getURIValue(self) -> Optional[URIValue]:
-        if isinstance(self.mValue, URIValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, URIValue):
+            return value
         else:
             return None
 
     def getUTCOffsetValue(self) -> Optional[UTCOffsetValue]:
-        if isinstance(self.mValue, UTCOffsetValue):
-            return self.mValue
+        value = self.getValue()
+        if isinstance(value, UTCOffsetValue):
+            return value
         else:
             return None
 
@@ -180,57 +220,155 @@ class PropertyBase(object):
         if always_write_value:
             cls.sAlwaysValueTypes.add(propname)
 
+    @staticmethod
+    def makeNameTables(definitions: Any, property_prefix: str, parameter_prefix: str) -> Tuple[Dict[str, str], Dict[str, Tuple[str, str]]]:
+        """
+        Create the initial L{sPropertyNames} and L{sParameterNames} tables from the constants in
+        a definitions module whose names start with the specified prefixes.
+        """
+        propnames: Dict[str, str] = {}
+        paramnames: Dict[str, Tuple[str, str]] = {}
+        for attr, value in vars(definitions).items():
+            if isinstance(value, str):
+                if attr.startswith(property_prefix):
+                    value = sys.intern(value)
+                    propnames[value] = value
+                elif attr.startswith(parameter_prefix):
+                    value = sys.intern(value)
+                    paramnames[value] = (value, value)
+        return propnames, paramnames
+
+    @classmethod
+    def internPropertyName(cls, name: str) -> str:
+        """
+        Return the interned property name.
+        """
+        interned = cls.sPropertyNames.get(name)
+        if interned is None:
+            interned = sys.intern(name)
+            if len(cls.sPropertyNames) < cls.sMaxInternedNames:
+                cls.sPropertyNames[interned] = interned
+        return interned
+
+    @classmethod
+    def internParameterName(cls, name: str) -> Tuple[str, str]:
+        """
+        Return the interned parameter name and its interned upper-cased form.
+        """
+        interned = cls.sParameterNames.get(name)
+        if interned is None:
+            interned = (sys.intern(name), sys.intern(name.upper()))
+            if len(cls.sParameterNames) < cls.sMaxInternedNames:
+                cls.sParameterNames[interned[0]] = interned
+        return interned
+
     @classmethod
     def parseText(cls, data: str) -> "PropertyBase":
         try:
             prop = cls()
-            prop_name, txt = stringutils.strduptokenstr(data, ";:")
+            prop_name, offset = stringutils.strtokenindex(data, 0, ";:")
             if not prop_name:
                 raise InvalidProperty("Invalid property: empty name", data)
             if prop.sUsesGroup:
                 splits = prop_name.split(".", 1)
                 if len(splits) == 2:
                     prop.mGroup = splits[0]
-                    prop.mName = splits[1]
+                    prop.mName = cls.internPropertyName(splits[1])
                 else:
-                    prop.mName = prop_name
+                    prop.mName = cls.internPropertyName(prop_name)
             else:
-                prop.mName = prop_name
-            txt = prop.parseTextParameters(txt, data)
+                prop.mName = cls.internPropertyName(prop_name)
+            txt = prop.parseTextParameters(data, offset)
             prop.mValue = None
-            value_type = prop.determineValueType()
-            if prop.mName.upper() in prop.sMultiValues:
-                prop.mValue = MultiValue(value_type)
+            if ParserContext.LAZY_PROPERTY_VALUES and txt is not None:
+                prop.mRawValue = txt
+                prop.mRawText = data
+                prop.mRawParameters = prop.parametersSnapshot()
             else:
-                prop.mValue = Value.createFromType(value_type)
-            prop.mValue.parse(txt, prop.sVariant)
-            prop._postCreateValue(value_type)
+                prop._parseValue(txt)
             return prop
         except Exception as e:
             raise InvalidProperty("Invalid property: '{}'".format(e), data)
 
-    def parseTextParameters(self, txt: str, data: str) -> str:
+    def _parseValue(self, txt: str) -> None:
+        value_type = self.determineValueType()
+        if self.mName.upper() in self.sMultiValues:
+            self.mValue = MultiValue(value_type)
+        else:
+            self.mValue = Value.createFromType(value_type)
+        self.mValue.parse(txt, self.sVariant)
+        self._postCreateValue(value_type)
+
+    def _decodeValue(self) -> None:
+        """
+        Create the value from the text kept by a lazy parse. The text of the decoded value is
+        kept so that L{generate} can tell whether the value has since been changed.
+        """
         try:
-            while txt:
-                if txt[0] == ';':
-                    txt = txt[1:]
-                    parameter_name, txt = stringutils.strduptokenstr(txt, "=")
+            self._parseValue(self.mRawValue)
+        except Exception as e:
+            raise InvalidProperty("Invalid property: '{}'".format(e), self.mRawText)
+        self.mRawValue = None
+        if self.mRawText is not None:
+            self.mRawCheck = self.mValue.getText()
+
+    def _duplicateValue(self, other: "PropertyBase") -> None:
+        other.mRawValue = self.mRawValue
+        other.mRawText = self.mRawText
+        other.mRawCheck = self.mRawCheck
+        other.mRawParameters = self.mRawParameters
+        if self.mValue is not None:
+            other.mValue = self.mValue.duplicate()
+
+    def isRawUnchanged(self) -> bool:
+        """
+        Indicate whether this property came from a lazy parse and has not been changed since,
+        in which case it is written back using the original text.
+        """
+        if self.mRawText is None:
+            return False
+        elif self.mRawParameters != self.parametersSnapshot():
+            # A parameter was changed in place (via L{getParameters} or a L{Parameter})
+            return False
+        elif self.mRawValue is not None:
+            return True
+        else:
+            return self.mValue is not None and self.mValue.getText() == self.mRawCheck
+
+    def parametersSnapshot(self) -> Tuple[Any, ...]:
+        """
+        Get the names and values of the parameters, for comparing with a later snapshot.
+        """
+        return tuple([
+            (key, tuple([(attr.mName, tuple(attr.mValues),) for attr in attrs]),)
+            for key, attrs in self.mParameters.items()
+        ])
+
+    def parseTextParameters(self, data: str, offset: int) -> Optional[str]:
+        """
+        Parse the parameters starting at C{offset} in the property line C{data} and return the
+        value text that follows them.
+        """
+        try:
+            end = len(data)
+            while offset < end:
+                if data[offset] == ';':
+                    parameter_name, offset = stringutils.strtokenindex(data, offset + 1, "=")
                     if parameter_name is None:
                         raise InvalidProperty("Invalid property: empty parameter name", data)
-                    txt = txt[1:]
-                    parameter_value, txt = stringutils.strduptokenstr(txt, ":;,")
+                    parameter_value, offset = stringutils.strtokenindex(data, offset + 1, ":;,")
                     if parameter_value is None:
                         raise InvalidProperty("Invalid property: empty parameter value", data)
+                    parameter_name, parameter_key = self.internParameterName(parameter_name)
                     attrvalue = Parameter(name=parameter_name, value=decodeParameterValue(parameter_value))
-                    self.mParameters.setdefault(parameter_name.upper(), []).append(attrvalue)
-                    while txt[0] == ',':
-                        txt = txt[1:]
-                        parameter_value2, txt = stringutils.strduptokenstr(txt, ":;,")
+                    self.mParameters.setdefault(parameter_key, []).append(attrvalue)
+                    while data[offset] == ',':
+                        parameter_value2, offset = stringutils.strtokenindex(data, offset + 1, ":;,")
                         if parameter_value2 is None:
                             raise InvalidProperty("Invalid property: empty parameter multi-value", data)
                         attrvalue.addValue(decodeParameterValue(parameter_value2))
-                elif txt[0] == ':':
-                    return txt[1:]
+                elif data[offset] == ':':
+                    return data[offset + 1:]
                 else:
                     raise InvalidProperty("Invalid property: missing value separator", data)
         except IndexError:
@@ -242,15 +380,22 @@ class PropertyBase(object):
         return os.getvalue()
 
     def generate(self, os: Any) -> None:
-        self.generateValue(os, False)
+        if self.isRawUnchanged():
+            self.writeFolded(os, self.mRawText)
+        else:
+            self.generateValue(os, False)
 
     def generateFiltered(self, os: Any, filter: Any) -> None:
         test, novalue = filter.testPropertyValue(self.mName.upper())
         if test:
-            self.generateValue(os, novalue)
+            if novalue:
+                self.generateValue(os, novalue)
+            else:
+                self.generate(os)
 
     def generateValue(self, os: Any, novalue: bool) -> None:
         self.setupValueParameter()
+        value = self.getValue()
         sout = StringIO.StringIO()
         if self.sUsesGroup and hasattr(self, "mGroup") and self.mGroup:
             sout.write(self.mGroup + ".")
@@ -260,10 +405,20 @@ class PropertyBase(object):
                 sout.write(";")
                 attr.generate(sout)
         sout.write(":")
-        if self.mValue and not novalue:
-            self.mValue.generate(sout)
+        if value and not novalue:
+            value.generate(sout)
         temp = sout.getvalue()
         sout.close()
+        self.writeFolded(os, temp)
+
+    @staticmethod
+    def writeFolded(os: Any, temp: str) -> None:
+        """
+        Write out a complete property line, folding it as needed.
+        """
+        if isinstance(os, FoldingWriter):
+            os.writeLine(temp)
+            return
         if len(temp) < 75:
             os.write(temp)
         else:
@@ -277,8 +432,6 @@ class PropertyBase(object):
                     os.write(line)
                     written = len(temp)
                 else:
-                    while (temp[offset] > 0x7F) and ((ord(temp[offset]) & 0xC0) == 0x80):
-                        offset -= 1
                     line = temp[start:offset]
                     os.write(line)
                     os.write("\r\n ")
@@ -303,23 +456,24 @@ class PropertyBase(object):
                 for attr in self.mParameters[key]:
                     if attr.getName().lower() != "value":
                         attr.writeXML(params, namespace)
-        if self.mValue and not novalue:
-            self.mValue.writeXML(prop, namespace)
+        value = self.getValue()
+        if value and not novalue:
+            value.writeXML(prop, namespace)
 
     @classmethod
     def parseJSON(cls, jobject: list) -> "PropertyBase":
         try:
             prop = cls()
-            prop.mName = jobject[0].encode("utf-8").upper()
+            prop.mName = cls.internPropertyName(jobject[0].upper())
             if jobject[1]:
                 for name, value in jobject[1].items():
                     name = name.upper()
-                    attrvalue = Parameter(name=name.encode("utf-8"), value=value.encode("utf-8"))
+                    attrvalue = Parameter(name=name, value=value)
                     prop.mParameters.setdefault(name, []).append(attrvalue)
             value_type = cls.sValueTypeMap.get(jobject[2].upper(), Value.VALUETYPE_UNKNOWN)
             default_type = cls.sDefaultValueTypeMap.get(prop.mName.upper(), Value.VALUETYPE_UNKNOWN)
             if default_type != value_type:
-                attrvalue = Parameter(name=cls.sValue, value=jobject[2].encode("utf-8").upper())
+                attrvalue = Parameter(name=cls.sValue, value=jobject[2].upper())
                 prop.mParameters.setdefault(cls.sValue, []).append(attrvalue)
             value_type = prop.determineValueType()
             values = jobject[3:]
@@ -352,8 +506,9 @@ class PropertyBase(object):
             for attr in self.mParameters[key]:
                 if attr.getName().lower() != "value":
                     attr.writeJSON(prop[1])
-        if self.mValue and not novalue:
-            self.mValue.writeJSON(prop)
+        value = self.getValue()
+        if value and not novalue:
+            value.writeJSON(prop)
 
     def determineValueType(self) -> int:
         value_type = self.sDefaultValueTypeMap.get(self.mName.upper(), Value.VALUETYPE_UNKNOWN)
@@ -367,6 +522,8 @@ class PropertyBase(object):
 
     def createValue(self, data: Any) -> None:
         self.mValue = None
+        self.mRawValue = None
+        self.mRawText = None
         value_type = self.determineValueType()
         if self.mName.upper() in self.sMultiValues:
             self.mValue = MultiValue(value_type)
@@ -383,6 +540,8 @@ class PropertyBase(object):
 
     def setValue(self, value: Any) -> None:
         self.mValue = None
+        self.mRawValue = None
+        self.mRawText = None
         value_type = self.sDefaultValueTypeMap.get(self.mName.upper(), Value.VALUETYPE_TEXT)
         if self.sValue in self.mParameters:
             value_type = self.sValueTypeMap.get(self.getParameterValue(self.sValue), value_type)
@@ -394,15 +553,16 @@ class PropertyBase(object):
         self._postCreateValue(value_type)
 
     def setupValueParameter(self) -> None:
+        value = self.getValue()
         if self.sValue in self.mParameters:
             del self.mParameters[self.sValue]
-        if self.mValue is None:
+        if value is None:
             return
         default_type = self.sDefaultValueTypeMap.get(self.mName.upper())
         if self.mName.upper() in self.sSpecialVariants:
             actual_type = default_type
         else:
-            actual_type = self.mValue.getType()
+            actual_type = value.getType()
         if default_type is None or default_type != actual_type or self.mName.upper() in self.sAlwaysValueTypes:
             actual_value = self.sTypeValueMap.get(actual_type)
             if actual_value is not None and (default_type is not None or actual_type != Value.VALUETYPE_TEXT):
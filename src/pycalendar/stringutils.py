@@ -13,8 +13,9 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##
-from typing import Tuple, List, Any
+from typing import Dict, Pattern, Tuple, List, Any
 from hashlib import md5
+import re
 
 def strduptokenstr(txt: str, tokens: str) -> Tuple[str | None, str]:
     if txt[0] == " ":
@@ -39,6 +40,49 @@ def strduptokenstr(txt: str, tokens: str) -> Tuple[str | None, str]:
                 return txt[0:end], txt[end:]
         return txt, ""
 
+_tokenPatterns: Dict[str, Pattern[str]] = {}
+
+def strtokenindex(txt: str, offset: int, tokens: str) -> Tuple[str | None, int]:
+    """
+    Offset based version of L{strduptokenstr}. Rather than returning a copy of the remainder of
+    C{txt}, return the offset in C{txt} of the character following the token, so that a whole
+    line can be tokenized in a single pass.
+
+    @param txt: the text to scan
+    @type txt: C{str}
+    @param offset: the offset in C{txt} at which the token starts
+    @type offset: C{int}
+    @param tokens: the characters that terminate an unquoted token
+    @type tokens: C{str}
+    """
+    if txt[offset] == " ":
+        end = len(txt)
+        while offset < end and txt[offset].isspace():
+            offset += 1
+        if offset == end:
+            return None, end
+    if txt[offset] == '\"':
+        start = offset + 1
+        end = txt.find('\"', start)
+        while end != -1:
+            # The quote is escaped if preceded by an odd number of backslashes
+            escape = end - 1
+            while escape >= start and txt[escape] == '\\':
+                escape -= 1
+            if (end - escape) % 2 == 1:
+                return txt[start:end], end + 1
+            end = txt.find('\"', end + 1)
+        return None, offset
+    else:
+        pattern = _tokenPatterns.get(tokens)
+        if pattern is None:
+            pattern = _tokenPatterns[tokens] = re.compile("[" + re.escape(tokens) + "]")
+        match = pattern.search(txt, offset)
+        if match is None:
+            return txt[offset:], len(txt)
+        else:
+            return txt[offset:match.start()], match.start()
+
 def strtoul(s: str, offset: int = 0) -> Tuple[int, int]:
     maxlen = len(s)
     startoffset = offset
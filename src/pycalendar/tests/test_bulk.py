@@ -0,0 +1,136 @@
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+from pycalendar import bulk
+from pycalendar.tests.utils import TestPyCalendar
+from pycalendar.timezonedb import TimezoneDatabase
+import os
+import shutil
+import tempfile
+
+ICS_DATA = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//calendarserver.org//Test//EN
+BEGIN:VTIMEZONE
+TZID:Bulk/Test
+BEGIN:STANDARD
+DTSTART:20001026T020000
+RRULE:FREQ=YEARLY;BYDAY=-1SU;BYMONTH=10
+TZNAME:EST
+TZOFFSETFROM:-0400
+TZOFFSETTO:-0500
+END:STANDARD
+END:VTIMEZONE
+BEGIN:VEVENT
+UID:bulk-1@example.com
+DTSTART;TZID=Bulk/Test:20200101T100000
+DTSTAMP:20200101T000000Z
+SUMMARY:Bulk
+END:VEVENT
+END:VCALENDAR
+""".replace("\n", "\r\n")
+
+VCF_DATA = """BEGIN:VCARD
+VERSION:3.0
+N:Thompson;Default;;;
+FN:Default Thompson
+END:VCARD
+BEGIN:VCARD
+VERSION:3.0
+N:Thompson;Other;;;
+FN:Other Thompson
+END:VCARD
+""".replace("\n", "\r\n")
+
+
+def _count(parsed):
+    """
+    Summarize a parse result - this runs in the worker processes so must be module level.
+    """
+    return len(parsed) if isinstance(parsed, list) else len(parsed.getComponents())
+
+
+def _fail(parsed):
+    """
+    Summarize that fails for vCard data.
+    """
+    if isinstance(parsed, list):
+        raise KeyError("no cards")
+    return _count(parsed)
+
+
+class TestBulk(TestPyCalendar):
+
+    def setUp(self):
+        super(TestBulk, self).setUp()
+        self.root = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.root, "a"))
+        os.mkdir(os.path.join(self.root, "b"))
+        for path, data in (
+            (("a", "one.ics"), ICS_DATA),
+            (("b", "two.vcf"), VCF_DATA),
+            (("bad.ics",), "Not calendar data\r\n"),
+            (("ignored.txt",), ICS_DATA),
+        ):
+            with open(os.path.join(self.root, *path), "w", newline="") as f:
+                f.write(data)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        super(TestBulk, self).tearDown()
+
+    def test_findFiles(self):
+
+        self.assertEqual(
+            [os.path.relpath(path, self.root) for path in bulk.findFiles(self.root, (".ics", ".vcf"))],
+            [os.path.join("a", "one.ics"), os.path.join("b", "two.vcf"), "bad.ics"],
+        )
+        self.assertEqual(
+            [os.path.relpath(path, self.root) for path in bulk.findFiles(self.root)],
+            [os.path.join("a", "one.ics"), "bad.ics"],
+        )
+
+    def test_parseTree(self):
+
+        seen = []
+        results = bulk.parseTree(self.root, (".ics", ".vcf"), summarize=_count, callback=seen.append, maxWorkers=2)
+        self.assertEqual(seen, results)
+        self.assertEqual(
+            [(os.path.relpath(result.path, self.root), result.ok(), result.summary) for result in results],
+            [
+                (os.path.join("a", "one.ics"), True, 2),
+                (os.path.join("b", "two.vcf"), True, 2),
+                ("bad.ics", False, None),
+            ],
+        )
+        self.assertEqual(list(results[0].timezones.keys()), ["Bulk/Test"])
+
+        # VTIMEZONEs from the workers are merged into this process
+        self.assertTrue(TimezoneDatabase.getTimezone("Bulk/Test") is not None)
+
+    def test_parseTreeSummarizeFails(self):
+
+        # A failing summarize is reported for that file only
+        results = bulk.parseTree(self.root, (".ics", ".vcf"), summarize=_fail, maxWorkers=2)
+        self.assertEqual(
+            [(os.path.relpath(result.path, self.root), result.ok(), result.summary) for result in results],
+            [
+                (os.path.join("a", "one.ics"), True, 2),
+                (os.path.join("b", "two.vcf"), False, None),
+                ("bad.ics", False, None),
+            ],
+        )
+        self.assertEqual(results[1].error, "KeyError: 'no cards'")
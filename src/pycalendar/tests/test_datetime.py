@@ -394,3 +394,11 @@ END:VCALENDAR
         dt.setWeekNo(1)
         self.assertEqual(dt, DateTime(2016, 1, 8, 0, 0, 0, tzid=Timezone(utc=True)))
         self.assertEqual(dt.getWeekNo(), 1)
+
+    def testSlots(self):
+
+        dt = DateTime(2016, 1, 8, 0, 0, 0, tzid=Timezone(utc=True))
+        self.assertFalse(hasattr(dt, "__dict__"))
+        self.assertFalse(hasattr(dt.getTimezone(), "__dict__"))
+        self.assertRaises(AttributeError, setattr, dt, "mUnknown", 1)
+        self.assertEqual(dt.duplicate(), dt)
@@ -61,3 +61,13 @@ class TestPeriod(unittest.TestCase):
         )
         p2.setUseDuration(False)
         self.assertTrue(p2.getText(), "20000101T000000/20000101T010000")
+
+    def testSlots(self):
+
+        p = Period(
+            start=DateTime(2000, 1, 1, 0, 0, 0),
+            duration=Duration(hours=1),
+        )
+        self.assertFalse(hasattr(p, "__dict__"))
+        self.assertFalse(hasattr(p.getDuration(), "__dict__"))
+        self.assertEqual(p.duplicate(), p)
@@ -15,7 +15,7 @@
 ##
 
 import unittest
-from pycalendar.stringutils import strduptokenstr
+from pycalendar.stringutils import strduptokenstr, strtokenindex
 
 
 class TestStringUtils(unittest.TestCase):
@@ -46,3 +46,36 @@ class TestStringUtils(unittest.TestCase):
 
         for txt, tokens, result in data:
             self.assertEqual(strduptokenstr(txt, tokens), result)
+
+    def test_strtokenindex(self):
+        """
+        Make sure L{strtokenindex} copes with all possibilities.
+        """
+
+        data = (
+            # Leading space
+            ("  abc:def", 0, ":;", ("abc", 5)),
+            ("  \"abc\":def", 0, ":;", ("abc", 7)),
+            ("   ", 0, ":;", (None, 3)),
+
+            # Quoted
+            ("\"abc\":def", 0, ":;", ("abc", 5)),
+            ("\"ab\\c\":def", 0, ":;", ("ab\\c", 6)),
+            ("\"ab\\\"c\":def", 0, ":;", ("ab\\\"c", 7)),
+            ("\"ab\\c:def", 0, ":;", (None, 0)),
+            ("\"abc\":", 0, ":;", ("abc", 5)),
+            ("\"abc\"", 0, ":;", ("abc", 5)),
+
+            # Unquoted
+            ("abc:def", 0, ":;", ("abc", 3)),
+            ("abc:", 0, ":;", ("abc", 3)),
+            ("abc", 0, ":;", ("abc", 3)),
+
+            # Offset
+            ("X;abc=def:ghi", 2, "=", ("abc", 5)),
+            ("X;abc=def:ghi", 6, ":;,", ("def", 9)),
+            ("X;abc=\"d:f\":ghi", 6, ":;,", ("d:f", 11)),
+        )
+
+        for txt, offset, tokens, result in data:
+            self.assertEqual(strtokenindex(txt, offset, tokens), result, txt)
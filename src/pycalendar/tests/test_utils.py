@@ -14,8 +14,13 @@
 #    limitations under the License.
 ##
 
+from io import BytesIO, StringIO
+from pycalendar.datetime import DateTime
+from pycalendar.timezone import Timezone
+from pycalendar.utils import encodeParameterValue, decodeParameterValue, \
+    readFoldedLine, unfoldLines, packDateTime, unpackPosixTime, unpackDateOnly, \
+    unpackHandle, packedDifference, FoldingWriter
 import unittest
-from pycalendar.utils import encodeParameterValue, decodeParameterValue
 
 
 class TestUtils(unittest.TestCase):
@@ -54,3 +59,110 @@ class TestUtils(unittest.TestCase):
 
         for value, decoded in data:
             self.assertEqual(decodeParameterValue(value), decoded)
+
+    def test_unfoldLines(self):
+        """
+        L{unfoldLines} must produce exactly the same lines as L{readFoldedLine}, no matter
+        where the block boundaries fall.
+        """
+
+        data = (
+            "",
+            "abc",
+            "abc\r\n",
+            "abc\r\ndef\r\n",
+            "abc\ndef\n",
+            "abc\r\n def\r\n\tghi\r\njkl\r\n",
+            "abc\r\n\r\n def\r\n",
+            "abc\r\n \r\n def\r\n",
+            " abc\r\ndef",
+            "abc\r\r\ndef\r",
+            "abc\r\n\r\r\ndef\r\n",
+            "\r\n\r\n",
+            "abc\r\n def",
+        )
+
+        def _readFoldedLine(txt):
+            ins = StringIO(txt)
+            lines = [None, None]
+            results = []
+            while readFoldedLine(ins, lines):
+                results.append(lines[0])
+            return results
+
+        for txt in data:
+            expected = _readFoldedLine(txt)
+            self.assertEqual(list(unfoldLines(txt)), expected, msg=repr(txt))
+            for blocksize in (1, 2, 3, 5, 1024):
+                self.assertEqual(list(unfoldLines(StringIO(txt), blocksize)), expected, msg=repr(txt))
+
+    def test_packDateTime(self):
+
+        dt = DateTime(2020, 1, 2, 3, 4, 5, tzid=Timezone(utc=True))
+        packed = packDateTime(dt, 7)
+        self.assertEqual(unpackPosixTime(packed), dt.getPosixTime())
+        self.assertFalse(unpackDateOnly(packed))
+        self.assertEqual(unpackHandle(packed), 7)
+
+        packed = packDateTime(DateTime(2020, 1, 2), 0)
+        self.assertTrue(unpackDateOnly(packed))
+        self.assertTrue(packed < packDateTime(dt, 0))
+
+    def test_packedDifference(self):
+        """
+        L{packedDifference} de-duplicates, sorts and excludes using the packed values, and
+        returns the original objects.
+        """
+
+        dts = [DateTime(2020, 1, day, 12, 0, 0, tzid=Timezone(utc=True)) for day in range(1, 6)]
+        include = [dts[3], dts[0], dts[2], dts[0].duplicate(), dts[4], dts[1]]
+        exclude = [dts[2].duplicate(), DateTime(2021, 1, 1, 0, 0, 0, tzid=Timezone(utc=True))]
+
+        results = packedDifference(include, exclude)
+        self.assertEqual(results, [dts[0], dts[1], dts[3], dts[4]])
+        self.assertTrue(results[0] is dts[0])
+        self.assertEqual(packedDifference(include, []), sorted(dts, key=lambda x: x.getPosixTime()))
+        self.assertEqual(packedDifference([], exclude), [])
+
+    def test_FoldingWriter(self):
+        """
+        L{FoldingWriter} folds on octets without splitting UTF-8 sequences and writes
+        chunks to its sink.
+        """
+
+        data = (
+            "SUMMARY:short",
+            "DESCRIPTION:" + "a" * 200,
+            "DESCRIPTION:" + "\u00e9\u20ac" * 100,
+            "X-TEST:" + "\U0001f600" * 40,
+        )
+
+        for line in data:
+            writer = FoldingWriter()
+            writer.writeLine(line)
+            writer.flush()
+            result = b"".join(writer.takeChunks())
+            self.assertTrue(result.endswith(b"\r\n"))
+            for folded in result.split(b"\r\n")[:-1]:
+                self.assertTrue(len(folded) <= 75)
+                folded.decode("utf-8")
+            self.assertEqual(list(unfoldLines(result.decode("utf-8"))), [line])
+
+        # ASCII lines fold the same way as the text generator
+        writer = FoldingWriter()
+        writer.writeLine("DESCRIPTION:" + "a" * 200)
+        writer.flush()
+        self.assertEqual(
+            b"".join(writer.takeChunks()),
+            b"DESCRIPTION:" + b"a" * 62 + b"\r\n " + b"a" * 73 + b"\r\n " + b"a" * 65 + b"\r\n",
+        )
+
+        sink = BytesIO()
+        writer = FoldingWriter(sink, chunkSize=10)
+        writer.write("BEGIN:VCALENDAR\r\n")
+        self.assertEqual(sink.getvalue(), b"BEGIN:VCALENDAR\r\n")
+        writer.write("END:")
+        self.assertEqual(sink.getvalue(), b"BEGIN:VCALENDAR\r\n")
+        writer.flush()
+        self.assertEqual(sink.getvalue(), b"BEGIN:VCALENDAR\r\nEND:")
+        self.assertEqual(writer.takeChunks(), [])
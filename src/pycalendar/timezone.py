@@ -29,6 +29,11 @@ class Timezone(object):
     sDefaultTimezone: ClassVar[Optional["Timezone"]] = None
     UTCTimezone: ClassVar[Optional["Timezone"]] = None
 
+    __slots__ = (
+        "mUTC",
+        "mTimezone",
+    )
+
     mUTC: bool
     mTimezone: Union[str, int, None]
 
@@ -15,6 +15,7 @@
 ##
 from typing import Any, ClassVar, Optional, Dict, Set
 from pycalendar.exceptions import NoTimezoneInDatabase, InvalidData
+from pycalendar.utils import readMappedFile
 import os
 
 class TimezoneDatabase(object):
@@ -115,8 +116,7 @@ class TimezoneDatabase(object):
         tzpath = os.path.normpath(tzpath)
         if tzpath.startswith(self.dbpath) and os.path.isfile(tzpath):
             try:
-                with open(tzpath) as f:
-                    self.calendar.parseComponent(f)
+                self.calendar.parseComponent(readMappedFile(tzpath))
             except (IOError, InvalidData):
                 raise NoTimezoneInDatabase(self.dbpath, tzid)
         else:
@@ -13,9 +13,13 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 ##
-from typing import Any, List, Tuple, IO, Sequence, Union
+from typing import Any, IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from pycalendar.parser import ParserContext
+import codecs
 import io as StringIO
+import mmap
+import os
+import re
 
 def readFoldedLine(ins: IO[str], lines: List[Union[str, None]]) -> bool:
     if lines[1] is not None:
@@ -66,6 +70,194 @@ def readFoldedLine(ins: IO[str], lines: List[Union[str, None]]) -> bool:
             break
     return True
 
+UNFOLD_BLOCK_SIZE: int = 64 * 1024
+
+# A line break followed by a whitespace character (other than another line break) is a fold.
+# Note that Python's \s is the same set of characters as str.isspace(), which is what
+# readFoldedLine uses to detect continuation lines.
+_FOLD = re.compile(r"\n[^\S\n]")
+
+def unfoldLines(ins: Union[str, IO[str], Iterable[str]], blocksize: int = UNFOLD_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Generate the logical (unfolded) lines of a text stream. This reads the stream in large
+    blocks and unfolds and splits each block in a single pass, rather than doing a pair of
+    C{readline} calls per logical line, but otherwise behaves exactly like repeated calls to
+    L{readFoldedLine}.
+
+    @param ins: the data to unfold, which can also be an iterable of text blocks such as
+        the one returned by L{readMappedFile}
+    @type ins: C{str}, C{File-like} or C{iterable}
+    @param blocksize: number of characters to read from the stream at a time
+    @type blocksize: C{int}
+    """
+    if isinstance(ins, str):
+        blocks: Iterator[str] = iter((ins,))
+    elif hasattr(ins, "read"):
+        blocks = iter(lambda: ins.read(blocksize), "")
+    else:
+        blocks = iter(ins)
+
+    # The last logical line seen is held back as it may be continued in the next block
+    carry: Optional[str] = None
+    pending = ""
+    for block in blocks:
+        if pending:
+            block = pending + block
+        cut = block.rfind("\n") + 1
+        if cut == 0:
+            pending = block
+            continue
+        pending = block[cut:]
+
+        # Only one CR is stripped from each line ending, which is exactly what replace() does
+        text = block[:cut].replace("\r\n", "\n")
+        continued = carry is not None and text[0] != "\n" and text[0].isspace()
+        logical = _FOLD.sub("", text).split("\n")
+        logical.pop()
+
+        if carry is None:
+            carry = logical[0]
+        elif continued:
+            carry += logical[0][1:]
+        else:
+            yield carry
+            carry = logical[0]
+        if len(logical) > 1:
+            yield carry
+            yield from logical[1:-1]
+            carry = logical[-1]
+
+    # Data after the last line break is a final, unterminated line
+    if pending:
+        if pending[-1] == "\r":
+            pending = pending[:-1]
+        if carry is not None and pending and pending[0].isspace():
+            carry += pending[1:]
+        else:
+            if carry is not None:
+                yield carry
+            carry = pending
+    if carry is not None:
+        yield carry
+
+def readMappedFile(path: str, blocksize: int = UNFOLD_BLOCK_SIZE, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Generate the text of a file in blocks. The file is memory mapped and decoded one block
+    at a time, so the whole file never exists in memory as a single C{str}. The result is
+    suitable for passing to L{unfoldLines} and hence to any of the text parsers. Unlike a
+    file opened in text mode, line endings are not translated, so a bare CR is not treated
+    as a line break.
+
+    @param path: the file to read
+    @type path: C{str}
+    @param blocksize: number of bytes to decode at a time
+    @type blocksize: C{int}
+    @param encoding: the character encoding of the file
+    @type encoding: C{str}
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                for offset in range(0, size, blocksize):
+                    block = decoder.decode(view[offset:offset + blocksize], offset + blocksize >= size)
+                    if block:
+                        yield block
+
+WRITE_CHUNK_SIZE = 64 * 1024
+
+class FoldingWriter(object):
+    """
+    A text output stream that can be passed to the C{generate} methods in place of a
+    C{StringIO}. Text is encoded to UTF-8 and buffered into chunks of roughly C{chunkSize}
+    bytes, which are either written to a binary C{sink} (a file, socket file or gzip stream
+    etc) or, if no sink is given, collected for the caller to take with L{takeChunks}.
+
+    Property lines are folded by L{writeLine}, which measures the encoded line in octets
+    rather than characters, so folded lines never exceed the 75 octet limit, and never
+    splits a multi-byte UTF-8 sequence. ASCII lines are folded at the same places as
+    L{PropertyBase.writeFolded} folds them.
+    """
+
+    def __init__(self, sink: Optional[IO[bytes]] = None, chunkSize: int = WRITE_CHUNK_SIZE) -> None:
+        self.mSink = sink
+        self.mChunkSize = chunkSize
+        self.mPending: List[bytes] = []
+        self.mPendingSize = 0
+        self.mChunks: List[bytes] = []
+
+    def write(self, data: str) -> None:
+        self._append(data.encode("utf-8"))
+
+    def writeLine(self, line: str) -> None:
+        """
+        Write a complete, unfolded content line, folding it as needed and adding the line
+        ending.
+
+        @param line: the content line without a line ending
+        @type line: C{str}
+        """
+        data = line.encode("utf-8")
+        size = len(data)
+        if size < 75:
+            self._append(data + b"\r\n")
+            return
+
+        start = 0
+        lineWrap = 74
+        while start < size:
+            offset = start + lineWrap
+            if offset >= size:
+                offset = size
+            else:
+                # Back up to the start of a UTF-8 sequence
+                while (data[offset] & 0xC0) == 0x80:
+                    offset -= 1
+            self._append(data[start:offset] + (b"\r\n " if offset < size else b"\r\n"))
+            lineWrap = 73
+            start = offset
+
+    def writeBytes(self, data: bytes) -> None:
+        """
+        Write data that is already UTF-8 encoded and folded.
+        """
+        self._append(data)
+
+    def _append(self, data: bytes) -> None:
+        self.mPending.append(data)
+        self.mPendingSize += len(data)
+        if self.mPendingSize >= self.mChunkSize:
+            self._emit()
+
+    def _emit(self) -> None:
+        if self.mPending:
+            chunk = b"".join(self.mPending)
+            self.mPending = []
+            self.mPendingSize = 0
+            if self.mSink is not None:
+                self.mSink.write(chunk)
+            else:
+                self.mChunks.append(chunk)
+
+    def flush(self) -> None:
+        """
+        Write out any buffered data as a final, possibly short, chunk.
+        """
+        self._emit()
+        if self.mSink is not None and hasattr(self.mSink, "flush"):
+            self.mSink.flush()
+
+    def takeChunks(self) -> List[bytes]:
+        """
+        Return the chunks that are ready when there is no sink, and forget about them.
+        """
+        chunks = self.mChunks
+        self.mChunks = []
+        return chunks
+
 def find_first_of(text: str, tokens: str, offset: int) -> int:
     for ctr, c in enumerate(text[offset:]):
         if c in tokens:
@@ -340,6 +532,50 @@ def unpackDateMonth(data: int) -> int:
 def unpackDateDay(data: int) -> int:
     return (data & 0xFF) - 128
 
+# Packed date-time values used on the recurrence expansion hot paths: UTC posix time in the
+# upper bits, then a date-only flag, then a handle (index) that maps back to the original
+# L{DateTime} object. Packed values sort in time order and the handle means no L{DateTime}
+# needs to be created or compared until the final results are materialised.
+PACKED_HANDLE_BITS = 31
+PACKED_HANDLE_MASK = (1 << PACKED_HANDLE_BITS) - 1
+PACKED_DATEONLY = 1 << PACKED_HANDLE_BITS
+PACKED_POSIX_SHIFT = PACKED_HANDLE_BITS + 1
+
+def packDateTime(dt: Any, handle: int = 0) -> int:
+    return (dt.getPosixTime() << PACKED_POSIX_SHIFT) | (PACKED_DATEONLY if dt.isDateOnly() else 0) | handle
+
+def unpackPosixTime(data: int) -> int:
+    return data >> PACKED_POSIX_SHIFT
+
+def unpackDateOnly(data: int) -> bool:
+    return (data & PACKED_DATEONLY) != 0
+
+def unpackHandle(data: int) -> int:
+    return data & PACKED_HANDLE_MASK
+
+def packedDifference(include: Sequence[Any], exclude: Sequence[Any]) -> List[Any]:
+    """
+    Return the L{DateTime}s in C{include} that are not in C{exclude}, sorted in time order and
+    with duplicates removed. All the work is done on packed integer values (see
+    L{packDateTime}) and only the surviving L{DateTime}s are picked out of C{include}.
+
+    @param include: the date-times to include
+    @type include: C{list} of L{DateTime}
+    @param exclude: the date-times to remove
+    @type exclude: C{list} of L{DateTime}
+    """
+    packed = sorted([packDateTime(dt, handle) for handle, dt in enumerate(include)])
+    excluded = set([dt.getPosixTime() for dt in exclude])
+    results: List[Any] = []
+    last = None
+    for data in packed:
+        posix = data >> PACKED_POSIX_SHIFT
+        if posix != last:
+            last = posix
+            if posix not in excluded:
+                results.append(include[data & PACKED_HANDLE_MASK])
+    return results
+
 def getMonthTable(month: int, year: int, weekstart: int, table: Any, today_index: Any) -> Tuple[Any, Any]:
     from pycalendar.datetime import DateTime
     today = DateTime.getToday(None)
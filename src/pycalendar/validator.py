@@ -15,17 +15,27 @@
 #    limitations under the License.
 ##
 
+from pycalendar import bulk
 from pycalendar.icalendar.calendar import Calendar
 from pycalendar.exceptions import ErrorBase
 from pycalendar.parser import ParserContext
 from pycalendar.vcard.card import Card
+from typing import List, Optional, Tuple
+import getopt
 import os
+import re
 import sys
+import time
 
+# Only HTAB, CR, LF allowed for characters in the range 0x00-0x1F
+_CONTROL_CHARACTERS = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F]")
 
-def validate(fname):
+
+def check(fname: str) -> Tuple[bool, List[str]]:
     """
-    Check whether the contents of the specified file is valid iCalendar or vCard data.
+    Check whether the contents of the specified file is valid iCalendar or vCard data. Returns a
+    tuple of a C{bool} indicating whether the data could be parsed, and a list of messages
+    describing the problems found.
     """
 
     with open(fname) as f:
@@ -37,33 +47,122 @@ def validate(fname):
         try:
             cal = Calendar.parseText(data)
         except ErrorBase as e:
-            print("Failed to parse iCalendar: {}: {}".format(e.mReason, e.mData,))
-            sys.exit(1)
+            return False, ["Failed to parse iCalendar: {}: {}".format(e.mReason, e.mData,)]
     elif data.find("BEGIN:VCARD") != -1:
         try:
             cal = Card.parseText(data)
         except ErrorBase as e:
-            print("Failed to parse vCard: {}: {}".format(e.mReason, e.mData,))
-            sys.exit(1)
+            return False, ["Failed to parse vCard: {}: {}".format(e.mReason, e.mData,)]
     else:
-        print("Failed to find valid iCalendar or vCard data")
-        sys.exit(1)
+        return False, ["Failed to find valid iCalendar or vCard data"]
 
+    messages: List[str] = []
     _ignore_fixed, unfixed = cal.validate(doFix=False, doRaise=False)
     if unfixed:
-        print("List of problems: {}".format(unfixed,))
+        messages.append("List of problems: {}".format(unfixed,))
     else:
-        print("No problems")
+        messages.append("No problems")
+
+    # Control character check
+    for match in _CONTROL_CHARACTERS.finditer(data):
+        messages.append("Control character {} at position {}".format(ord(match.group()), match.start(),))
+
+    return True, messages
+
+
+def validate(fname: str) -> None:
+    """
+    Check whether the contents of the specified file is valid iCalendar or vCard data.
+    """
+
+    parsed, messages = check(fname)
+    for message in messages:
+        print(message)
+    if not parsed:
+        sys.exit(1)
+
+
+def checkResult(fname: str) -> bulk.BulkResult:
+    """
+    Run L{check} in a L{bulk} worker process.
+    """
+
+    result = bulk.BulkResult(fname)
+    try:
+        parsed, result.summary = check(fname)
+    except (IOError, UnicodeDecodeError) as e:
+        parsed, result.summary = False, ["Failed to read file: {}".format(e)]
+    if not parsed:
+        result.error = result.summary[0]
+    return result
+
 
-    # Control character check - only HTAB, CR, LF allowed for characters in the range 0x00-0x1F
-    s = str(data)
-    if len(s.translate(None, "\x00\x01\x02\x03\x04\x05\x06\x07\x08\x0B\x0C\x0E\x0F\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1A\x1B\x1C\x1D\x1E\x1F")) != len(s):
-        for ctr, i in enumerate(data):
-            if i in "\x00\x01\x02\x03\x04\x05\x06\x07\x08\x0B\x0C\x0E\x0F\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1A\x1B\x1C\x1D\x1E\x1F":
-                print("Control character {} at position {}".format(ord(i), ctr,))
+def validateTree(root: str, maxWorkers: Optional[int] = None) -> None:
+    """
+    Check all the iCalendar and vCard files below the specified directory, using a pool of
+    worker processes, and report the problems and time taken for each file.
+    """
+
+    def _report(result: bulk.BulkResult) -> None:
+        print("{}: {:.4f}s".format(os.path.relpath(result.path, root), result.elapsed,))
+        for message in result.summary:
+            print("    {}".format(message,))
+
+    start = time.perf_counter()
+    results = bulk.processFiles(bulk.findFiles(root, (".ics", ".vcf")), checkResult, _report, maxWorkers)
+    failed = len([result for result in results if not result.ok()])
+    problems = len([result for result in results if result.ok() and result.summary != ["No problems"]])
+    print("{} files: {} failed to parse, {} with problems, {:.4f}s".format(len(results), failed, problems, time.perf_counter() - start,))
+    if failed:
+        sys.exit(1)
+
+
+def usage(error_msg: Optional[str] = None) -> None:
+    if error_msg:
+        print(error_msg)
+
+    print("""Usage: validator [options] PATH
+Options:
+    -h            Print this help and exit
+    -j            Number of worker processes to use when PATH is a
+                  directory [default: number of CPUs]
+
+Arguments:
+    PATH          iCalendar or vCard file, or directory
+
+Description:
+    This utility will check whether a file contains valid iCalendar
+    or vCard data. When PATH is a directory all the .ics and .vcf files
+    below it are checked in parallel.
+
+""")
+
+    if error_msg:
+        raise ValueError(error_msg)
+    else:
+        sys.exit(0)
 
 
 if __name__ == '__main__':
 
-    fname = os.path.expanduser(sys.argv[1])
-    validate(fname)
+    maxWorkers: Optional[int] = None
+
+    options, args = getopt.getopt(sys.argv[1:], "hj:")
+
+    for option, value in options:
+        if option == "-h":
+            usage()
+        elif option == "-j":
+            maxWorkers = int(value)
+        else:
+            usage("Unrecognized option: %s" % (option,))
+
+    # Process arguments
+    if len(args) != 1:
+        usage("Must have one argument")
+    fname = os.path.expanduser(args[0])
+
+    if os.path.isdir(fname):
+        validateTree(fname, maxWorkers)
+    else:
+        validate(fname)
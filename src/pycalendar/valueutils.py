@@ -25,6 +25,8 @@ class ValueMixin(object):
     Mix-in fr Operationen, die fr Value- und value-spezifische Klassen gemeinsam sind.
     """
 
+    __slots__ = ()
+
     def __str__(self) -> str:
         return self.getText()
 
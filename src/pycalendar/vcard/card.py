@@ -14,16 +14,19 @@
 #    limitations under the License.
 ##
 
-from typing import Any, List, ClassVar, Tuple
+from typing import Any, ClassVar, IO, Iterable, List, Tuple
 from io import StringIO
 from pycalendar.containerbase import ContainerBase
 from pycalendar.exceptions import InvalidData
+from pycalendar.jsonwriter import JSONWriter
 from pycalendar.parser import ParserContext
-from pycalendar.utils import readFoldedLine
-from pycalendar.vcard import definitions
+from pycalendar.utils import readMappedFile, unfoldLines
+from pycalendar.vcard import definitions, xmldefinitions
 from pycalendar.vcard.definitions import VCARD, Property_VERSION, Property_PRODID, Property_UID
 from pycalendar.vcard.property import Property
 from pycalendar.vcard.validation import VCARD_VALUE_CHECKS
+from pycalendar.xmlparser import XMLParser
+from pycalendar.xmlwriter import XMLWriter
 import json
 
 class Card(ContainerBase):
@@ -34,6 +37,9 @@ class Card(ContainerBase):
     sFormatText: ClassVar[str] = "text/vcard"
     sFormatJSON: ClassVar[str] = "application/vcard+json"
 
+    sXMLNamespace: ClassVar[str] = xmldefinitions.vCard40_namespace
+    sXMLRoot: ClassVar[str] = xmldefinitions.vcards
+
     propertyCardinality_1: ClassVar[Tuple[str, ...]] = (
         definitions.Property_VERSION,
         definitions.Property_N,
@@ -84,10 +90,8 @@ class Card(ContainerBase):
         LOOK_FOR_VCARD = 0
         GET_PROPERTY = 1
         state = LOOK_FOR_VCARD
-        lines: List[Any] = [None, None]
 
-        while readFoldedLine(ins, lines):
-            line = lines[0]
+        for line in unfoldLines(ins):
             if state == LOOK_FOR_VCARD:
                 if line == card.getBeginDelimiter():
                     state = GET_PROPERTY
@@ -117,6 +121,20 @@ class Card(ContainerBase):
             raise InvalidData("vCard data not complete")
         return results
 
+    @classmethod
+    def parseMultipleFile(cls, path: str, encoding: str = "utf-8") -> List["Card"]:
+        """
+        Parse all the vCards in a file. The file is memory mapped and decoded in blocks that
+        are fed straight to the parser, so the file contents are never copied into a single
+        C{str}.
+
+        @param path: the file to parse
+        @type path: C{str}
+        @param encoding: the character encoding of the file
+        @type encoding: C{str}
+        """
+        return cls.parseMultipleTextData(readMappedFile(path, encoding=encoding))
+
     @classmethod
     def parseMultipleJSONData(cls, data: Any) -> List["Card"]:
         if not isinstance(data, str):
@@ -130,6 +148,49 @@ class Card(ContainerBase):
             results.append(cls.parseJSON(jobject, None, cls(add_defaults=False)))
         return results
 
+    @classmethod
+    def parseMultipleXMLData(cls, data: Any) -> List["Card"]:
+        """
+        Parse all the vCards in an xCard document (see L{ContainerBase.parseXMLData}).
+
+        @param data: the data to parse, or the path of a file to parse
+        @type data: C{str} or C{File-like}
+        """
+        return XMLParser.forContainer(cls).parseMultiple(data)
+
+    @classmethod
+    def getMultipleTextJSON(cls, cards: Iterable["Card"], compact: bool = False) -> str:
+        s = StringIO()
+        cls.generateMultipleJSON(s, cards, compact=compact)
+        return s.getvalue()
+
+    @classmethod
+    def generateMultipleJSON(cls, os: IO[str], cards: Iterable["Card"], compact: bool = False) -> None:
+        """
+        Write a JSON array of jCards, the counterpart of L{parseMultipleJSONData}. Each card
+        is written to the stream as it is generated.
+
+        @param os: the stream to write to
+        @type os: C{File-like}
+        @param cards: the cards to write
+        @type cards: iterable of L{Card}
+        @param compact: if C{True} do not indent the output
+        @type compact: C{bool}
+        """
+        JSONWriter(os, compact=compact).writeComponents(cards)
+
+    @classmethod
+    def generateMultipleXML(cls, os: IO[str], cards: Iterable["Card"]) -> None:
+        """
+        Write an xCard document containing all the cards.
+
+        @param os: the stream to write to
+        @type os: C{File-like}
+        @param cards: the cards to write
+        @type cards: iterable of L{Card}
+        """
+        XMLWriter(os, cls.sXMLNamespace).writeDocument(cls.sXMLRoot, cards)
+
     def addDefaultProperties(self) -> None:
         self.addProperty(Property(definitions.Property_PRODID, Card.sProdID))
         self.addProperty(Property(definitions.Property_VERSION, "3.0"))
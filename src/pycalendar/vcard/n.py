@@ -104,7 +104,7 @@ class N(ValueMixin):
         utils.generateDoubleNestedList(os, self.mValue)
 
     def parseJSON(self, jobject: Any) -> None:
-        self.mValue = tuple(map(lambda x: x.encode("utf-8"), jobject))
+        self.mValue = tuple(jobject)
 
     def writeJSON(self, jobject: list) -> None:
         jobject.append(list(self.mValue))
@@ -41,7 +41,7 @@ class OrgValue(Value):
         utils.generateTextList(os, self.mValue, ';')
 
     def parseJSONValue(self, jobject: Any) -> None:
-        self.mValue = tuple(map(lambda x: x.encode("utf-8"), jobject))
+        self.mValue = tuple(jobject)
 
     def writeJSONValue(self, jobject: list) -> None:
         jobject.append(list(self.mValue))
@@ -113,6 +113,8 @@ class Property(PropertyBase):
         definitions.Property_ORG: Value.VALUETYPE_ORG,
     }
 
+    sPropertyNames, sParameterNames = PropertyBase.makeNameTables(definitions, "Property_", "Parameter_")
+
     sUsesGroup: bool = True
     sVariant: str = "vcard"
     sValue: str = definitions.Parameter_VALUE
@@ -149,7 +151,7 @@ class Property(PropertyBase):
         other = Property(self.mGroup, self.mName)
         for attrname, attrs in self.mParameters.items():
             other.mParameters[attrname] = [i.duplicate() for i in attrs]
-        other.mValue = self.mValue.duplicate()
+        self._duplicateValue(other)
         return other
 
     def __hash__(self) -> int:
@@ -157,7 +159,7 @@ class Property(PropertyBase):
             self.mGroup,
             self.mName,
             tuple([tuple(self.mParameters[attrname]) for attrname in sorted(self.mParameters.keys())]),
-            self.mValue,
+            self.getValue(),
         ))
 
     def __eq__(self, other: Any) -> bool:
@@ -166,20 +168,20 @@ class Property(PropertyBase):
         return (
             self.mGroup == other.mGroup and
             self.mName == other.mName and
-            self.mValue == other.mValue and
+            self.getValue() == other.getValue() and
             self.mParameters == other.mParameters
         )
 
-    def parseTextParameters(self, txt: str, data: str) -> Optional[str]:
+    def parseTextParameters(self, data: str, offset: int) -> Optional[str]:
         try:
             stripValueSpaces = False
-            while txt:
-                if txt[0] == ';':
-                    txt = txt[1:]
-                    parameter_name, txt = stringutils.strduptokenstr(txt, "=:;")
+            end = len(data)
+            while offset < end:
+                if data[offset] == ';':
+                    parameter_name, offset = stringutils.strtokenindex(data, offset + 1, "=:;")
                     if parameter_name is None:
                         raise InvalidProperty("Invalid property: empty parameter name", data)
-                    if txt[0] != "=":
+                    if data[offset] != "=":
                         if ParserContext.VCARD_2_NO_PARAMETER_VALUES == ParserContext.PARSER_RAISE:
                             raise InvalidProperty("Invalid property parameter", data)
                         elif ParserContext.VCARD_2_NO_PARAMETER_VALUES == ParserContext.PARSER_ALLOW:
@@ -191,29 +193,30 @@ class Property(PropertyBase):
                             parameter_value = definitions.Parameter_Value_ENCODING_B
                             stripValueSpaces = True
                     else:
-                        txt = txt[1:]
-                        parameter_value, txt = stringutils.strduptokenstr(txt, ":;,")
+                        parameter_value, offset = stringutils.strtokenindex(data, offset + 1, ":;,")
                         if parameter_value is None:
                             raise InvalidProperty("Invalid property: empty parameter name", data)
                     if parameter_name is not None:
+                        parameter_name, parameter_key = self.internParameterName(parameter_name)
                         attrvalue = Parameter(name=parameter_name, value=decodeParameterValue(parameter_value))
-                        self.mParameters.setdefault(parameter_name.upper(), []).append(attrvalue)
-                    while txt[0] == ',':
-                        txt = txt[1:]
-                        parameter_value2, txt = stringutils.strduptokenstr(txt, ":;,")
+                        self.mParameters.setdefault(parameter_key, []).append(attrvalue)
+                    while data[offset] == ',':
+                        parameter_value2, offset = stringutils.strtokenindex(data, offset + 1, ":;,")
                         if parameter_value2 is None:
                             raise InvalidProperty("Invalid property: empty parameter multi-value", data)
                         attrvalue.addValue(decodeParameterValue(parameter_value2))
-                elif txt[0] == ':':
-                    txt = txt[1:]
+                elif data[offset] == ':':
+                    txt = data[offset + 1:]
                     if stripValueSpaces:
                         txt = txt.replace(" ", "")
                     return txt
+                else:
+                    raise InvalidProperty("Invalid property: missing value separator", data)
         except IndexError:
             raise InvalidProperty("Invalid property: index error", data)
 
     def generateValue(self, os: IO[str], novalue: bool) -> None:
-        if self.mName.upper() == "PHOTO" and self.mValue.getType() == Value.VALUETYPE_BINARY:
+        if self.mName.upper() == "PHOTO" and self.getValue().getType() == Value.VALUETYPE_BINARY:
             self.setupValueParameter()
             sout = StringIO.StringIO()
             if self.mGroup:
@@ -225,7 +228,7 @@ class Property(PropertyBase):
                     attr.generate(sout)
             sout.write(":")
             sout.write("\r\n")
-            value = self.mValue.getText()
+            value = self.getValue().getText()
             value_len = len(value)
             offset = 0
             while value_len > 72:
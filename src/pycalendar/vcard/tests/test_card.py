@@ -20,6 +20,9 @@ from pycalendar.vcard.card import Card
 from pycalendar.vcard.property import Property
 import io as StringIO
 import difflib
+import json
+import os
+import tempfile
 import unittest
 
 
@@ -345,6 +348,81 @@ END:VCARD
             for card, result in zip(cards, results):
                 self.assertEqual(str(card), result, "\n".join(difflib.unified_diff(str(card).splitlines(), result.splitlines())))
 
+        # Same again, reading from a file
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for ctr, (item, results) in enumerate(data):
+                path = os.path.join(tmpdir, "{}.vcf".format(ctr))
+                with open(path, "wb") as f:
+                    f.write(item.encode("utf-8"))
+
+                cards = Card.parseMultipleFile(path)
+                self.assertEqual([str(card) for card in cards], list(results))
+
+    def testMultipleJSON(self):
+
+        data = """BEGIN:VCARD
+VERSION:3.0
+FN:Default Thompson
+EMAIL:lthompson@example.com
+TEL:1-444-444-4444
+UID:ED7A5AEC-AB19-4CE0-AD6A-2923A3E5C4E1:ABPerson
+END:VCARD
+BEGIN:VCARD
+VERSION:3.0
+FN:Other Thompson
+UID:ED7A5AEC-AB19-4CE0-AD6A-2923A3E5C4E2:ABPerson
+END:VCARD
+""".replace("\n", "\r\n")
+
+        cards = Card.parseMultipleTextData(StringIO.StringIO(data))
+        jobject = []
+        for card in cards:
+            card.writeJSON(jobject)
+
+        result = Card.getMultipleTextJSON(cards)
+        self.assertEqual(result, json.dumps(jobject, indent=2, separators=(',', ':')))
+        self.assertEqual([str(card) for card in Card.parseMultipleJSONData(result)], [str(card) for card in cards])
+
+        result = Card.getMultipleTextJSON(cards, compact=True)
+        self.assertEqual(result, json.dumps(jobject, separators=(',', ':')))
+        self.assertEqual(cards[0].getTextJSON(compact=True), json.dumps(jobject[0], separators=(',', ':')))
+
+        self.assertEqual(Card.getMultipleTextJSON([]), "[]")
+
+    def testMultipleXML(self):
+
+        data = """<?xml version="1.0" encoding="UTF-8"?>
+<vcards xmlns="urn:ietf:params:xml:ns:vcard-4.0">
+  <vcard>
+    <version><text>4.0</text></version>
+    <fn><text>Simon Perreault</text></fn>
+    <email>
+      <parameters><type><text>work</text></type></parameters>
+      <text>simon@example.com</text>
+    </email>
+  </vcard>
+  <vcard>
+    <version><text>4.0</text></version>
+    <fn><text>Other Perreault</text></fn>
+  </vcard>
+</vcards>
+"""
+
+        result = """BEGIN:VCARD
+VERSION:4.0
+EMAIL;TYPE=work:simon@example.com
+FN:Simon Perreault
+END:VCARD
+""".replace("\n", "\r\n")
+
+        cards = Card.parseMultipleXMLData(data)
+        self.assertEqual(len(cards), 2)
+        self.assertEqual(str(cards[0]), result)
+
+        os = StringIO.StringIO()
+        Card.generateMultipleXML(os, cards)
+        self.assertEqual([str(card) for card in Card.parseMultipleXMLData(os.getvalue())], [str(card) for card in cards])
+
     def testABapp(self):
 
         data = """BEGIN:VCARD
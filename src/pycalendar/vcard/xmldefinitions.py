@@ -17,3 +17,5 @@
 # vCard XML definitions
 
 vCard40_namespace = "urn:ietf:params:xml:ns:vcard-4.0"
+
+vcards = "vcards"
@@ -0,0 +1,255 @@
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+"""
+A streaming parser for xCal and xCard data.
+
+The document is read with C{iterparse}, and components are created as their start tags
+are seen. Each property element is turned into the equivalent jCal array once it is
+complete and then built with a L{JSONParser}, so property and value types are handled
+exactly as for JSON data. Every processed element is removed from the tree straight away,
+so memory use does not grow with the size of the document.
+"""
+
+from io import StringIO
+from pycalendar import xmldefinitions
+from pycalendar.exceptions import ErrorBase, InvalidData
+from pycalendar.icalendar import xmldefinitions as ical_xmldefinitions
+from pycalendar.jsonparser import JSONParser
+from pycalendar.value import Value
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import xml.etree.cElementTree as XML
+
+
+def _localName(tag: str) -> str:
+    return tag.split("}", 1)[-1]
+
+
+class XMLParser(object):
+    """
+    Parse xCal or xCard data into containers (L{Calendar} or L{Card}). Use
+    L{XMLParser.forContainer} to get a parser for a container type.
+
+    Both the layout written by L{XMLWriter}, with properties inside a C{properties}
+    element, and xCard data with properties directly inside each C{vcard} element are
+    accepted.
+    """
+
+    # What each open element is
+    ROOT = 0
+    CONTAINER = 1
+    COMPONENT = 2
+    PROPERTIES = 3
+    COMPONENTS = 4
+    PROPERTY = 5
+    PROPERTY_CONTENT = 6
+
+    sParsers: Dict[Any, "XMLParser"] = {}
+
+    @classmethod
+    def forContainer(cls, containerClass: Any) -> "XMLParser":
+        parser = cls.sParsers.get(containerClass)
+        if parser is None:
+            parser = cls.sParsers[containerClass] = cls(containerClass)
+        return parser
+
+    def __init__(self, containerClass: Any) -> None:
+        self.mContainerClass = containerClass
+        self.mComponentType = containerClass.sComponentType
+        self.mJSONParser = JSONParser.forContainer(containerClass)
+        self.mContainerName = containerClass(add_defaults=False).getType().lower()
+
+        # Map the name of each XML value element to the matching jCal value type
+        self.mValueTypes: Dict[str, str] = {}
+        for value_type, xmlname in Value._xmlMap.items():
+            if xmlname is not None:
+                self.mValueTypes.setdefault(xmlname, Value._jsonMap[value_type])
+
+    def parse(self, source: Any) -> Any:
+        """
+        Parse a document containing a single container.
+
+        @param source: the data to parse, or the path of a file to parse
+        @type source: C{str} or C{File-like}
+        """
+        results = self.parseMultiple(source)
+        if len(results) != 1:
+            raise InvalidData("XML data must contain exactly one {}".format(self.mContainerName))
+        return results[0]
+
+    def parseMultiple(self, source: Any) -> List[Any]:
+        """
+        Parse a document containing any number of containers (e.g. multiple vCards).
+
+        @param source: the data to parse, or the path of a file to parse
+        @type source: C{str} or C{File-like}
+        """
+        return list(self.iterContainers(source))
+
+    def iterContainers(self, source: Any) -> Iterator[Any]:
+        """
+        Yield each container in a document as soon as it is complete.
+
+        @param source: the data to parse, or the path of a file to parse
+        @type source: C{str} or C{File-like}
+        """
+        return self._iterparse(source, False, ())
+
+    def iterComponents(self, source: Any, keep: Iterable[str] = ()) -> Iterator[Any]:
+        """
+        Yield each component directly inside a container as soon as it is complete,
+        instead of adding it to the container, so that only one component at a time is
+        held in memory. The parent of each component is its container, which has all its
+        properties but only the components of the types listed in C{keep} (e.g.
+        VTIMEZONEs, which other components need).
+
+        @param source: the data to parse, or the path of a file to parse
+        @type source: C{str} or C{File-like}
+        @param keep: the types of the components to add to the container
+        @type keep: iterable of C{str}
+        """
+        return self._iterparse(source, True, tuple([name.upper() for name in keep]))
+
+    def _iterparse(self, source: Any, detach: bool, keep: Tuple[str, ...]) -> Iterator[Any]:
+        if isinstance(source, str) and source.lstrip().startswith("<"):
+            source = StringIO(source)
+        try:
+            for result in self._parse(source, detach, keep):
+                yield result
+        except ErrorBase:
+            raise
+        except XML.ParseError as e:
+            raise InvalidData("XML parse: {}".format(e))
+        except Exception as e:
+            raise InvalidData("Invalid XML data: {}".format(e))
+
+    def _parse(self, source: Any, detach: bool, keep: Tuple[str, ...]) -> Iterator[Any]:
+
+        elements: List[Any] = []
+        kinds: List[int] = []
+        components: List[Any] = []
+
+        for event, element in XML.iterparse(source, events=("start", "end",)):
+            if event == "start":
+                name = _localName(element.tag)
+                parent = kinds[-1] if kinds else None
+                if parent is None:
+                    if name != self.mContainerClass.sXMLRoot:
+                        raise InvalidData("XML root element must be {}".format(self.mContainerClass.sXMLRoot), name)
+                    kind = XMLParser.ROOT
+                elif parent == XMLParser.ROOT:
+                    if name != self.mContainerName:
+                        raise InvalidData("XML data has unexpected element", name)
+                    kind = XMLParser.CONTAINER
+                    components.append(self.mContainerClass(add_defaults=False))
+                elif parent == XMLParser.COMPONENTS:
+                    kind = XMLParser.COMPONENT
+                    components.append(self.mComponentType.makeComponent(name.upper(), components[-1]))
+                elif parent in (XMLParser.CONTAINER, XMLParser.COMPONENT,):
+                    if name == xmldefinitions.properties:
+                        kind = XMLParser.PROPERTIES
+                    elif name == xmldefinitions.components:
+                        kind = XMLParser.COMPONENTS
+                    else:
+                        kind = XMLParser.PROPERTY
+                elif parent == XMLParser.PROPERTIES:
+                    kind = XMLParser.PROPERTY
+                else:
+                    kind = XMLParser.PROPERTY_CONTENT
+                elements.append(element)
+                kinds.append(kind)
+
+            else:
+                elements.pop()
+                kind = kinds.pop()
+                if kind == XMLParser.PROPERTY_CONTENT:
+                    # Needed until the whole property has been seen
+                    continue
+                elif kind == XMLParser.PROPERTY:
+                    components[-1].addProperty(self.mJSONParser.parseProperty(self.makeProperty(element)))
+                elif kind in (XMLParser.CONTAINER, XMLParser.COMPONENT,):
+                    component = components.pop()
+                    component.finalise()
+                    if kind == XMLParser.CONTAINER:
+                        if not detach:
+                            yield component
+                    elif detach and len(components) == 1 and component.getType().upper() not in keep:
+                        yield component
+                    else:
+                        components[-1].addComponent(component)
+
+                # Drop the processed element from the tree
+                element.clear()
+                if elements:
+                    elements[-1].remove(element)
+
+    def makeProperty(self, node: Any) -> List[Any]:
+        """
+        Turn a property element into the equivalent jCal property array.
+
+        @param node: the property element
+        @type node: C{Element}
+        """
+        pairs = []
+        values: List[Any] = []
+        value_type: Optional[str] = None
+        for child in node:
+            name = _localName(child.tag)
+            if name == xmldefinitions.parameters:
+                for param in child:
+                    pvalues = [pvalue.text or "" for pvalue in param]
+                    pairs.append((_localName(param.tag), pvalues[0] if len(pvalues) == 1 else pvalues,))
+            else:
+                if value_type is None:
+                    value_type = self.mValueTypes.get(name, name)
+                values.append(self.makeValue(name, child))
+
+        if value_type is None:
+            value_type = xmldefinitions.value_unknown
+            values.append("")
+        return [_localName(node.tag), self.mJSONParser.makeParameters(pairs), value_type] + values
+
+    def makeValue(self, name: str, node: Any) -> Any:
+        """
+        Turn a value element into the equivalent jCal value.
+
+        @param name: the local name of the value element
+        @type name: C{str}
+        @param node: the value element
+        @type node: C{Element}
+        """
+        if name == xmldefinitions.value_integer:
+            return int(node.text)
+        elif name == xmldefinitions.value_float:
+            return float(node.text)
+        elif name == ical_xmldefinitions.geo:
+            return [float(child.text) for child in node]
+        elif name == ical_xmldefinitions.value_recur:
+            recur: Dict[str, Any] = {}
+            for child in node:
+                part = _localName(child.tag)
+                if part in recur:
+                    if not isinstance(recur[part], list):
+                        recur[part] = [recur[part]]
+                    recur[part].append(child.text)
+                else:
+                    recur[part] = child.text
+            return recur
+        elif len(node):
+            # Structured values (period, request-status, N, ADR etc) are arrays in jCal
+            return [child.text or "" for child in node]
+        else:
+            return node.text or ""
@@ -0,0 +1,175 @@
+##
+#    Copyright (c) 2026 Cyrus Daboo. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+##
+
+"""
+A streaming writer for xCal and xCard data.
+
+Components are written as SAX events directly to the output stream. Only the properties
+of the component being written are built as an C{ElementTree} (with the existing
+C{writePropertiesXML} methods, so values are written exactly as before), and that small
+tree is then replayed as events and discarded.
+"""
+
+from pycalendar import xmldefinitions
+from typing import Any, Dict, List, Optional
+from xml.sax.handler import ContentHandler
+from xml.sax.saxutils import escape
+import xml.etree.cElementTree as XML
+
+# The same escaping as ElementTree uses for attribute values
+_attributeEntities: Dict[str, str] = {
+    "\"": "&quot;",
+    "\r": "&#13;",
+    "\n": "&#10;",
+    "\t": "&#09;",
+}
+
+
+class XMLWriter(ContentHandler):
+    """
+    Write XML to a text stream in the same layout as L{xmlutils.toString}: each element
+    with child elements has them on separate lines indented by two spaces, elements with
+    text are written on a single line, and elements with neither are written as empty
+    elements.
+
+    All elements are in a single namespace, which is declared on the root element.
+    Element names passed to L{startElement} and L{endElement} are local names.
+    """
+
+    INDENT = 2
+    PREFIX = "ns0"
+
+    def __init__(self, os: Any, namespace: str) -> None:
+        """
+        @param os: the stream to write to
+        @type os: C{File-like}
+        @param namespace: the namespace of all the elements
+        @type namespace: C{str}
+        """
+        super(XMLWriter, self).__init__()
+        self.mStream = os
+        self.mNamespace = namespace
+
+        # The qualified name of each open element, and whether it has child elements
+        self.mElements: List[str] = []
+        self.mHasChildren: List[bool] = []
+        self.mStartPending = False
+        self.mText: List[str] = []
+
+    def startDocument(self) -> None:
+        self.mStream.write("""<?xml version="1.0" encoding="utf-8"?>\n""")
+
+    def endDocument(self) -> None:
+        self.mStream.write("\n")
+
+    def startElement(self, name: str, attrs: Optional[Dict[str, str]] = None) -> None:
+        if self.mStartPending:
+            self.mStream.write(">")
+            self.mStartPending = False
+        if self.mElements:
+            self.mHasChildren[-1] = True
+            self.mStream.write("\n")
+            self.mStream.write(" " * (len(self.mElements) * self.INDENT))
+        del self.mText[:]
+
+        qname = "{}:{}".format(self.PREFIX, name)
+        self.mStream.write("<")
+        self.mStream.write(qname)
+        if not self.mElements:
+            self._writeAttribute("xmlns:{}".format(self.PREFIX), self.mNamespace)
+        if attrs:
+            for attr, value in attrs.items():
+                self._writeAttribute(attr, value)
+        self.mStartPending = True
+        self.mElements.append(qname)
+        self.mHasChildren.append(False)
+
+    def characters(self, content: str) -> None:
+        self.mText.append(content)
+
+    def endElement(self, name: Optional[str] = None) -> None:
+        qname = self.mElements.pop()
+        if self.mHasChildren.pop():
+            self.mStream.write("\n")
+            self.mStream.write(" " * (len(self.mElements) * self.INDENT))
+            self.mStream.write("</{}>".format(qname))
+        elif self.mText and "".join(self.mText):
+            self.mStream.write(">")
+            self.mStream.write(escape("".join(self.mText)))
+            self.mStream.write("</{}>".format(qname))
+        else:
+            self.mStream.write(" />")
+        self.mStartPending = False
+        del self.mText[:]
+
+    def _writeAttribute(self, name: str, value: str) -> None:
+        self.mStream.write(" {}=\"{}\"".format(name, escape(value, _attributeEntities)))
+
+    def writeElement(self, node: Any) -> None:
+        """
+        Write an C{ElementTree} element and its children. The tags of the elements must
+        be in this writer's namespace (see L{xmlutils.makeTag}).
+
+        @param node: the element to write
+        @type node: C{Element}
+        """
+        self.startElement(node.tag.split("}", 1)[-1], node.attrib)
+        if node.text:
+            self.characters(node.text)
+        for child in node:
+            self.writeElement(child)
+        self.endElement()
+
+    def writeComponent(self, component: Any) -> None:
+        """
+        Write a component and all its sub-components in the same way as
+        L{ComponentBase.writeXML}.
+
+        @param component: the component to write
+        @type component: L{ComponentBase}
+        """
+        self.startElement(component.getType().lower())
+
+        node = XML.Element("properties")
+        component.writePropertiesXML(node, self.mNamespace)
+        for child in node:
+            self.writeElement(child)
+        del node
+
+        if component.mComponents:
+            self.startElement(xmldefinitions.components)
+            for subcomponent in component.sortedComponents():
+                self.writeComponent(subcomponent)
+            self.endElement()
+
+        self.endElement()
+
+    def writeDocument(self, root: str, components: Any) -> None:
+        """
+        Write a complete document with the specified root element containing the
+        components.
+
+        @param root: the local name of the root element
+        @type root: C{str}
+        @param components: the components to write
+        @type components: iterable of L{ComponentBase}
+        """
+        self.startDocument()
+        self.startElement(root)
+        for component in components:
+            self.writeComponent(component)
+        self.endElement()
+        self.endDocument()